@@ -0,0 +1,61 @@
+# benchmarks/bench_import_time.py
+"""
+Startup benchmark of the package and the command line tool.
+
+Runs each scenario in fresh interpreters and reports the fastest wall time,
+and checks that the PDF stack (pdfplumber, pdfminer), the process pool
+machinery and the mail parsing modules stay unloaded on paths that do not need them.
+
+Usage:
+    python benchmarks/bench_import_time.py [--repeat N]
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ('pdfplumber', 'pdfminer', 'pypdfium2', 'tqdm', 'concurrent.futures.process', 'mailbox', 'email')
+
+SCENARIOS = {
+    'import rewe_ebon_parser': "import rewe_ebon_parser",
+    'parse_text_ebon': "from rewe_ebon_parser.parse import parse_text_ebon; parse_text_ebon('SUMME EUR 0,00')",
+    'cli --version': "import sys; sys.argv = ['rewe-ebon-parser', '--version']\n"
+                     "from rewe_ebon_parser.cli import main\n"
+                     "try:\n    main()\nexcept SystemExit:\n    pass",
+}
+
+REPORT = "\nimport sys; print('LOADED:' + ','.join(m for m in {heavy!r} if m in sys.modules))"
+
+
+def run_scenario(code, repeat):
+    """Return the fastest wall time and the heavy modules loaded by a scenario."""
+    timings = []
+    loaded = ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code + REPORT.format(heavy=HEAVY_MODULES)],
+                                check=True, capture_output=True, text=True).stdout
+        timings.append(time.perf_counter() - start)
+        loaded = output.rsplit('LOADED:', 1)[1].strip()
+    return min(timings), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10, help='Interpreter launches per scenario; the fastest counts.')
+    args = parser.parse_args()
+
+    baseline, _ = run_scenario("pass", args.repeat)
+    print(f"{'bare interpreter':26s} {baseline * 1000:8.1f} ms")
+    failed = False
+    for name, code in SCENARIOS.items():
+        elapsed, loaded = run_scenario(code, args.repeat)
+        print(f"{name:26s} {elapsed * 1000:8.1f} ms  (+{(elapsed - baseline) * 1000:.1f} ms)"
+              + (f"  loads {loaded}" if loaded else ''))
+        failed = failed or bool(loaded)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
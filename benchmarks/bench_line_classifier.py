@@ -0,0 +1,72 @@
+# benchmarks/bench_line_classifier.py
+"""
+Micro-benchmark for header/footer line classification.
+
+Compares the previous approach (trying every pattern in turn with an
+uncompiled ``re.match``) against the prefix-dispatched ``classify_line`` on the
+lines of the anonymized example corpus and reports lines per second.
+
+Usage:
+    python benchmarks/bench_line_classifier.py [--repeat N]
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+from rewe_ebon_parser.classify import FOOTER_RULES, classify_line
+
+CORPUS_DIR = Path(__file__).resolve().parent.parent / 'examples' / 'eBons_txt_anonymized'
+
+
+def load_lines(corpus_dir: Path):
+    """Load the normalized, non-empty lines of every text eBon in a folder."""
+    lines = []
+    for path in sorted(corpus_dir.glob('*.txt')):
+        text = path.read_text(encoding='utf-8')
+        lines.extend(filter(None, map(str.strip, text.replace('  ', ' ').split('\n'))))
+    return lines
+
+
+def sequential_classify(line, loyalty_program=None):
+    """Reference implementation: one ``re.match`` per rule, in order."""
+    for rule in FOOTER_RULES:
+        if rule.loyalty_program is not None and rule.loyalty_program != loyalty_program:
+            continue
+        match_fn = re.search if rule.search else re.match
+        match = match_fn(rule.pattern.pattern, line)
+        if match and not any(excluded in line for excluded in rule.excludes):
+            return rule.kind, match
+    return None
+
+
+def measure(classify, lines, repeat):
+    """Return lines per second for a classifier function."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for line in lines:
+            classify(line, 'REWE Bonus')
+    elapsed = time.perf_counter() - start
+    return len(lines) * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=200, help='Number of passes over the corpus.')
+    args = parser.parse_args()
+
+    lines = load_lines(CORPUS_DIR)
+    for line in lines:
+        before = sequential_classify(line, 'REWE Bonus')
+        after = classify_line(line, 'REWE Bonus')
+        assert (before and before[0]) == (after and after[0]), line
+
+    before = measure(sequential_classify, lines, args.repeat)
+    after = measure(classify_line, lines, args.repeat)
+    print(f"Corpus: {len(lines)} lines from {CORPUS_DIR}")
+    print(f"sequential re.match: {before:12,.0f} lines/sec")
+    print(f"classify_line:       {after:12,.0f} lines/sec ({after / before:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
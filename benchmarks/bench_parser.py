@@ -0,0 +1,111 @@
+# benchmarks/bench_parser.py
+"""
+Throughput benchmark of the text parser, anonymizer and CSV writer.
+
+Generates synthetic receipts with ``synthetic_corpus.py`` and measures
+``parse_text_ebon``, ``anonymize_text_content`` and ``dump_items_to_csv`` at
+several corpus sizes, reporting receipts per second. ``parse_text_ebon`` is
+also measured on long receipts with a fixed number of items, so work that
+grows with receipt length shows up. Results can be saved as JSON and
+compared against an earlier run to catch regressions.
+
+Usage:
+    python benchmarks/bench_parser.py [--sizes 1 100 10000] [--long-items 200 800]
+        [--repeat N] [--save results.json] [--compare baseline.json [--tolerance 0.2]]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rewe_ebon_parser.parse import parse_text_ebon
+from rewe_ebon_parser.privacy import anonymize_text_content
+from rewe_ebon_parser.table import dump_items_to_csv
+
+from synthetic_corpus import generate_corpus, load_templates
+
+
+def best_of(function, repeat):
+    """Return the fastest wall time of ``repeat`` calls of ``function``."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+LONG_RECEIPTS = 20
+
+
+def run(sizes, long_items, repeat, seed):
+    """Measure every stage at every corpus size and the parser on long receipts; return receipts/sec by name."""
+    templates = load_templates()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = Path(tmp_dir) / 'items.csv'
+        for size in sizes:
+            texts = list(generate_corpus(size, seed, templates))
+            receipts = [parse_text_ebon(text, strict=True) for text in texts]
+            stages = {
+                'parse_text_ebon': lambda: [parse_text_ebon(text, strict=True) for text in texts],
+                'anonymize_text_content': lambda: [anonymize_text_content(text) for text in texts],
+                'dump_items_to_csv': lambda: dump_items_to_csv(receipts, csv_path),
+            }
+            item_count = sum(len(receipt['items']) for receipt in receipts)
+            print(f"{size} receipts, {item_count} items")
+            for stage, function in stages.items():
+                # Large corpora are slow enough that one pass gives a stable number
+                elapsed = best_of(function, repeat if size < 10000 else 1)
+                results[f"{stage}@{size}"] = size / elapsed
+                print(f"  {stage:24s} {size / elapsed:12,.0f} receipts/sec  ({elapsed * 1000:9.2f} ms)")
+
+    for item_count in long_items:
+        texts = list(generate_corpus(LONG_RECEIPTS, seed, templates, item_count))
+        elapsed = best_of(lambda: [parse_text_ebon(text, strict=True) for text in texts], repeat)
+        results[f"parse_text_ebon@{item_count}items"] = LONG_RECEIPTS / elapsed
+        print(f"{LONG_RECEIPTS} receipts of {item_count} items")
+        print(f"  {'parse_text_ebon':24s} {LONG_RECEIPTS / elapsed:12,.0f} receipts/sec  ({elapsed * 1000:9.2f} ms)")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print the change against a baseline; return the names of regressed measurements."""
+    regressions = []
+    print(f"Compared to baseline (tolerance {tolerance:.0%}):")
+    for name, value in results.items():
+        if name not in baseline:
+            continue
+        change = value / baseline[name] - 1
+        flag = ''
+        if change < -tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"  {name:32s} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000], help='Corpus sizes in receipts.')
+    parser.add_argument('--long-items', type=int, nargs='*', default=[200, 800], help='Item counts of the long-receipt measurements.')
+    parser.add_argument('--repeat', type=int, default=5, help='Passes per measurement; the fastest counts.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic corpus.')
+    parser.add_argument('--save', type=Path, help='Write the results as JSON.')
+    parser.add_argument('--compare', type=Path, help='JSON results of an earlier run to compare against.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative slowdown before --compare fails.')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.long_items, args.repeat, args.seed)
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+# benchmarks/synthetic_corpus.py
+"""
+Synthetic eBon corpus generator.
+
+Builds realistic receipt texts from the anonymized example eBons: item names,
+prices, tax categories and per-unit prices are harvested from the templates
+and recombined into receipts with varying item counts, quantity and weight
+lines, discounts, both tax categories, cash or card payments and PAYBACK or
+REWE Bonus blocks. Every generated receipt adds up, so it parses with
+``parse_text_ebon(text, strict=True)``.
+
+Usage:
+    python benchmarks/synthetic_corpus.py COUNT OUTPUT_FOLDER [--seed N]
+"""
+import argparse
+import random
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / 'examples' / 'eBons_txt_anonymized'
+
+TAX_RATES = {'A': 19, 'B': 7}
+
+MARKETS = [
+    ('Von-Bodelschwingh-Str. 6', '51061', 'Köln-Höhenhaus', '0449'),
+    ('Hauptstr. 12', '10115', 'Berlin', '1234'),
+    ('Leopoldstr. 80', '80802', 'München', '3310'),
+    ('Bahnhofstr. 3-5', '20095', 'Hamburg', '0712'),
+]
+
+PAYMENT_METHODS = ['BAR', 'EC-Cash', 'American Express', 'VISA', 'Mastercard']
+
+ITEM_LINE = re.compile(r'^(.+?) (-?\d+,\d\d) ([ABC])( \*)?$')
+QUANTITY_LINE = re.compile(r'^(\d+) Stk x (\d+,\d\d)$')
+WEIGHT_LINE = re.compile(r'^\d+,\d+ kg x (\d+,\d\d) EUR/kg$')
+PRICE = re.compile(r'-?\d+,\d\d')
+BONUS_COUPON_LINE = re.compile(r'^(.+ auf .+) \d+,\d\d EUR$')
+
+
+def _cents(amount: str) -> int:
+    return int(amount.replace(',', '').replace('-', '')) * (-1 if amount.startswith('-') else 1)
+
+
+def _eur(cents: int) -> str:
+    sign = '-' if cents < 0 else ''
+    cents = abs(cents)
+    return f"{sign}{cents // 100},{cents % 100:02d}"
+
+
+def load_templates(template_dir: Path = TEMPLATE_DIR) -> Dict[str, list]:
+    """
+    Harvest the building blocks of synthetic receipts from text eBons.
+
+    Args:
+        template_dir (Path): Folder of ``.txt`` eBons.
+
+    Returns:
+        Dict[str, list]: ``items`` as ``(name, unit price in cents, tax category,
+        deposit flag, unit)`` tuples, with unit ``'Stk'`` or ``'kg'``, and
+        ``bonus_coupons`` as coupon descriptions.
+    """
+    items = {}
+    bonus_coupons = set()
+    for path in sorted(template_dir.glob('*.txt')):
+        lines = [line.strip() for line in path.read_text(encoding='utf-8').splitlines() if line.strip()]
+        for line, next_line in zip(lines, lines[1:] + ['']):
+            coupon_hit = BONUS_COUPON_LINE.match(line)
+            if coupon_hit:
+                bonus_coupons.add(coupon_hit.group(1))
+                continue
+            item_hit = ITEM_LINE.match(line)
+            # Skip discounts, merged lines and names the quantity pattern would pick up
+            if not item_hit or (len(PRICE.findall(line)) > 1 and 'PFAND' not in line) or ' x ' in line:
+                continue
+            name, price, category, deposit = item_hit.groups()
+            unit_price = _cents(price)
+            if unit_price <= 0 or name.startswith('SUMME'):
+                continue
+            unit = 'Stk'
+            quantity_hit = QUANTITY_LINE.match(next_line)
+            weight_hit = WEIGHT_LINE.match(next_line)
+            if quantity_hit:
+                unit_price = _cents(quantity_hit.group(2))
+            elif weight_hit:
+                unit_price = _cents(weight_hit.group(1))
+                unit = 'kg'
+            category = category if category in TAX_RATES else 'A'
+            items[name] = (name, unit_price, category, bool(deposit), unit)
+    return {'items': sorted(items.values()), 'bonus_coupons': sorted(bonus_coupons)}
+
+
+def _item_count(rng: random.Random) -> int:
+    return min(150, max(1, int(rng.lognormvariate(2.5, 0.7))))
+
+
+def generate_receipt(rng: random.Random, templates: Dict[str, list], item_count: Optional[int] = None) -> str:
+    """
+    Generate the text of one synthetic receipt.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        templates (Dict[str, list]): Building blocks from ``load_templates``.
+        item_count (Optional[int]): Number of item lines. Random if not given.
+
+    Returns:
+        str: The receipt text, in the layout of extracted PDF text.
+    """
+    street, zip_code, city, market = rng.choice(MARKETS)
+    lines = [
+        f"****** {street} ******",
+        f"****** {zip_code} {city} ******",
+        f"****** Tel. 0221 {rng.randint(1000000, 9999999)} ******",
+        "UID Nr.: DE812706034",
+        "EUR",
+    ]
+
+    gross = {category: 0 for category in TAX_RATES}
+    for _ in range(item_count or _item_count(rng)):
+        name, unit_price, category, deposit, unit = rng.choice(templates['items'])
+        if unit == 'kg':
+            weight = rng.randint(100, 2500)
+            sub_total = round(weight * unit_price / 1000)
+            extra = f"{weight // 1000},{weight % 1000:03d} kg x {_eur(unit_price)} EUR/kg"
+        elif rng.random() < 0.15:
+            quantity = rng.randint(2, 12)
+            sub_total = quantity * unit_price
+            extra = f"{quantity} Stk x {_eur(unit_price)}"
+        else:
+            sub_total = unit_price
+            extra = None
+        lines.append(f"{name} {_eur(sub_total)} {category}{' *' if deposit else ''}")
+        if extra:
+            lines.append(extra)
+        gross[category] += sub_total
+
+    if rng.random() < 0.2:
+        for category in TAX_RATES:
+            discount = gross[category] * 5 // 100
+            if discount:
+                lines.append(f"Mitarbeiterrabatt5% {_eur(-discount)} {category}")
+                gross[category] -= discount
+
+    total = sum(gross.values())
+    lines += ["--------------------------------------", f"SUMME EUR {_eur(total)}", "======================================"]
+
+    method = rng.choice(PAYMENT_METHODS)
+    if method == 'BAR':
+        given = (total // 500 + 1) * 500
+        lines += [f"Geg. BAR EUR {_eur(given)}", f"Rückgeld BAR EUR {_eur(given - total)}"]
+    else:
+        lines += [f"Geg. {method} EUR {_eur(total)}", "* * Kundenbeleg * *"]
+
+    lines.append("Steuer % Netto Steuer Brutto")
+    net_total = tax_total = 0
+    for category, rate in TAX_RATES.items():
+        if gross[category]:
+            net = round(gross[category] * 100 / (100 + rate))
+            lines.append(f"{category}= {rate},0% {_eur(net)} {_eur(gross[category] - net)} {_eur(gross[category])}")
+            net_total += net
+            tax_total += gross[category] - net
+    lines.append(f"Gesamtbetrag {_eur(net_total)} {_eur(tax_total)} {_eur(total)}")
+
+    timestamp = datetime(2019, 1, 1, 7) + timedelta(days=rng.randint(0, 6 * 365), minutes=rng.randint(0, 14 * 60))
+    lines += [
+        f"{timestamp:%d.%m.%Y %H:%M} Bon-Nr.:{rng.randint(1, 9999)}",
+        f"Markt:{market} Kasse:{rng.randint(1, 9)} Bed.:{rng.randint(100000, 999999)}",
+    ]
+
+    loyalty = rng.random()
+    if loyalty < 0.35:
+        points_before = rng.randint(0, 20000)
+        points = max(total, 0) // 200
+        lines += [
+            "****************************************",
+            "Deine REWE PAYBACK Vorteile heute",
+            f"PAYBACK Karten-Nr.: #########{rng.randint(1000, 9999)}",
+            f"Punkte vor dem Einkauf: {points_before:,} Punkte".replace(',', '.'),
+            f"Punktestand entspricht: {_eur(points_before)} EUR",
+            f"Mit diesem Einkauf gesammelt: {points} Punkte",
+            "Keine Rabatte oder Punkte auf mit *",
+            "gekennzeichnete Produkte.",
+            "****************************************",
+        ]
+    elif loyalty < 0.7 and templates['bonus_coupons']:
+        coupons = rng.sample(templates['bonus_coupons'], rng.randint(0, min(4, len(templates['bonus_coupons']))))
+        coupon_values = [rng.randint(10, 300) for _ in coupons]
+        earned = sum(coupon_values) + max(total, 0) // 100
+        lines += [
+            "Deine REWE Bonus-Vorteile heute",
+            f"Mit diesem Einkauf hast du {_eur(earned)} EUR",
+            "REWE Bonus-Guthaben gesammelt:",
+        ]
+        if coupons:
+            lines.append("Bonus-Coupon(s)")
+            lines += [f"{coupon} {_eur(value)} EUR" for coupon, value in zip(coupons, coupon_values)]
+        lines.append(f"Aktuelles Bonus-Guthaben: {_eur(earned + rng.randint(0, 2000))} EUR")
+
+    lines += ["REWE Markt GmbH", "Sie haben Fragen?", "Antworten gibt es unter www.rewe.de"]
+    return '\n'.join(lines) + '\n'
+
+
+def generate_corpus(count: int, seed: int = 0, templates: Optional[Dict[str, list]] = None, item_count: Optional[int] = None) -> Iterator[str]:
+    """
+    Generate a reproducible stream of synthetic receipt texts.
+
+    Args:
+        count (int): Number of receipts.
+        seed (int): Random seed; the same seed yields the same corpus.
+        templates (Optional[Dict[str, list]]): Building blocks from ``load_templates``.
+            Loaded from the anonymized example eBons if not given.
+        item_count (Optional[int]): Number of item lines per receipt. Random if not given.
+
+    Yields:
+        str: One receipt text per receipt.
+    """
+    templates = templates or load_templates()
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield generate_receipt(rng, templates, item_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('count', type=int, help='Number of receipts to generate.')
+    parser.add_argument('output_folder', type=Path, help='Folder for the generated .txt eBons.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    args = parser.parse_args()
+
+    args.output_folder.mkdir(parents=True, exist_ok=True)
+    width = len(str(args.count))
+    for index, text in enumerate(generate_corpus(args.count, args.seed)):
+        (args.output_folder / f"synthetic_{index:0{width}d}.txt").write_text(text, encoding='utf-8')
+    print(f"Wrote {args.count} receipts to {args.output_folder}")
+
+
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,11 @@ from .parse import parse_ebon, parse_pdf_ebon
 __all__ = [
     "parse_ebon",
     "parse_pdf_ebon",
+    "parse_many",
+    "ParseResult",
+    "parse_ebon_async",
+    "parse_many_async",
+    "AsyncParser",
     "Receipt",
     "ReceiptItem",
     "LoyaltyData",
@@ -26,3 +31,14 @@ __all__ = [
     "PaybackDetails",
     "REWEBonusDetails",
 ]
+
+
+def __getattr__(name):
+    # The batch API pulls in the process pool machinery; load it on first access.
+    if name in ("parse_many", "ParseResult"):
+        from . import pipeline
+        return getattr(pipeline, name)
+    if name in ("parse_ebon_async", "parse_many_async", "AsyncParser"):
+        from . import aio
+        return getattr(aio, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,208 @@
+# src/rewe_ebon_parser/aio.py
+import asyncio
+import mmap
+import os
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Optional, Union
+from .classes import Receipt
+from .parse import PdfSource, _is_path, parse_ebon
+from .pipeline import ParseResult, worker_pool
+
+def _release_soon(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore):
+    """Release a semaphore on its event loop, from any thread."""
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # The event loop is closed, so nothing waits for the slot any more
+        pass
+
+class AsyncParser:
+    """
+    Parse eBons from asyncio code on a long-lived process pool.
+
+    The pool is started on first use and shared by all calls until ``close``,
+    so its startup is paid once rather than per request, and the CPU-heavy
+    text extraction never runs on the event loop. At most ``max_concurrency``
+    eBons are parsed at a time; further calls wait for a free slot.
+
+    A cancelled or timed-out call that is still waiting for a worker is
+    withdrawn from the pool. One that is already running in a worker cannot
+    be interrupted: its result is discarded when it completes, and its slot
+    is only freed then, so abandoned work never exceeds ``max_concurrency``.
+
+    Attributes:
+        max_workers (int): Number of worker processes.
+        max_concurrency (int): Maximum number of eBons parsed at a time.
+        max_tasks_per_child (Optional[int]): Replace worker processes after this many tasks, see ``worker_pool``.
+        extractor (str): The default text extraction backend, which the workers preload.
+    """
+    def __init__(self, max_workers: Optional[int] = None, max_concurrency: Optional[int] = None, max_tasks_per_child: Optional[int] = None, extractor: str = 'pdfplumber'):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.extractor = extractor
+        self._pool = None
+        self._semaphore = None
+        self._loop = None
+
+    def _slots(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; make a new one if the loop changed
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def parse_ebon(self, data_buffer: PdfSource, extractor: Optional[str] = None, as_object: bool = False, timeout: Optional[float] = None) -> Union[dict, Receipt]:
+        """
+        Parse receipt data from a PDF in a worker process.
+
+        Args:
+            data_buffer (PdfSource): The PDF data buffer, or a path to the PDF file.
+                Paths are opened by the worker; ``mmap`` and ``memoryview`` buffers
+                are copied to send them to it.
+            extractor (Optional[str]): The text extraction backend, see ``extract_raw_text``.
+                Defaults to the parser's ``extractor``.
+            as_object (bool): If True, return the ``Receipt`` object instead of its dictionary.
+            timeout (Optional[float]): Seconds to wait for the result once a
+                concurrency slot is free. No limit if not given.
+
+        Returns:
+            Union[dict, Receipt]: The parsed receipt data.
+
+        Raises:
+            asyncio.TimeoutError: If the timeout expires.
+            RuntimeError: If the parser has been closed.
+            ValueError: If the date is missing or the items do not add up to the total.
+        """
+        if _is_path(data_buffer):
+            data_buffer = Path(data_buffer)
+        elif isinstance(data_buffer, (mmap.mmap, memoryview)):
+            data_buffer = bytes(data_buffer)
+        slots = self._slots()
+        await slots.acquire()
+        try:
+            if self._pool is None:
+                self._pool = worker_pool(self.max_workers, self.max_tasks_per_child, self.extractor)
+            job = self._pool.submit(parse_ebon, data_buffer, extractor or self.extractor, as_object)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the worker is done with the eBon, even after a timeout or cancellation
+        loop = asyncio.get_running_loop()
+        job.add_done_callback(lambda _: _release_soon(loop, slots))
+        return await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+
+    async def parse_many(self, inputs: Iterable[PdfSource], extractor: Optional[str] = None, as_object: bool = False, timeout: Optional[float] = None) -> AsyncIterator[ParseResult]:
+        """
+        Parse many eBons concurrently, yielding results as they complete.
+
+        Inputs are taken from ``inputs`` only as earlier ones complete, so at
+        most ``max_concurrency`` of them are held in memory and ``inputs`` may
+        be a lazy iterable of any length. A failing or timed-out input is
+        reported in its ``ParseResult`` and does not affect the rest of the
+        batch. Closing the generator early cancels the inputs in flight.
+
+        Args:
+            inputs (Iterable[PdfSource]): PDF file paths or PDF data buffers.
+            extractor (Optional[str]): The text extraction backend, see ``extract_raw_text``.
+                Defaults to the parser's ``extractor``.
+            as_object (bool): If True, return ``Receipt`` objects instead of dictionaries.
+            timeout (Optional[float]): Per-input timeout, see ``parse_ebon``.
+
+        Yields:
+            ParseResult: The outcome of each input, in completion order.
+        """
+        async def parse_one(index, item):
+            source = Path(item) if _is_path(item) else None
+            try:
+                result = await self.parse_ebon(item, extractor, as_object, timeout)
+            except Exception as e:
+                return ParseResult(index, source, None, e)
+            return ParseResult(index, source, result, None)
+
+        inputs = enumerate(inputs)
+        tasks = set()
+        try:
+            while True:
+                while len(tasks) < self.max_concurrency:
+                    entry = next(inputs, None)
+                    if entry is None:
+                        break
+                    tasks.add(asyncio.ensure_future(parse_one(*entry)))
+                if not tasks:
+                    break
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def close(self, wait: bool = True):
+        """
+        Shut down the process pool, cancelling the tasks that have not started.
+
+        The parser can be used again afterwards; it then starts a new pool.
+
+        Args:
+            wait (bool): If True, block until the running tasks have finished.
+        """
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    async def __aenter__(self) -> 'AsyncParser':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+_shared_parser: Optional[AsyncParser] = None
+
+def shared_parser() -> AsyncParser:
+    """
+    Get the process-wide parser used by ``parse_ebon_async`` and ``parse_many_async``.
+
+    Returns:
+        AsyncParser: The shared parser, created with the default settings on first use.
+    """
+    global _shared_parser
+    if _shared_parser is None:
+        _shared_parser = AsyncParser()
+    return _shared_parser
+
+async def parse_ebon_async(data_buffer: PdfSource, extractor: Optional[str] = None, as_object: bool = False, timeout: Optional[float] = None) -> Union[dict, Receipt]:
+    """
+    Parse receipt data from a PDF on the shared process pool.
+
+    See ``AsyncParser.parse_ebon``; create an ``AsyncParser`` to choose the
+    pool size and concurrency limit.
+
+    Args:
+        data_buffer (PdfSource): The PDF data buffer, or a path to the PDF file.
+        extractor (Optional[str]): The text extraction backend, see ``extract_raw_text``.
+            Defaults to the shared parser's ``extractor``.
+        as_object (bool): If True, return the ``Receipt`` object instead of its dictionary.
+        timeout (Optional[float]): Seconds to wait for the result once a concurrency slot is free.
+
+    Returns:
+        Union[dict, Receipt]: The parsed receipt data.
+    """
+    return await shared_parser().parse_ebon(data_buffer, extractor, as_object, timeout)
+
+def parse_many_async(inputs: Iterable[PdfSource], extractor: Optional[str] = None, as_object: bool = False, timeout: Optional[float] = None) -> AsyncIterator[ParseResult]:
+    """
+    Parse many eBons on the shared process pool, see ``AsyncParser.parse_many``.
+
+    Args:
+        inputs (Iterable[PdfSource]): PDF file paths or PDF data buffers.
+        extractor (Optional[str]): The text extraction backend, see ``extract_raw_text``.
+            Defaults to the shared parser's ``extractor``.
+        as_object (bool): If True, return ``Receipt`` objects instead of dictionaries.
+        timeout (Optional[float]): Per-input timeout.
+
+    Returns:
+        AsyncIterator[ParseResult]: The outcome of each input, in completion order.
+    """
+    return shared_parser().parse_many(inputs, extractor, as_object, timeout)
@@ -0,0 +1,117 @@
+# src/rewe_ebon_parser/archive.py
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Iterator, NamedTuple, Optional, Union
+
+ZIP_SUFFIXES = ('.zip',)
+TAR_SUFFIXES = ('.tar', '.tgz', '.tbz2', '.txz', '.tar.gz', '.tar.bz2', '.tar.xz')
+# Joins the folders of a member path into its file name
+MEMBER_PATH_SEPARATOR = '__'
+
+class ArchiveMember(NamedTuple):
+    """
+    A PDF read from an archive.
+
+    Attributes:
+        archive (Path): The archive file.
+        name (str): The member's path inside the archive.
+        data (bytes): The member's content.
+    """
+    archive: Path
+    name: str
+    data: bytes
+
+    @property
+    def file_name(self) -> str:
+        """
+        The member's path inside the archive as a single file name, e.g.
+        ``2023__1.pdf`` for ``2023/1.pdf``. Output files and log entries are
+        named after it, so members with the same name in different folders
+        do not overwrite each other.
+        """
+        parts = [part for part in PurePosixPath(self.name).parts if part not in ('/', '..')]
+        return MEMBER_PATH_SEPARATOR.join(parts)
+
+    @property
+    def path(self) -> Path:
+        """The member's ``file_name`` below the archive path, e.g. ``exports.zip/2023__1.pdf``."""
+        return self.archive / self.file_name
+
+def is_archive_path(path: Union[str, Path]) -> bool:
+    """
+    Check whether a path names a zip or tar archive, optionally compressed.
+
+    Args:
+        path (Union[str, Path]): The file path.
+
+    Returns:
+        bool: True for ``.zip``, ``.tar`` and compressed tar files.
+    """
+    name = Path(path).name.lower()
+    return name.endswith(ZIP_SUFFIXES + TAR_SUFFIXES)
+
+def archive_stem(path: Union[str, Path]) -> str:
+    """
+    Get the name of an archive without its archive suffix, e.g. ``exports`` for ``exports.tar.gz``.
+
+    Args:
+        path (Union[str, Path]): The archive path.
+
+    Returns:
+        str: The file name without the archive suffix.
+    """
+    name = Path(path).name
+    for suffix in sorted(ZIP_SUFFIXES + TAR_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(path).stem
+
+def count_archive_pdfs(path: Union[str, Path]) -> Optional[int]:
+    """
+    Count the PDFs in an archive, where that is cheap.
+
+    Args:
+        path (Union[str, Path]): Path to the archive.
+
+    Returns:
+        Optional[int]: The number of PDF members of a zip archive, read from its
+        central directory. None for tar archives, which would have to be
+        decompressed in full to count them.
+    """
+    if not Path(path).name.lower().endswith(ZIP_SUFFIXES):
+        return None
+    with zipfile.ZipFile(path) as archive:
+        return sum(1 for info in archive.infolist() if not info.is_dir() and info.filename.lower().endswith('.pdf'))
+
+def iter_archive_pdfs(path: Union[str, Path]) -> Iterator[ArchiveMember]:
+    """
+    Read the PDFs of a zip or tar archive one member at a time.
+
+    Members are read straight from the archive into memory, without writing
+    temporary files. Tar archives, compressed or not, are read as a stream
+    in a single pass, so only the member being read is decompressed.
+
+    Args:
+        path (Union[str, Path]): Path to the archive.
+
+    Yields:
+        ArchiveMember: Each PDF member, in archive order.
+
+    Raises:
+        ValueError: If the path is not a zip or tar archive.
+    """
+    path = Path(path)
+    name = path.name.lower()
+    if name.endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith('.pdf'):
+                    yield ArchiveMember(path, info.filename, archive.read(info))
+    elif name.endswith(TAR_SUFFIXES):
+        with tarfile.open(path, 'r|*') as archive:
+            for info in archive:
+                if info.isfile() and info.name.lower().endswith('.pdf'):
+                    yield ArchiveMember(path, info.name, archive.extractfile(info).read())
+    else:
+        raise ValueError(f"Not a zip or tar archive: '{path}'.")
@@ -0,0 +1,168 @@
+# src/rewe_ebon_parser/cache.py
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+from . import __version__
+from .serialize import dumps, load_json_file
+
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Version of the cached receipt format, mixed into every key. Bump it whenever
+# the parse output changes without a new package version, so results cached
+# before the change are not returned (2: NaN written as null, 3: bonNr field).
+CACHE_FORMAT = 3
+
+def default_cache_dir() -> Path:
+    """
+    Get the default on-disk location of the parse-result cache.
+
+    The ``REWE_EBON_PARSER_CACHE_DIR`` environment variable takes precedence,
+    followed by the platform's user cache directory.
+
+    Returns:
+        Path: The cache directory.
+    """
+    env_dir = os.environ.get('REWE_EBON_PARSER_CACHE_DIR')
+    if env_dir:
+        return Path(env_dir)
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'rewe-ebon-parser'
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of parsed receipts.
+
+    Entries are keyed by the SHA-256 of the PDF bytes, the parser version,
+    ``CACHE_FORMAT`` and the text extraction backend, so changed files,
+    parser upgrades and output format changes never return stale results. Each
+    entry is a compact JSON file whose modification time is bumped on every
+    hit; ``prune`` evicts the least recently used entries once the cache
+    grows beyond ``max_bytes``.
+
+    Entries hold the receipts as parsed, before any anonymization, so runs
+    that preserve privacy only read the cache through ``read_only_copy``.
+
+    Attributes:
+        cache_dir (Path): Directory holding the cache entries.
+        max_bytes (int): Size cap enforced by ``prune``.
+        parser_version (str): Parser version mixed into every key.
+        read_only (bool): If True, ``put`` stores nothing.
+    """
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_bytes: int = DEFAULT_CACHE_MAX_BYTES, parser_version: str = __version__, read_only: bool = False):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.parser_version = parser_version
+        self.read_only = read_only
+
+    def read_only_copy(self) -> 'ResultCache':
+        """
+        Get a view of the same cache that looks up entries but never stores any.
+
+        Returns:
+            ResultCache: The read-only cache.
+        """
+        return ResultCache(self.cache_dir, self.max_bytes, self.parser_version, read_only=True)
+
+    def key(self, data: bytes, extractor: str = 'pdfplumber') -> str:
+        """
+        Compute the cache key of a PDF.
+
+        Args:
+            data (bytes): The PDF data buffer.
+            extractor (str): The text extraction backend the PDF is parsed with.
+
+        Returns:
+            str: The hex digest identifying the PDF, parser version, cache format and extractor.
+        """
+        digest = hashlib.sha256(data)
+        digest.update(f"\0{self.parser_version}\0{CACHE_FORMAT}\0{extractor}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / (key + '.json')
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached receipt.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[dict]: The cached receipt dictionary, or None on a miss.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            result = load_json_file(entry_path)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        return result
+
+    def put(self, key: str, result: dict):
+        """
+        Store a parsed receipt, unless the cache is read-only.
+
+        The entry is written to a temporary file first and then moved into
+        place, so concurrent workers never see partial entries.
+
+        Args:
+            key (str): The cache key.
+            result (dict): The parsed receipt dictionary.
+        """
+        if self.read_only:
+            return
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(dumps(result, compact=True))
+                os.replace(tmp_path, entry_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Failed to write cache entry {entry_path}: {e}", file=sys.stderr)
+
+    def prune(self) -> int:
+        """
+        Evict least recently used entries until the cache fits ``max_bytes``.
+
+        Returns:
+            int: The number of evicted entries.
+        """
+        if not self.cache_dir.is_dir():
+            return 0
+        entries = []
+        total_size = 0
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith('.json'):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        evicted = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total_size -= size
+            evicted += 1
+        return evicted
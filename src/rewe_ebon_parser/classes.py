@@ -19,6 +19,8 @@ class MarketAddress:
         zip (str): The ZIP code of the market.
         city (str): The city where the market is located.
     """
+    __slots__ = ('street', 'zip', 'city')
+
     def __init__(self, street: str, zip: str, city: str):
         """
         Initializes a MarketAddress instance.
@@ -58,6 +60,8 @@ class ReceiptItem:
         unit (Optional[str]): The unit of the item.
         price_per_unit (Optional[float]): The price per unit of the item.
     """
+    __slots__ = ('tax_category', 'name', 'sub_total', 'amount', 'unit', 'price_per_unit', 'loyalty_program_qualified')
+
     def __init__(self, tax_category: str, name: str, sub_total: float, amount: float, unit: Optional[str] = None, price_per_unit: Optional[float] = None, loyalty_program_qualified: Optional[str] = None):
         self.tax_category = tax_category
         self.name = name
@@ -95,6 +99,8 @@ class Payment:
         type (str): The type of payment.
         value (float): The value of the payment.
     """
+    __slots__ = ('type', 'value')
+
     def __init__(self, type: str, value: float):
         self.type = type
         self.value = value
@@ -121,6 +127,8 @@ class TaxDetailsEntry:
         tax (float): The tax amount.
         gross (float): The gross amount.
     """
+    __slots__ = ('tax_percent', 'net', 'tax', 'gross')
+
     def __init__(self, tax_percent: float, net: float, tax: float, gross: float):
         self.tax_percent = tax_percent
         self.net = net
@@ -153,6 +161,8 @@ class TaxDetails:
         B (Optional[TaxDetailsEntry]): The tax details entry for category B.
         C (Optional[TaxDetailsEntry]): The tax details entry for category C.
     """
+    __slots__ = ('total', 'A', 'B', 'C')
+
     def __init__(self, total: TaxDetailsEntry, A: Optional[TaxDetailsEntry] = None, B: Optional[TaxDetailsEntry] = None, C: Optional[TaxDetailsEntry] = None):
         self.total = total
         self.A = A
@@ -185,6 +195,8 @@ class PaybackCoupon:
         name (str): The name of the coupon.
         points (int): The points of the coupon.
     """
+    __slots__ = ('name', 'points')
+
     def __init__(self, name: str, points: int):
         self.name = name
         self.points = points
@@ -214,6 +226,8 @@ class PaybackDetails:
         new_rewe_credit (Optional[float]): The new REWE credit.
         payback_revenue (float): The payback revenue.
     """
+    __slots__ = ('card', 'points_before', 'earned_points', 'used_coupons', 'used_rewe_credit', 'new_rewe_credit', 'payback_revenue')
+
     def __init__(self, card: str, points_before: float, earned_points: int, used_coupons: List[PaybackCoupon], used_rewe_credit: Optional[float], new_rewe_credit: Optional[float], payback_revenue: float):
         self.card = card
         self.points_before = points_before
@@ -277,6 +291,7 @@ class PaybackDetails:
 
 class REWEBonusCoupon:
     """Represents a coupon redeemed within the REWE Bonus program."""
+    __slots__ = ('name', 'value')
 
     def __init__(self, name: str, value: float):
         self.name = name
@@ -290,6 +305,7 @@ class REWEBonusCoupon:
 
 class REWEBonusDetails:
     """Holds REWE Bonus loyalty data for a receipt."""
+    __slots__ = ('earned_credit', 'used_credit', 'new_total_credit', 'used_coupons')
 
     def __init__(self, earned_credit: float, used_credit: Optional[float], new_total_credit: Optional[float], used_coupons: List[REWEBonusCoupon]):
         self.earned_credit = earned_credit
@@ -310,6 +326,7 @@ class REWEBonusDetails:
 
 class LoyaltyData:
     """Generic container describing which loyalty program is associated with the receipt."""
+    __slots__ = ('program', 'details')
 
     def __init__(self, program: str, details: Union[PaybackDetails, REWEBonusDetails]):
         self.program = program
@@ -339,8 +356,11 @@ class Receipt:
         payout (Optional[float]): The payout amount.
         loyalty (Optional[LoyaltyData]): Loyalty program data for the receipt.
         tax_details (TaxDetails): The tax details.
+        bon_nr (Optional[str]): The receipt number printed next to the date (``Bon-Nr.``).
     """
-    def __init__(self, date: datetime, market: str, market_address: Optional[MarketAddress], cashier: str, checkout: str, vatin: str, items: List[ReceiptItem], total: float, given: List[Payment], change: Optional[float], payout: Optional[float], loyalty: Optional[LoyaltyData], tax_details: TaxDetails):
+    __slots__ = ('date', 'market', 'market_address', 'cashier', 'checkout', 'vatin', 'items', 'total', 'given', 'change', 'payout', 'loyalty', 'tax_details', 'bon_nr')
+
+    def __init__(self, date: datetime, market: str, market_address: Optional[MarketAddress], cashier: str, checkout: str, vatin: str, items: List[ReceiptItem], total: float, given: List[Payment], change: Optional[float], payout: Optional[float], loyalty: Optional[LoyaltyData], tax_details: TaxDetails, bon_nr: Optional[str] = None):
         self.date = date
         self.market = market
         self.market_address = market_address
@@ -354,11 +374,15 @@ class Receipt:
         self.payout = payout
         self.loyalty = loyalty
         self.tax_details = tax_details
+        self.bon_nr = bon_nr
     
     def to_dict(self):
         """
         Converts the Receipt instance to a dictionary.
 
+        The keys are emitted in their output order in a single pass, and
+        optional fields that are not set are left out.
+
         Returns:
             dict: A dictionary representation of the Receipt instance.
         """
@@ -366,19 +390,22 @@ class Receipt:
             'datetime_local': self.date.isoformat(timespec='seconds'),
             'datetime_utc': self.date.astimezone(pytz.utc).isoformat(),
             'market': self.market,
-            'marketAddress': self.market_address.to_dict() if self.market_address else None,
-            'cashier': self.cashier,
-            'checkout': self.checkout,
-            'vatin': self.vatin,
-            'items': [item.to_dict() for item in self.items],
-            'total': self.total,
-            'given': [payment.to_dict() for payment in self.given],
-            'taxDetails': self.tax_details.to_dict()
         }
+        if self.market_address is not None:
+            data['marketAddress'] = self.market_address.to_dict()
+        data['cashier'] = self.cashier
+        data['checkout'] = self.checkout
+        if self.bon_nr is not None:
+            data['bonNr'] = self.bon_nr
+        data['vatin'] = self.vatin
+        data['items'] = [item.to_dict() for item in self.items]
+        data['total'] = self.total
+        data['given'] = [payment.to_dict() for payment in self.given]
         if self.change is not None:
             data['change'] = self.change
-        if self.loyalty is not None:
-            data['loyalty'] = self.loyalty.to_dict()
         if self.payout is not None:
             data['payout'] = self.payout
+        if self.loyalty is not None:
+            data['loyalty'] = self.loyalty.to_dict()
+        data['taxDetails'] = self.tax_details.to_dict()
         return data
@@ -0,0 +1,173 @@
+# src/rewe_ebon_parser/classify.py
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Length of the literal line prefix used as dispatch key. Every prefix-anchored
+# rule below has a literal prefix of at least this many characters.
+PREFIX_KEY_LENGTH = 3
+
+DATE_PATTERN = re.compile(r'(\d{2})\.(\d{2})\.(\d{4}) (\d{2}):(\d{2}) Bon-Nr\.:\s*(\d+)?')
+
+
+class LineRule:
+    """
+    Describes how to recognise one kind of header/footer line.
+
+    A rule is either anchored at the start of the line (``prefixes``) or may
+    match anywhere in it (``contains``). The literal gate is checked with plain
+    string operations before the precompiled pattern is tried, so most lines
+    never reach the regex engine for most rules.
+
+    Attributes:
+        kind (str): Name of the line kind, e.g. ``'total'`` or ``'tax'``.
+        pattern (re.Pattern): The precompiled pattern.
+        prefixes (Tuple[str, ...]): Literal prefixes the line must start with.
+        contains (Optional[str]): Literal substring the line must contain.
+        search (bool): If True, use ``pattern.search`` instead of ``pattern.match``.
+        loyalty_program (Optional[str]): Only apply the rule for this loyalty program.
+        excludes (Tuple[str, ...]): Substrings that disqualify a line.
+    """
+    __slots__ = ('kind', 'pattern', 'prefixes', 'contains', 'search', 'loyalty_program', 'excludes')
+
+    def __init__(self, kind: str, pattern: str, prefixes: Sequence[str] = (), contains: Optional[str] = None,
+                 search: bool = False, loyalty_program: Optional[str] = None, excludes: Sequence[str] = ()):
+        if bool(prefixes) == bool(contains):
+            raise ValueError(f"Rule '{kind}' needs either prefixes or a contains gate.")
+        if any(len(prefix) < PREFIX_KEY_LENGTH for prefix in prefixes):
+            raise ValueError(f"Rule '{kind}' has a prefix shorter than {PREFIX_KEY_LENGTH} characters.")
+        self.kind = kind
+        self.pattern = re.compile(pattern)
+        self.prefixes = tuple(prefixes)
+        self.contains = contains
+        self.search = search
+        self.loyalty_program = loyalty_program
+        self.excludes = tuple(excludes)
+
+    def apply(self, line: str, loyalty_program: Optional[str] = None) -> Optional[re.Match]:
+        """
+        Try the rule against a line.
+
+        Args:
+            line (str): A stripped receipt line.
+            loyalty_program (Optional[str]): The loyalty program detected for the receipt.
+
+        Returns:
+            Optional[re.Match]: The match or None.
+        """
+        if self.loyalty_program is not None and self.loyalty_program != loyalty_program:
+            return None
+        if self.prefixes:
+            if not line.startswith(self.prefixes):
+                return None
+        elif self.contains not in line:
+            return None
+        match = self.pattern.search(line) if self.search else self.pattern.match(line)
+        if match is None:
+            return None
+        for excluded in self.excludes:
+            if excluded in line:
+                return None
+        return match
+
+
+# Header and footer line rules in priority order: when several rules match a
+# line, the first one listed wins.
+FOOTER_RULES: List[LineRule] = [
+    LineRule('total', r'SUMME EUR (-?\d*,\d\d)', prefixes=('SUMME EUR ',)),
+    LineRule('given', r'Geg\.(.*) EUR ([0-9,]*)', prefixes=('Geg.',)),
+    LineRule('change', r'Rückgeld BAR EUR ([0-9,]*)', prefixes=('Rückgeld BAR EUR ',)),
+    LineRule('payout', r'AUSZAHLUNG EUR ([0-9,]*)', prefixes=('AUSZAHLUNG EUR ',)),
+    LineRule('date', DATE_PATTERN.pattern, contains='Bon-Nr.:', search=True),
+    LineRule('market', r'Markt:(.*) Kasse:(.*) Bed\.:(.*)', prefixes=('Markt:',)),
+    LineRule('uid', r'UID Nr.: (.*)', prefixes=('UID Nr',)),
+    LineRule('payback_info', r'PAYBACK Karten-Nr\.: ([0-9#]*)Punkte vor dem Einkauf: ([0-9.,]*) Punkte',
+             prefixes=('PAYBACK Karten-Nr.: ',)),
+    LineRule('payback_points', r'Sie erhalten (\d*) PAYBACK Punkte? auf|Mit diesem Einkauf gesammelt: (\d*) Punkte?',
+             prefixes=('Sie erhalten ', 'Mit diesem Einkauf gesammelt: ')),
+    LineRule('payback_revenue', r'einen PAYBACK Umsatz von (.*) EUR!', prefixes=('einen PAYBACK Umsatz von ',)),
+    LineRule('payback_points_before', r'Punktestand vor Einkauf: ([0-9.]*)|Punkte vor dem Einkauf: ([0-9.]*)',
+             prefixes=('Punktestand vor Einkauf: ', 'Punkte vor dem Einkauf: ')),
+    LineRule('payback_card', r'PAYBACK Karten-Nr\.: ([0-9#]*)', prefixes=('PAYBACK Karten-Nr.: ',)),
+    LineRule('payback_coupon', r'(.*) ([0-9.]*) Punkte?', contains=' Punkt'),
+    LineRule('bonus_earned', r'Mit diesem Einkauf hast du ([0-9.,]+) EUR',
+             prefixes=('Mit diesem Einkauf hast du ',), loyalty_program='REWE Bonus'),
+    LineRule('bonus_used', r'Eingesetztes Bonus-Guthaben: ([0-9.,]+) EUR',
+             prefixes=('Eingesetztes Bonus-Guthaben: ',), loyalty_program='REWE Bonus'),
+    LineRule('bonus_total', r'Aktuelles Bonus-Guthaben: ([0-9.,]+) EUR',
+             prefixes=('Aktuelles Bonus-Guthaben: ',), loyalty_program='REWE Bonus'),
+    LineRule('bonus_coupon', r'(.*) ([0-9.,]+) EUR', contains=' EUR', loyalty_program='REWE Bonus',
+             excludes=('Bonus-Guthaben', 'Mit diesem Einkauf')),
+    LineRule('tax', r'([ABC])= ([0-9,]*)% ([0-9,]*) ([0-9,]*) ([0-9,]*)', prefixes=('A= ', 'B= ', 'C= ')),
+    LineRule('tax_total', r'Gesamtbetrag ([0-9,]*) ([0-9,]*) ([0-9,]*)', prefixes=('Gesamtbetrag ',)),
+    LineRule('used_rewe_credit', r'Eingesetztes REWE Guthaben: ([0-9,]*) EUR', prefixes=('Eingesetztes REWE Guthaben: ',)),
+    LineRule('new_rewe_credit', r'Neues REWE Guthaben: ([0-9,]*) EUR', prefixes=('Neues REWE Guthaben: ',)),
+]
+
+
+class LineClassifier:
+    """
+    Classifies receipt lines by dispatching on their leading characters.
+
+    Rules are bucketed by the first ``PREFIX_KEY_LENGTH`` characters of their
+    literal prefixes. Each bucket holds the prefix rules for that key merged
+    with the substring rules, in the original priority order, so classifying
+    a line only visits the few rules that can possibly match it.
+    """
+
+    def __init__(self, rules: Sequence[LineRule]):
+        self.rules = list(rules)
+        anywhere = [rule for rule in self.rules if not rule.prefixes]
+        self._default: Tuple[LineRule, ...] = tuple(anywhere)
+        self._buckets: Dict[str, Tuple[LineRule, ...]] = {}
+        keys = {prefix[:PREFIX_KEY_LENGTH] for rule in self.rules for prefix in rule.prefixes}
+        for key in keys:
+            self._buckets[key] = tuple(
+                rule for rule in self.rules
+                if not rule.prefixes or any(prefix.startswith(key) for prefix in rule.prefixes)
+            )
+
+    def candidates(self, line: str) -> Tuple[LineRule, ...]:
+        """
+        Get the rules that may apply to a line, in priority order.
+
+        Args:
+            line (str): A stripped receipt line.
+
+        Returns:
+            Tuple[LineRule, ...]: The candidate rules.
+        """
+        return self._buckets.get(line[:PREFIX_KEY_LENGTH], self._default)
+
+    def classify(self, line: str, loyalty_program: Optional[str] = None) -> Optional[Tuple[str, re.Match]]:
+        """
+        Classify a header or footer line.
+
+        Args:
+            line (str): A stripped receipt line.
+            loyalty_program (Optional[str]): The loyalty program detected for the receipt.
+
+        Returns:
+            Optional[Tuple[str, re.Match]]: The line kind and its match, or None.
+        """
+        for rule in self._buckets.get(line[:PREFIX_KEY_LENGTH], self._default):
+            match = rule.apply(line, loyalty_program)
+            if match is not None:
+                return rule.kind, match
+        return None
+
+
+_default_classifier = LineClassifier(FOOTER_RULES)
+
+
+def classify_line(line: str, loyalty_program: Optional[str] = None) -> Optional[Tuple[str, re.Match]]:
+    """
+    Classify a header or footer line with the default rule set.
+
+    Args:
+        line (str): A stripped receipt line.
+        loyalty_program (Optional[str]): The loyalty program detected for the receipt.
+
+    Returns:
+        Optional[Tuple[str, re.Match]]: The line kind and its match, or None.
+    """
+    return _default_classifier.classify(line, loyalty_program)
@@ -1,18 +1,226 @@
 # src/rewe_ebon_parser/cli.py
 import sys
+from typing import Optional
 from pathlib import Path
 import argparse
-from .output import process_pdf, process_folder
-from .table import dump_items_to_csv
+from functools import partial
+from .parse import EXTRACTORS
+from .cache import DEFAULT_CACHE_MAX_BYTES, ResultCache
+from .table import dump_items_to_csv, dump_to_parquet
+from .ndjson import dump_to_ndjson, is_ndjson_path, iter_ndjson
+from .archive import archive_stem, is_archive_path
+from .mail import DEFAULT_SENDER, is_mailbox_path
+from .serialize import is_receipt_json, load_json_file
 from . import __version__
-import json
+
+def _iter_json_receipts(json_files, preserve_privacy: bool = False):
+    """
+    Lazily load parsed receipts from JSON and NDJSON files.
+
+    Args:
+        json_files (Iterable[Path]): Paths to receipt JSON files or NDJSON files
+            holding one receipt per line.
+        preserve_privacy (bool): If True, anonymize each receipt.
+
+    Yields:
+        dict: Parsed receipt data.
+    """
+    for json_file in json_files:
+        if is_ndjson_path(json_file):
+            receipts = iter_ndjson(json_file)
+        else:
+            receipts = [load_json_file(json_file)]
+        for receipt in receipts:
+            if preserve_privacy:
+                from .privacy import anonymize_receipt_dict
+                receipt = anonymize_receipt_dict(receipt)
+            yield receipt
+
+def _dedupe_index(args, index_path: Path):
+    """
+    Load the duplicate index if ``--dedupe`` is given.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        index_path (Path): Location of the index file.
+
+    Returns:
+        Optional[DedupeIndex]: The index, or None without ``--dedupe``.
+    """
+    if not args.dedupe:
+        return None
+    from .dedupe import DedupeIndex
+    return DedupeIndex.load(index_path)
+
+def _table_index_path(table_path: Path) -> Path:
+    from .dedupe import DEDUPE_INDEX_NAME
+    return table_path.with_name(f"{table_path.stem}_{DEDUPE_INDEX_NAME}")
+
+def _run_folder(args, input_path: Path, output_path: Path, extractor: str, cache):
+    """
+    Process a folder of PDFs into a folder of JSON files.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        input_path (Path): Path to the input folder, or to a zip or tar archive.
+        output_path (Path): Path to the output folder.
+        extractor (str): The text extraction backend.
+        cache (Optional[ResultCache]): The parse-result cache.
+    """
+    from .incremental import sync_folder
+    from .output import process_folder
+
+    if args.incremental:
+        if input_path.is_file():
+            print("Error: --incremental is not supported with archive inputs.")
+            sys.exit(1)
+        if args.rawtext_file or args.rawtext_stdout:
+            print("Error: --incremental cannot be combined with --rawtext-file or --rawtext-stdout.")
+            sys.exit(1)
+        try:
+            sync_folder(input_path, output_path, None, args.nthreads, args.preserve_privacy, extractor, cache, args.profile, args.compact)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    else:
+        # MODIFICATION: Pass preserve_privacy flag
+        from .dedupe import DEDUPE_INDEX_NAME
+        process_folder(input_path, output_path, args.nthreads, args.rawtext_file, args.rawtext_stdout, args.preserve_privacy, extractor, cache, args.parse_workers,
+                       max_in_flight=args.max_in_flight, max_tasks_per_child=args.max_tasks_per_child, profile=args.profile,
+                       compact=args.compact, dedupe=_dedupe_index(args, output_path / DEDUPE_INDEX_NAME))
+
+def _run_mailbox(args, input_path: Path, output_path: Optional[Path], extractor: str, cache):
+    """
+    Parse the new eBon attachments of a mailbox into a folder of JSON files or a CSV table.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        input_path (Path): Path to the mbox file, Maildir, ``.eml`` file or folder of ``.eml`` files.
+        output_path (Optional[Path]): Path to the output folder or CSV table.
+        extractor (str): The text extraction backend.
+        cache (Optional[ResultCache]): The parse-result cache.
+    """
+    from .mail import sync_mailbox
+
+    if args.parquet or args.ndjson or args.sqlite or args.rawtext_file or args.rawtext_stdout:
+        print("Error: Mailbox inputs only support JSON folder and --csv-table outputs.")
+        sys.exit(1)
+    from .dedupe import DEDUPE_INDEX_NAME
+
+    output_folder = csv_path = None
+    if args.csv_table:
+        csv_path = output_path or input_path.with_name(input_path.stem + '.csv')
+        index_path = _table_index_path(csv_path)
+    else:
+        output_folder = output_path or input_path.with_name(input_path.stem + '_json_out')
+        index_path = output_folder / DEDUPE_INDEX_NAME
+    sync_mailbox(input_path, output_folder, csv_path, args.nthreads, args.preserve_privacy, extractor, cache,
+                 args.mail_sender, args.profile, args.compact, _dedupe_index(args, index_path))
+
+def _default_folder_output(input_path: Path, rawtext_file: bool, is_archive: bool) -> Path:
+    """
+    Get the default output folder for a folder or archive input.
+
+    Args:
+        input_path (Path): Path to the input folder or archive.
+        rawtext_file (bool): If True, the output holds raw text files.
+        is_archive (bool): If True, the input is a zip or tar archive.
+
+    Returns:
+        Path: ``rewe_json_out`` or ``rewe_txt_out`` inside an input folder, or
+        ``<archive>_json_out`` / ``<archive>_txt_out`` next to an archive.
+    """
+    kind = 'txt' if rawtext_file else 'json'
+    if is_archive:
+        return input_path.with_name(f"{archive_stem(input_path)}_{kind}_out")
+    return input_path / f"rewe_{kind}_out"
+
+def _add_cache_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the parse-result cache.")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Directory of the parse-result cache. Defaults to the user cache directory.")
+    parser.add_argument("--cache-max-size", type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024), help="Size cap of the parse-result cache in MB. Least recently used entries are evicted beyond it.")
+
+def _serve(argv):
+    """
+    Run the ``serve`` subcommand: a local HTTP parsing service.
+
+    Args:
+        argv (List[str]): The command line arguments after ``serve``.
+    """
+    from .server import DEFAULT_HOST, DEFAULT_MAX_UPLOAD_BYTES, DEFAULT_PORT, serve
+
+    parser = argparse.ArgumentParser(prog="rewe-ebon-parser serve", description="Serve eBon parsing over HTTP with a pre-warmed worker pool. POST PDFs to /parse; GET /health and /stats.")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help=f"Interface to listen on. Defaults to {DEFAULT_HOST}.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on. Defaults to {DEFAULT_PORT}.")
+    parser.add_argument("--nthreads", type=int, default=None, help="Number of worker processes. Defaults to maximum available CPU cores.")
+    parser.add_argument("--preserve-privacy", action="store_true", help="Anonymize sensitive data in all responses.")
+    parser.add_argument("--compact", action="store_true", help="Write JSON responses without indentation or whitespace.")
+    parser.add_argument("--extractor", choices=EXTRACTORS, default="pdfplumber", help="PDF text extraction backend. Defaults to 'pdfplumber'.")
+    parser.add_argument("--max-tasks-per-child", type=int, default=None, help="Restart each worker process after this many files. Requires Python 3.11 or later.")
+    parser.add_argument("--max-upload-size", type=int, default=DEFAULT_MAX_UPLOAD_BYTES // (1024 * 1024), help="Largest accepted request body in MB.")
+    _add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_max_size * 1024 * 1024)
+    serve(args.host, args.port, workers=args.nthreads, extractor=args.extractor, preserve_privacy=args.preserve_privacy,
+          cache=cache, compact=args.compact, max_tasks_per_child=args.max_tasks_per_child,
+          max_upload_bytes=args.max_upload_size * 1024 * 1024)
+
+def _watch(argv):
+    """
+    Run the ``watch`` subcommand: parse PDFs as they arrive in a folder.
+
+    Args:
+        argv (List[str]): The command line arguments after ``watch``.
+    """
+    from .watch import DEFAULT_POLL_SECONDS, DEFAULT_SETTLE_SECONDS, watch_folder
+
+    parser = argparse.ArgumentParser(prog="rewe-ebon-parser watch", description="Watch a folder and parse eBons as they arrive, appending each result to the chosen outputs.")
+    parser.add_argument("input_path", type=str, help="Folder to watch for PDF files.")
+    parser.add_argument("output_path", type=str, nargs='?', default=None, help="Folder for JSON files. Defaults to 'rewe_json_out' in the input folder unless --ndjson or --csv-table is given.")
+    parser.add_argument("--ndjson", type=str, default=None, metavar="OUT_JSONL", help="Append every parsed receipt to this NDJSON file.")
+    parser.add_argument("--csv-table", type=str, default=None, metavar="OUT_CSV", help="Append the items of every parsed receipt to this CSV table.")
+    parser.add_argument("--nthreads", type=int, default=None, help="Number of worker processes. Defaults to maximum available CPU cores.")
+    parser.add_argument("--preserve-privacy", action="store_true", help="Anonymize sensitive data in the outputs.")
+    parser.add_argument("--compact", action="store_true", help="Write JSON output files without indentation or whitespace.")
+    parser.add_argument("--extractor", choices=EXTRACTORS, default="pdfplumber", help="PDF text extraction backend. Defaults to 'pdfplumber'.")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS, help=f"Seconds a file must stay unchanged before it is parsed. Defaults to {DEFAULT_SETTLE_SECONDS}.")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_SECONDS, help=f"Seconds between folder scans when inotify is unavailable. Defaults to {DEFAULT_POLL_SECONDS}.")
+    parser.add_argument("--poll", action="store_true", help="Poll the folder even where inotify is available, e.g. on network file systems.")
+    parser.add_argument("--process-existing", action="store_true", help="Also parse the PDFs already in the folder at startup, except those with a JSON file in the output folder.")
+    _add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    input_path = Path(args.input_path)
+    if not input_path.is_dir():
+        print("Error: The input path of watch must be a directory.")
+        sys.exit(1)
+    output_path = Path(args.output_path) if args.output_path else None
+    if output_path is None and not args.ndjson and not args.csv_table:
+        output_path = input_path / 'rewe_json_out'
+    cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_max_size * 1024 * 1024)
+    watch_folder(input_path, output_path, Path(args.ndjson) if args.ndjson else None, Path(args.csv_table) if args.csv_table else None,
+                 args.nthreads, args.preserve_privacy, args.extractor, cache, args.compact, args.settle, args.poll_interval,
+                 args.process_existing, use_inotify=not args.poll)
 
 def main():
     """
     Main function to parse REWE eBons from PDF to JSON or CSV table.
     """
-    parser = argparse.ArgumentParser(description="Parse REWE eBons from PDF to JSON or CSV table.")
-    parser.add_argument("input_path", type=str, nargs='?', help="Path to input PDF file or folder containing PDF files.")
+    argv = sys.argv[1:]
+    if argv[:1] == ["serve"]:
+        _serve(argv[1:])
+        return
+    if argv[:1] == ["watch"]:
+        _watch(argv[1:])
+        return
+    if argv[:1] == ["--"]:
+        # A leading -- marks the next argument as the input path, e.g. a folder named watch
+        argv = argv[1:]
+
+    parser = argparse.ArgumentParser(description="Parse REWE eBons from PDF to JSON or CSV table.",
+                                     epilog="Run 'rewe-ebon-parser serve --help' for the HTTP parsing service and 'rewe-ebon-parser watch --help' to parse eBons as they arrive in a folder. To parse an input named serve or watch, put -- before it.")
+    parser.add_argument("input_path", type=str, nargs='?', help="Path to input PDF file, folder containing PDF files, zip or tar archive of PDF files, or mailbox (mbox file, Maildir or .eml files) with eBon mails.")
     parser.add_argument("output_path", type=str, nargs='?', default=None, help="Path to output JSON/CSV file or folder for JSON files.")
     parser.add_argument("--file", action="store_true", help="Specify if the input and output paths are files.")
     parser.add_argument("--folder", action="store_true", help="Specify if the input and output paths are folders.")
@@ -26,9 +234,22 @@ def main():
     parser.add_argument("--rawtext-file", action="store_true", help="Output raw text extracted from the PDF files to .txt files.")
     parser.add_argument("--rawtext-stdout", action="store_true", help="Print raw text extracted from the PDF files to the console.")
     parser.add_argument("--csv-table", action="store_true", help="Output all items from all parsed receipts into a single CSV table.")
+    parser.add_argument("--ndjson", type=str, default=None, metavar="OUT_JSONL", help="Stream all parsed receipts into a single NDJSON file, one compact receipt per line. A .gz, .bz2 or .xz suffix compresses it.")
+    parser.add_argument("--sqlite", type=str, default=None, metavar="DB", help="Write all parsed receipts into normalized tables of a SQLite database, updating receipts that were imported before.")
+    parser.add_argument("--parquet", action="store_true", help="Output typed items and receipts tables as Parquet files (items.parquet, receipts.parquet) into the output folder. Requires pyarrow.")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Number of separate processes parsing the extracted text while --nthreads processes extract it. Defaults to 0, parsing in the --nthreads processes right after extraction.")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Maximum number of files being processed at once. Bounds memory use on large folders. Defaults to four per --nthreads process.")
+    parser.add_argument("--max-tasks-per-child", type=int, default=None, help="Restart each worker process after this many files to bound its memory growth on long runs. Requires Python 3.11 or later.")
+    parser.add_argument("--profile", action="store_true", help="Print per-stage timing statistics (total, p50, p95, p99) and the 20 slowest files after processing a folder.")
+    parser.add_argument("--compact", action="store_true", help="Write JSON output files without indentation or whitespace.")
+    parser.add_argument("--extractor", choices=EXTRACTORS, default="pdfplumber", help="PDF text extraction backend. 'pdfium' is faster and falls back to 'pdfplumber' for unusual PDFs. Defaults to 'pdfplumber'.")
+    parser.add_argument("--incremental", action="store_true", help="Only process new or changed PDFs in a folder, tracked by a manifest in the output folder, and update the existing outputs in place.")
+    parser.add_argument("--dedupe", action="store_true", help="Skip PDFs that repeat an eBon processed before under another name, matched by file hash or by the date, receipt number, market and checkout, and log them as duplicates. The index persists next to the outputs.")
+    parser.add_argument("--mail-sender", type=str, default=DEFAULT_SENDER, help=f"Sender address or domain of the eBon mails when the input is a mailbox. Use '' to accept any sender. Defaults to '{DEFAULT_SENDER}'.")
+    _add_cache_arguments(parser)
     parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}", help="Show the version number and exit.")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Print help if no arguments are provided
     if len(sys.argv) == 1:
@@ -40,17 +261,27 @@ def main():
     max_workers = args.nthreads
     rawtext_file = args.rawtext_file
     rawtext_stdout = args.rawtext_stdout
+    extractor = args.extractor
+    cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_max_size * 1024 * 1024)
 
     # MODIFICATION START: Add logic for --txt-dump
     preserve_privacy = args.preserve_privacy
 
+    # Zip and tar archives of PDFs are processed like folders, without unpacking them
+    is_archive = input_path is not None and input_path.is_file() and is_archive_path(input_path)
+    # PDF attachments of mbox files, Maildirs and .eml files are parsed incrementally by Message-ID
+    is_mailbox = input_path is not None and is_mailbox_path(input_path)
+
     if args.txt_dump:
         # Import moved to avoid circular dependency issues if any
         from .output import process_pdf_to_text
+        if is_archive or is_mailbox:
+            print("Error: --txt-dump does not support archive or mailbox inputs.")
+            sys.exit(1)
         if input_path.is_file():
             if not output_path:
                 output_path = input_path.with_suffix('.txt')
-            process_pdf_to_text(input_path, output_path, preserve_privacy)
+            process_pdf_to_text(input_path, output_path, preserve_privacy, extractor)
         elif input_path.is_dir():
             if not output_path:
                 output_path = input_path / 'rewe_txt_dump'
@@ -59,7 +290,7 @@ def main():
 
             for pdf_file in input_path.glob("*.pdf"):
                 txt_output_path = output_path / pdf_file.with_suffix('.txt').name
-                process_pdf_to_text(pdf_file, txt_output_path, preserve_privacy)
+                process_pdf_to_text(pdf_file, txt_output_path, preserve_privacy, extractor)
             print(f"Text dump complete. Files saved in: {output_path}")
         else:
             print("Error: Invalid input path for --txt-dump.")
@@ -67,51 +298,106 @@ def main():
         return # Exit after dump
     # MODIFICATION END
 
-    if args.csv_table:
-        if not output_path:
-            output_path = input_path.with_suffix('.csv')
-        if input_path.is_file():
+    if args.dedupe and args.incremental:
+        print("Error: --dedupe cannot be combined with --incremental.")
+        sys.exit(1)
+    if args.incremental and input_path is not None and input_path.is_file() and not is_archive and not is_mailbox:
+        print("Error: --incremental requires a folder of PDF files as input.")
+        sys.exit(1)
+
+    if is_mailbox:
+        _run_mailbox(args, input_path, output_path, extractor, cache)
+    elif args.csv_table or args.parquet or args.ndjson or args.sqlite:
+        if sum(map(bool, (args.csv_table, args.parquet, args.ndjson, args.sqlite))) > 1:
+            print("Error: --csv-table, --parquet, --ndjson and --sqlite cannot be used together.")
+            sys.exit(1)
+        table_option = "--csv-table" if args.csv_table else "--parquet" if args.parquet else "--ndjson" if args.ndjson else "--sqlite"
+        if args.ndjson:
+            if args.incremental:
+                print("Error: --incremental is not supported with --ndjson.")
+                sys.exit(1)
+            write_table = partial(dump_to_ndjson, output_path=Path(args.ndjson))
+            dedupe = _dedupe_index(args, _table_index_path(Path(args.ndjson)))
+        elif args.sqlite:
+            if args.incremental:
+                print("Error: --incremental is not supported with --sqlite.")
+                sys.exit(1)
+            from .database import dump_to_sqlite
+            write_table = partial(dump_to_sqlite, db_path=Path(args.sqlite))
+            dedupe = _dedupe_index(args, _table_index_path(Path(args.sqlite)))
+        elif args.parquet:
+            if args.incremental:
+                print("Error: --incremental is not supported with --parquet.")
+                sys.exit(1)
+            if not output_path:
+                output_path = input_path.with_name((archive_stem(input_path) if is_archive else input_path.stem) + '_parquet')
+
+            def write_table(receipts):
+                try:
+                    dump_to_parquet(receipts, output_path)
+                except ImportError as e:
+                    print(f"Error: {e}")
+                    sys.exit(1)
+            from .dedupe import DEDUPE_INDEX_NAME
+            dedupe = _dedupe_index(args, output_path / DEDUPE_INDEX_NAME)
+        else:
+            if not output_path:
+                output_path = input_path.with_name(archive_stem(input_path) + '.csv') if is_archive else input_path.with_suffix('.csv')
+            write_table = partial(dump_items_to_csv, output_path=output_path)
+            dedupe = _dedupe_index(args, _table_index_path(output_path))
+
+        if is_archive:
+            if args.incremental:
+                print("Error: --incremental is not supported with archive inputs.")
+                sys.exit(1)
+            from .output import iter_process_folder
+            write_table(iter_process_folder(input_path, None, max_workers, rawtext_file, rawtext_stdout, preserve_privacy, extractor, cache, args.parse_workers,
+                                            max_in_flight=args.max_in_flight, max_tasks_per_child=args.max_tasks_per_child, profile=args.profile,
+                                            dedupe=dedupe))
+        elif input_path.is_file():
             if input_path.suffix.lower() == '.pdf':
+                from .output import process_pdf
                 try:
                     # MODIFICATION: Pass preserve_privacy flag
-                    result = process_pdf(input_path, None, rawtext_file, rawtext_stdout, preserve_privacy)
+                    result = process_pdf(input_path, None, rawtext_file, rawtext_stdout, preserve_privacy, extractor, cache)
                     if result:
-                        dump_items_to_csv([result], output_path)
+                        write_table([result])
                 except ValueError as e:
                     print(f"Error: Failed to process '{input_path}'.", file=sys.stderr)
                     print(f"Reason: {e}", file=sys.stderr)
                     sys.exit(1)
-            elif input_path.suffix.lower() == '.json':
-                with open(input_path, 'r', encoding='utf-8') as f:
-                    result = json.load(f)
+            elif input_path.suffix.lower() == '.json' or is_ndjson_path(input_path):
                 # Anonymize if flag is set, even from JSON source
-                if preserve_privacy:
-                    from .privacy import anonymize_receipt_dict
-                    result = anonymize_receipt_dict(result)
-                dump_items_to_csv([result], output_path)
+                write_table(_iter_json_receipts([input_path], preserve_privacy))
             else:
-                print("Error: Input file must be a PDF or JSON file when using --csv-table.")
+                print(f"Error: Input file must be a PDF, JSON or NDJSON file when using {table_option}.")
                 sys.exit(1)
         elif input_path.is_dir():
             pdf_files = list(input_path.glob("*.pdf"))
-            json_files = list(input_path.glob("*.json"))
+            json_files = [path for path in sorted(input_path.iterdir()) if is_receipt_json(path) or is_ndjson_path(path)]
             if pdf_files and json_files:
                 print("Error: Only one type of files (PDF or JSON) is allowed in the source folder at the same time.")
                 sys.exit(1)
+            elif pdf_files and args.incremental:
+                from .incremental import sync_folder
+                sync_folder(input_path, None, output_path, max_workers, preserve_privacy, extractor, cache, args.profile)
             elif pdf_files:
+                from .output import iter_process_folder
                 # MODIFICATION: Pass preserve_privacy flag
-                parsed_receipts = process_folder(input_path, None, max_workers, rawtext_file, rawtext_stdout, preserve_privacy)
-                dump_items_to_csv(parsed_receipts, output_path)
+                write_table(iter_process_folder(input_path, None, max_workers, rawtext_file, rawtext_stdout, preserve_privacy, extractor, cache, args.parse_workers,
+                                                max_in_flight=args.max_in_flight, max_tasks_per_child=args.max_tasks_per_child, profile=args.profile,
+                                            dedupe=dedupe))
+            elif args.incremental:
+                print("Error: --incremental requires a folder of PDF files as input.")
+                sys.exit(1)
             elif json_files:
-                parsed_receipts = []
-                for json_file in json_files:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        receipt = json.load(f)
-                        if preserve_privacy:
-                            from .privacy import anonymize_receipt_dict
-                            receipt = anonymize_receipt_dict(receipt)
-                        parsed_receipts.append(receipt)
-                dump_items_to_csv(parsed_receipts, output_path)
+                write_table(_iter_json_receipts(json_files, preserve_privacy))
+            elif any(input_path.glob("*.txt")):
+                # Re-parse a folder of raw text dumps without the PDF extraction stage
+                from .output import iter_process_folder
+                write_table(iter_process_folder(input_path, None, max_workers, False, False, preserve_privacy, extractor, cache, args.parse_workers,
+                                                max_in_flight=args.max_in_flight, max_tasks_per_child=args.max_tasks_per_child, profile=args.profile,
+                                            dedupe=dedupe))
             else:
                 print("Error: No valid input files found in the folder.")
                 sys.exit(1)
@@ -123,9 +409,10 @@ def main():
             if not output_path:
                 output_path = input_path.with_suffix('.json')
             if input_path.is_file() and (output_path.is_file() or not output_path.exists()):
+                from .output import process_pdf
                 try:
                     # MODIFICATION: Pass preserve_privacy flag
-                    process_pdf(input_path, output_path, rawtext_file, rawtext_stdout, preserve_privacy)
+                    process_pdf(input_path, output_path, rawtext_file, rawtext_stdout, preserve_privacy, extractor, cache, args.compact)
                 except ValueError as e:
                     print(f"Error: Failed to process '{input_path}'.", file=sys.stderr)
                     print(f"Reason: {e}", file=sys.stderr)
@@ -135,38 +422,31 @@ def main():
                 sys.exit(1)
         elif args.folder:
             if not output_path:
-                if args.rawtext_file:
-                    output_path = input_path / 'rewe_txt_out'
-                else:
-                    output_path = input_path / 'rewe_json_out'
-            if input_path.is_dir() and (output_path.is_dir() or not output_path.exists()):
-                # MODIFICATION: Pass preserve_privacy flag
-                process_folder(input_path, output_path, max_workers, rawtext_file, rawtext_stdout, preserve_privacy)
+                output_path = _default_folder_output(input_path, args.rawtext_file, is_archive)
+            if (input_path.is_dir() or is_archive) and (output_path.is_dir() or not output_path.exists()):
+                _run_folder(args, input_path, output_path, extractor, cache)
             else:
                 print("Error: Input and output paths must be directories when using --folder.")
                 sys.exit(1)
         else:
             # Auto-detection mode
             if input_path:
-                if input_path.is_dir():
+                if input_path.is_dir() or is_archive:
                     if not output_path:
-                        if args.rawtext_file:
-                            output_path = input_path / 'rewe_txt_out'
-                        else:
-                            output_path = input_path / 'rewe_json_out'
+                        output_path = _default_folder_output(input_path, args.rawtext_file, is_archive)
                     if output_path.is_dir() or not output_path.exists():
-                        # MODIFICATION: Pass preserve_privacy flag
-                        process_folder(input_path, output_path, max_workers, rawtext_file, rawtext_stdout, preserve_privacy)
+                        _run_folder(args, input_path, output_path, extractor, cache)
                     else:
-                        print("Error: Output path should be a directory when the input path is a directory.")
+                        print("Error: Output path should be a directory when the input path is a directory or an archive.")
                         sys.exit(1)
                 elif input_path.is_file():
                     if not output_path:
                         output_path = input_path.with_suffix('.json')
                     if output_path.is_file() or not output_path.exists():
+                        from .output import process_pdf
                         try:
                             # MODIFICATION: Pass preserve_privacy flag
-                            process_pdf(input_path, output_path, rawtext_file, rawtext_stdout, preserve_privacy)
+                            process_pdf(input_path, output_path, rawtext_file, rawtext_stdout, preserve_privacy, extractor, cache, args.compact)
                         except ValueError as e:
                             print(f"Error: Failed to process '{input_path}'.", file=sys.stderr)
                             print(f"Reason: {e}", file=sys.stderr)
@@ -181,5 +461,9 @@ def main():
                 print("Error: No input path provided.")
                 sys.exit(1)
 
+    # process_folder prunes the cache itself; keep single-file runs within the size cap too.
+    if cache is not None and input_path.is_file():
+        cache.prune()
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,228 @@
+# src/rewe_ebon_parser/database.py
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SQLITE_BATCH_SIZE = 1000
+
+# Receipt columns besides the id, in insert order
+RECEIPT_COLUMNS = (
+    'market', 'bonNr', 'datetime_local', 'datetime_utc',
+    'marketStreet', 'marketZip', 'marketCity', 'cashier', 'checkout', 'vatin',
+    'itemCount', 'total', 'change', 'payout', 'loyaltyProgram',
+)
+# Receipts are upserted on these columns
+RECEIPT_KEY = ('market', 'bonNr', 'datetime_local')
+# Tables holding rows that belong to a receipt
+CHILD_TABLES = ('items', 'payments', 'taxDetails', 'coupons')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS receipts (
+    id INTEGER PRIMARY KEY,
+    market TEXT,
+    bonNr TEXT,
+    datetime_local TEXT,
+    datetime_utc TEXT,
+    marketStreet TEXT,
+    marketZip TEXT,
+    marketCity TEXT,
+    cashier TEXT,
+    checkout TEXT,
+    vatin TEXT,
+    itemCount INTEGER,
+    total REAL,
+    change REAL,
+    payout REAL,
+    loyaltyProgram TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS receipts_key ON receipts (market, bonNr, datetime_local);
+CREATE INDEX IF NOT EXISTS receipts_datetime_utc ON receipts (datetime_utc);
+CREATE TABLE IF NOT EXISTS items (
+    receiptId INTEGER NOT NULL REFERENCES receipts (id),
+    position INTEGER NOT NULL,
+    name TEXT,
+    taxCategory TEXT,
+    amount REAL,
+    subTotal REAL,
+    unit TEXT,
+    pricePerUnit REAL,
+    loyaltyProgramQualified TEXT
+);
+CREATE INDEX IF NOT EXISTS items_receipt ON items (receiptId);
+CREATE INDEX IF NOT EXISTS items_name ON items (name);
+CREATE TABLE IF NOT EXISTS payments (
+    receiptId INTEGER NOT NULL REFERENCES receipts (id),
+    position INTEGER NOT NULL,
+    type TEXT,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS payments_receipt ON payments (receiptId);
+CREATE TABLE IF NOT EXISTS taxDetails (
+    receiptId INTEGER NOT NULL REFERENCES receipts (id),
+    category TEXT NOT NULL,
+    taxPercent REAL,
+    net REAL,
+    tax REAL,
+    gross REAL
+);
+CREATE INDEX IF NOT EXISTS taxDetails_receipt ON taxDetails (receiptId);
+CREATE TABLE IF NOT EXISTS coupons (
+    receiptId INTEGER NOT NULL REFERENCES receipts (id),
+    position INTEGER NOT NULL,
+    program TEXT,
+    name TEXT,
+    points INTEGER,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS coupons_receipt ON coupons (receiptId);
+"""
+
+_INSERT_RECEIPT = f"INSERT INTO receipts ({', '.join(RECEIPT_COLUMNS)}) VALUES ({', '.join('?' * len(RECEIPT_COLUMNS))})"
+_UPSERT_RECEIPT = (
+    f"{_INSERT_RECEIPT} ON CONFLICT ({', '.join(RECEIPT_KEY)}) DO UPDATE SET "
+    + ', '.join(f"{column} = excluded.{column}" for column in RECEIPT_COLUMNS if column not in RECEIPT_KEY)
+)
+_SELECT_RECEIPT_ID = f"SELECT id FROM receipts WHERE {' AND '.join(f'{column} = ?' for column in RECEIPT_KEY)}"
+
+def _receipt_row(receipt: Dict) -> tuple:
+    market_address = receipt.get('marketAddress') or {}
+    loyalty = receipt.get('loyalty') or {}
+    return (
+        receipt.get('market'),
+        receipt.get('bonNr'),
+        receipt.get('datetime_local'),
+        receipt.get('datetime_utc'),
+        market_address.get('street'),
+        market_address.get('zip'),
+        market_address.get('city'),
+        receipt.get('cashier'),
+        receipt.get('checkout'),
+        receipt.get('vatin'),
+        len(receipt['items']),
+        receipt.get('total'),
+        receipt.get('change'),
+        receipt.get('payout'),
+        loyalty.get('program'),
+    )
+
+class _SqliteWriter:
+    """Buffers receipts and writes each batch to the database in one transaction."""
+
+    def __init__(self, connection: sqlite3.Connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.receipt_count = 0
+        self.item_count = 0
+        self._batch: List[Dict] = []
+
+    def append(self, receipt: Dict):
+        self._batch.append(receipt)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        # Of several copies of a receipt in the batch, the last one is written
+        latest = {}
+        for index, receipt in enumerate(batch):
+            row = _receipt_row(receipt)
+            key = row[:len(RECEIPT_KEY)]
+            latest[key if None not in key else index] = (receipt, row)
+        batch = [receipt for receipt, _ in latest.values()]
+        rows = [row for _, row in latest.values()]
+        with self.connection:
+            cursor = self.connection.cursor()
+            # Receipts with a complete key are upserted in bulk; without one
+            # (e.g. anonymized receipts) they can only be inserted as new rows
+            keyed = [index for index, row in enumerate(rows) if None not in row[:len(RECEIPT_KEY)]]
+            cursor.executemany(_UPSERT_RECEIPT, [rows[index] for index in keyed])
+            receipt_ids: List[Optional[int]] = [None] * len(batch)
+            for index in keyed:
+                receipt_ids[index] = cursor.execute(_SELECT_RECEIPT_ID, rows[index][:len(RECEIPT_KEY)]).fetchone()[0]
+            for index, row in enumerate(rows):
+                if receipt_ids[index] is None:
+                    cursor.execute(_INSERT_RECEIPT, row)
+                    receipt_ids[index] = cursor.lastrowid
+
+            # Replace the rows of upserted receipts that were imported before
+            replaced = [(receipt_ids[index],) for index in keyed]
+            for table in CHILD_TABLES:
+                cursor.executemany(f"DELETE FROM {table} WHERE receiptId = ?", replaced)
+
+            items, payments, tax_details, coupons = [], [], [], []
+            for receipt_id, receipt in zip(receipt_ids, batch):
+                for position, item in enumerate(receipt['items']):
+                    items.append((receipt_id, position, item.get('name'), item.get('taxCategory'), item.get('amount'),
+                                  item.get('subTotal'), item.get('unit'), item.get('pricePerUnit'), item.get('loyaltyProgramQualified')))
+                for position, payment in enumerate(receipt.get('given') or []):
+                    payments.append((receipt_id, position, payment.get('type'), payment.get('value')))
+                for category, details in (receipt.get('taxDetails') or {}).items():
+                    if details:
+                        tax_details.append((receipt_id, category, details.get('taxPercent'), details.get('net'), details.get('tax'), details.get('gross')))
+                loyalty = receipt.get('loyalty') or {}
+                for position, coupon in enumerate((loyalty.get('details') or {}).get('usedCoupons') or []):
+                    coupons.append((receipt_id, position, loyalty.get('program'), coupon.get('name'), coupon.get('points'), coupon.get('value')))
+            cursor.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", items)
+            cursor.executemany("INSERT INTO payments VALUES (?, ?, ?, ?)", payments)
+            cursor.executemany("INSERT INTO taxDetails VALUES (?, ?, ?, ?, ?, ?)", tax_details)
+            cursor.executemany("INSERT INTO coupons VALUES (?, ?, ?, ?, ?, ?)", coupons)
+        self.receipt_count += len(batch)
+        self.item_count += len(items)
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """
+    Open a receipt database, creating its tables and indexes if needed.
+
+    The database uses write-ahead logging, so it can be queried while
+    receipts are being written to it.
+
+    Args:
+        db_path (Path): Path to the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: The open connection.
+    """
+    connection = sqlite3.connect(str(db_path))
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+def dump_to_sqlite(parsed_receipts: Iterable[Dict], db_path: Path, batch_size: int = SQLITE_BATCH_SIZE) -> Tuple[int, int]:
+    """
+    Write parsed receipts into normalized tables of a SQLite database.
+
+    The ``receipts`` table holds one row per receipt; ``items``, ``payments``
+    (the ``given`` payments), ``taxDetails`` (one row per tax category and the
+    total) and ``coupons`` (used loyalty coupons) refer to it by
+    ``receiptId``. Receipts are consumed one at a time and written in
+    batches of ``batch_size``, each in a single transaction with bulk
+    inserts, so a batch becomes visible to readers as soon as it is complete.
+
+    Receipts are upserted on market, ``bonNr`` and ``datetime_local``:
+    importing a receipt again replaces its rows instead of duplicating it.
+    Receipts missing one of these fields, such as anonymized ones, are
+    always added as new rows.
+
+    Args:
+        parsed_receipts (Iterable[Dict]): Parsed receipt data.
+        db_path (Path): Path to the SQLite database file. It is created if it does not exist.
+        batch_size (int): Number of receipts written per transaction.
+
+    Returns:
+        Tuple[int, int]: The number of receipts and items written.
+    """
+    connection = connect(db_path)
+    writer = _SqliteWriter(connection, batch_size)
+    try:
+        for receipt in parsed_receipts:
+            writer.append(receipt)
+    finally:
+        # Keep the receipts parsed so far if processing is interrupted
+        try:
+            writer.flush()
+        finally:
+            connection.close()
+    return writer.receipt_count, writer.item_count
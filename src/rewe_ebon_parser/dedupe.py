@@ -0,0 +1,189 @@
+# src/rewe_ebon_parser/dedupe.py
+import hashlib
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from .classify import DATE_PATTERN
+from .serialize import dump_json_file, load_json_file
+
+DEDUPE_INDEX_NAME = 'dedupe_index.json'
+DEDUPE_INDEX_FORMAT = 1
+
+_MARKET_LINE = re.compile(r'^Markt:\s*(\S+)\s+Kasse:\s*(\S+)', re.MULTILINE)
+
+class DuplicateReceiptError(ValueError):
+    """
+    Reported for an input that repeats a receipt processed before.
+
+    Attributes:
+        original (str): Path of the input the receipt was first processed from.
+        reason (str): ``'identical file'`` or ``'same receipt'``.
+    """
+    def __init__(self, original: str, reason: str):
+        super().__init__(f"Duplicate of {original} ({reason})")
+        self.original = original
+        self.reason = reason
+
+def file_digest(data: Union[bytes, memoryview]) -> str:
+    """
+    Compute the SHA-256 hex digest of a PDF's bytes.
+
+    Args:
+        data (Union[bytes, memoryview]): The PDF data, e.g. a memory-mapped file.
+
+    Returns:
+        str: The hex digest.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def footer_identity(raw_text: str) -> Optional[str]:
+    """
+    Get the identity of a receipt from the footer lines of its raw text.
+
+    The identity combines the date line (``DD.MM.YYYY HH:MM Bon-Nr.:``) with
+    the market and checkout of the ``Markt:``/``Kasse:`` line. Only these two
+    lines are looked for; the items are not parsed.
+
+    Args:
+        raw_text (str): The raw text of the eBon.
+
+    Returns:
+        Optional[str]: The identity, or None if a part of it is missing, as in
+        anonymized text.
+    """
+    date_hit = DATE_PATTERN.search(raw_text)
+    market_hit = _MARKET_LINE.search(raw_text)
+    if date_hit is None or date_hit.group(6) is None or market_hit is None:
+        return None
+    day, month, year, hour, minute, bon_nr = date_hit.groups()
+    return f"{market_hit.group(1)}|{market_hit.group(2)}|{year}-{month}-{day}T{hour}:{minute}|{bon_nr}"
+
+def receipt_identity(receipt: dict) -> Optional[str]:
+    """
+    Get the identity of ``footer_identity`` from parsed receipt data.
+
+    Args:
+        receipt (dict): Parsed, not anonymized, receipt data.
+
+    Returns:
+        Optional[str]: The identity, or None if the receipt lacks a part of it.
+    """
+    bon_nr = receipt.get('bonNr')
+    if bon_nr is None or not receipt.get('datetime_local'):
+        return None
+    try:
+        timestamp = datetime.fromisoformat(receipt['datetime_local'])
+    except ValueError:
+        return None
+    return f"{receipt.get('market')}|{receipt.get('checkout')}|{timestamp:%Y-%m-%dT%H:%M}|{bon_nr}"
+
+class DedupeIndex:
+    """
+    Record of the files and receipts processed so far, to skip repeated eBons.
+
+    The same eBon often arrives several times under different names. A copy
+    is recognised by the SHA-256 of its bytes before its text is extracted,
+    or, for byte-different copies, by the identity of its footer lines before
+    it is parsed. Each digest and identity is claimed by the first input it
+    is seen under, identified by its resolved path; the same input is not a
+    duplicate of itself, so processing a folder again reprocesses its files.
+
+    Claims made in the current run are provisional until ``confirm`` is
+    called for the input. ``release`` withdraws them when the input fails,
+    so a corrupt file does not turn a later good copy into a duplicate.
+
+    Attributes:
+        path (Optional[Path]): Location of the index file. Not saved if None.
+        files (Dict[str, str]): Input paths keyed by file digest.
+        receipts (Dict[str, str]): Input paths keyed by receipt identity.
+    """
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else None
+        self.files: Dict[str, str] = {}
+        self.receipts: Dict[str, str] = {}
+        self._provisional: Dict[str, List[Tuple[Dict[str, str], str]]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> 'DedupeIndex':
+        """
+        Load an index, or start an empty one if the file is missing or unreadable.
+
+        Args:
+            path (Path): Location of the index file.
+
+        Returns:
+            DedupeIndex: The loaded index.
+        """
+        index = cls(path)
+        try:
+            data = load_json_file(path)
+        except (OSError, ValueError):
+            return index
+        if data.get('format') == DEDUPE_INDEX_FORMAT:
+            index.files = data.get('files', {})
+            index.receipts = data.get('receipts', {})
+        return index
+
+    def save(self):
+        """Write the index atomically."""
+        if self.path is None:
+            return
+        data = {'format': DEDUPE_INDEX_FORMAT, 'files': self.files, 'receipts': self.receipts}
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        dump_json_file(data, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def _claim(self, claims: Dict[str, str], key: str, name: str) -> Optional[str]:
+        original = claims.get(key)
+        if original is None:
+            claims[key] = name
+            self._provisional.setdefault(name, []).append((claims, key))
+        return original if original != name else None
+
+    def claim_file(self, name: str, digest: str) -> Optional[str]:
+        """
+        Record a file digest for an input, unless another input has it.
+
+        Args:
+            name (str): The input's resolved path.
+            digest (str): The ``file_digest`` of the input.
+
+        Returns:
+            Optional[str]: The path of the earlier input with the same bytes, or None.
+        """
+        return self._claim(self.files, digest, name)
+
+    def claim_receipt(self, name: str, identity: str) -> Optional[str]:
+        """
+        Record a receipt identity for an input, unless another input has it.
+
+        Args:
+            name (str): The input's resolved path.
+            identity (str): The ``footer_identity`` of the input.
+
+        Returns:
+            Optional[str]: The path of the earlier input with the same receipt, or None.
+        """
+        return self._claim(self.receipts, identity, name)
+
+    def confirm(self, name: str):
+        """
+        Keep the claims of an input that was processed successfully.
+
+        Args:
+            name (str): The input's resolved path.
+        """
+        self._provisional.pop(name, None)
+
+    def release(self, name: str):
+        """
+        Withdraw the claims an input made in this run, because it failed.
+
+        Args:
+            name (str): The input's resolved path.
+        """
+        for claims, key in self._provisional.pop(name, ()):
+            if claims.get(key) == name:
+                del claims[key]
@@ -0,0 +1,262 @@
+# src/rewe_ebon_parser/incremental.py
+import csv
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from . import __version__
+from .cache import ResultCache
+from .output import PROCESSING_LOG_NAME, _iter_pdf_results, processing_log_row, write_processing_log
+from .serialize import dump_json_file, is_receipt_json, load_json_file
+from .table import CSV_FIELDNAMES, receipt_to_rows
+
+MANIFEST_NAME = 'input_manifest.json'
+MANIFEST_FORMAT = 1
+
+def file_sha256(path: Path) -> str:
+    """
+    Compute the SHA-256 hex digest of a file.
+
+    Args:
+        path (Path): Path to the file.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def manifest_options(preserve_privacy: bool, extractor: str, compact: bool, json_output: bool) -> dict:
+    """
+    Get the options recorded in a manifest, which must match for its outputs to be reused.
+
+    Args:
+        preserve_privacy (bool): If True, the outputs are anonymized.
+        extractor (str): The text extraction backend.
+        compact (bool): If True, the JSON files are written without whitespace.
+        json_output (bool): If True, JSON files are written. ``compact`` only
+            counts for these, not for a CSV table.
+
+    Returns:
+        dict: The parser version and options.
+    """
+    options = {'parserVersion': __version__, 'preservePrivacy': preserve_privacy, 'extractor': extractor}
+    if json_output:
+        options['compact'] = compact
+    return options
+
+class InputManifest:
+    """
+    Record of the input PDFs already reflected in a folder's outputs.
+
+    For every input file the manifest keeps its size, modification time and
+    content hash, the processing status and the number of rows it contributed
+    to the CSV table. Entries are kept in the order their rows appear in the
+    CSV table, which lets stale rows be dropped without re-parsing anything.
+
+    Attributes:
+        path (Path): Location of the manifest file.
+        options (dict): Parser version and options the outputs were built with.
+        files (Dict[str, dict]): Manifest entries keyed by input file name.
+        csv_size (Optional[int]): Size of the CSV table after the last sync.
+    """
+    def __init__(self, path: Path, options: dict):
+        self.path = Path(path)
+        self.options = options
+        self.files: Dict[str, dict] = {}
+        self.csv_size: Optional[int] = None
+
+    @classmethod
+    def load(cls, path: Path, options: dict) -> 'InputManifest':
+        """
+        Load a manifest, discarding it if it was built with other options.
+
+        Args:
+            path (Path): Location of the manifest file.
+            options (dict): Parser version and options of the current run.
+
+        Returns:
+            InputManifest: The loaded manifest, or an empty one.
+        """
+        manifest = cls(path, options)
+        try:
+            data = load_json_file(path)
+        except (OSError, ValueError):
+            return manifest
+        if data.get('format') == MANIFEST_FORMAT and data.get('options') == options:
+            manifest.files = data.get('files', {})
+            manifest.csv_size = data.get('csvSize')
+        return manifest
+
+    def save(self):
+        """Write the manifest atomically."""
+        data = {
+            'format': MANIFEST_FORMAT,
+            'options': self.options,
+            'csvSize': self.csv_size,
+            'files': self.files,
+        }
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        dump_json_file(data, tmp_path)
+        os.replace(tmp_path, self.path)
+
+def _drop_csv_rows(csv_path: Path, files: Dict[str, dict], stale_names: set):
+    """
+    Remove the rows contributed by stale input files from the CSV table.
+
+    Args:
+        csv_path (Path): Path to the CSV table.
+        files (Dict[str, dict]): Manifest entries in CSV row order.
+        stale_names (set): Names of the input files whose rows are dropped.
+    """
+    tmp_path = csv_path.with_name(csv_path.name + '.tmp')
+    with open(csv_path, 'r', newline='', encoding='utf-8') as src, \
+            open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+        reader = csv.reader(src)
+        writer = csv.writer(dst)
+        writer.writerow(next(reader))
+        for name, entry in files.items():
+            for _ in range(entry.get('rows', 0)):
+                row = next(reader)
+                if name not in stale_names:
+                    writer.writerow(row)
+    os.replace(tmp_path, csv_path)
+
+def sync_folder(input_folder: Path, output_folder: Optional[Path] = None, csv_path: Optional[Path] = None, max_workers: Optional[int] = None, preserve_privacy: bool = False, extractor: str = 'pdfplumber', cache: Optional[ResultCache] = None, profile: bool = False, compact: bool = False) -> Dict[str, int]:
+    """
+    Incrementally bring a folder's outputs in line with its input PDFs.
+
+    Only new or changed PDFs are parsed. A file counts as unchanged when its
+    size and modification time match the manifest, or, failing that, when its
+    content hash does. Outputs of changed and removed files are updated in
+    place: their JSON files are rewritten or deleted, their rows are dropped
+    from the CSV table before the new rows are appended, and
+    ``processing_log.csv`` is regenerated from the manifest.
+
+    The outputs are rebuilt from scratch when the manifest is missing, was
+    written by another parser version or with other options, or no longer
+    matches the CSV table.
+
+    Args:
+        input_folder (Path): Path to the input folder containing PDF files.
+        output_folder (Optional[Path]): Path to the output folder for JSON files.
+        csv_path (Optional[Path]): Path to the CSV table of all items.
+        max_workers (Optional[int]): Maximum number of concurrent threads to use.
+        preserve_privacy (bool): If True, anonymize the output.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        cache (Optional[ResultCache]): If given, reuse and store parse results keyed by the PDF content.
+        profile (bool): If True, print a report of the per-stage timings of the processed files.
+        compact (bool): If True, write the JSON files without whitespace.
+
+    Returns:
+        Dict[str, int]: Number of new, changed, unchanged, removed and failed files.
+
+    Raises:
+        ValueError: If neither an output folder nor a CSV path is given, or
+            if both JSON and PDF files are found in the input folder.
+    """
+    if output_folder is None and csv_path is None:
+        raise ValueError("An output folder or a CSV path is required for incremental processing.")
+    if any(is_receipt_json(path) for path in input_folder.glob("*.json")):
+        raise ValueError("Only one type of files (PDF or JSON) is allowed in the source folder at the same time.")
+
+    start_time = time.time()
+    if output_folder:
+        output_folder.mkdir(parents=True, exist_ok=True)
+        manifest_path = output_folder / MANIFEST_NAME
+    else:
+        manifest_path = csv_path.with_name(f"{csv_path.stem}_{MANIFEST_NAME}")
+
+    options = manifest_options(preserve_privacy, extractor, compact, output_folder is not None)
+    manifest = InputManifest.load(manifest_path, options)
+    if csv_path is not None and (not csv_path.exists() or manifest.csv_size != csv_path.stat().st_size):
+        manifest.files = {}
+
+    summary = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+    to_process: List[Path] = []
+    fingerprints = {}
+    seen = set()
+    for pdf_file in sorted(input_folder.glob("*.pdf")):
+        name = pdf_file.name
+        seen.add(name)
+        stat = pdf_file.stat()
+        entry = manifest.files.get(name)
+        outputs_present = (
+            entry is not None
+            and (output_folder is None or entry['status'] != "Success"
+                 or (output_folder / (pdf_file.stem + ".json")).exists())
+        )
+        if outputs_present and entry['size'] == stat.st_size and entry['mtimeNs'] == stat.st_mtime_ns:
+            summary['unchanged'] += 1
+            continue
+        sha256 = file_sha256(pdf_file)
+        if outputs_present and entry['sha256'] == sha256:
+            entry['size'], entry['mtimeNs'] = stat.st_size, stat.st_mtime_ns
+            summary['unchanged'] += 1
+            continue
+        summary['new' if entry is None else 'changed'] += 1
+        fingerprints[name] = {'size': stat.st_size, 'mtimeNs': stat.st_mtime_ns, 'sha256': sha256}
+        to_process.append(pdf_file)
+
+    removed = [name for name in manifest.files if name not in seen]
+    summary['removed'] = len(removed)
+    stale_names = set(removed) | (set(fingerprints) & set(manifest.files))
+
+    if output_folder:
+        for name in stale_names:
+            (output_folder / Path(name).with_suffix('.json').name).unlink(missing_ok=True)
+
+    csvfile = writer = None
+    if csv_path is not None:
+        if manifest.files and any(manifest.files[name].get('rows') for name in stale_names):
+            _drop_csv_rows(csv_path, manifest.files, stale_names)
+        write_header = not manifest.files or not csv_path.exists()
+        csvfile = open(csv_path, 'w' if write_header else 'a', newline='', encoding='utf-8')
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+        if write_header:
+            writer.writeheader()
+
+    for name in stale_names:
+        del manifest.files[name]
+
+    try:
+        results = _iter_pdf_results(to_process, output_folder, max_workers, False, False, preserve_privacy, extractor, cache, compact=compact) if to_process else ()
+        for pdf_file, result, error, timings in results:
+            rows = 0
+            if error is None and result and writer is not None:
+                for row in receipt_to_rows(result):
+                    writer.writerow(row)
+                    rows += 1
+            if error is not None:
+                summary['failed'] += 1
+            manifest.files[pdf_file.name] = dict(
+                fingerprints[pdf_file.name],
+                status="Success" if error is None else "Failure",
+                error="" if error is None else str(error),
+                rows=rows,
+                timings=timings,
+            )
+    finally:
+        if csvfile is not None:
+            csvfile.close()
+            manifest.csv_size = csv_path.stat().st_size
+        manifest.save()
+
+    if output_folder:
+        log_entries = [processing_log_row(name, entry['status'], entry['error'], entry.get('timings'))
+                       for name, entry in manifest.files.items()]
+        write_processing_log(output_folder / PROCESSING_LOG_NAME, log_entries)
+
+    elapsed_time = time.time() - start_time
+    print(f"Processed {len(to_process)} new or changed files in {elapsed_time:.2f} seconds "
+          f"({summary['unchanged']} unchanged, {summary['removed']} removed).")
+    print(f"Successfully processed: {len(to_process) - summary['failed']}")
+    print(f"Failed to process: {summary['failed']}")
+    if profile and to_process:
+        from .profiling import format_profile
+        print(format_profile((name, manifest.files[name].get('timings')) for name in fingerprints if name in manifest.files))
+    return summary
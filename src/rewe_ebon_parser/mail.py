@@ -0,0 +1,285 @@
+# src/rewe_ebon_parser/mail.py
+import csv
+import hashlib
+import re
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Container, Dict, Iterator, Optional, Tuple
+from .archive import ArchiveMember
+from .cache import ResultCache
+from .dedupe import DedupeIndex, DuplicateReceiptError
+
+DEFAULT_SENDER = 'rewe.de'
+MAIL_MANIFEST_NAME = 'mail_manifest.json'
+EML_SUFFIX = '.eml'
+MBOX_SUFFIX = '.mbox'
+
+_UNSAFE_NAME_CHARS = re.compile(r'[^\w.@-]+')
+
+def is_mailbox_path(path: Path) -> bool:
+    """
+    Check whether a path is a mailbox the eBon attachments can be read from.
+
+    Args:
+        path (Path): The input path.
+
+    Returns:
+        bool: True for an ``.mbox`` or ``.eml`` file, a Maildir (a folder with
+        ``cur`` and ``new`` subfolders), or a folder of ``.eml`` files without PDFs.
+    """
+    path = Path(path)
+    if path.is_file():
+        return path.suffix.lower() in (MBOX_SUFFIX, EML_SUFFIX)
+    if path.is_dir():
+        if (path / 'cur').is_dir() and (path / 'new').is_dir():
+            return True
+        return any(path.glob('*' + EML_SUFFIX)) and not any(path.glob('*.pdf'))
+    return False
+
+def sender_matches(from_header: str, sender: str) -> bool:
+    """
+    Check a From header against the expected eBon sender.
+
+    Args:
+        from_header (str): The message's From header.
+        sender (str): An email address, or a domain that matches its subdomains
+            too. An empty string matches any sender.
+
+    Returns:
+        bool: True if the sender matches.
+    """
+    if not sender:
+        return True
+    from email.utils import parseaddr
+    address = parseaddr(from_header)[1].lower()
+    sender = sender.lower()
+    if '@' in sender:
+        return address == sender
+    domain = address.rpartition('@')[2]
+    return domain == sender or domain.endswith('.' + sender)
+
+def _message_files(path: Path) -> Iterator[BinaryIO]:
+    """Open the messages of an mbox file, a Maildir, an ``.eml`` file or a folder of ``.eml`` files in turn."""
+    # The mailbox and email packages are imported where they are used, so that the CLI,
+    # which only needs ``is_mailbox_path`` and ``DEFAULT_SENDER``, starts without them
+    import mailbox
+    if path.is_file() and path.suffix.lower() == EML_SUFFIX:
+        files = [path]
+    elif path.is_dir() and not (path / 'cur').is_dir():
+        files = sorted(path.glob('*' + EML_SUFFIX))
+    else:
+        box = mailbox.mbox(path, create=False) if path.is_file() else mailbox.Maildir(path, factory=None, create=False)
+        try:
+            for key in box.iterkeys():
+                with box.get_file(key) as message_file:
+                    yield message_file
+        finally:
+            box.close()
+        return
+    for eml_file in files:
+        with open(eml_file, 'rb') as message_file:
+            yield message_file
+
+def _read_header_block(message_file: BinaryIO) -> bytes:
+    """Read a message up to and including the blank line ending its headers."""
+    lines = []
+    for line in message_file:
+        lines.append(line)
+        if line in (b'\n', b'\r\n'):
+            break
+    return b''.join(lines)
+
+def _may_have_attachments(headers) -> bool:
+    # Mails with only text and HTML bodies, like newsletters, are skipped without reading their body
+    content_type = headers.get_content_type()
+    return content_type == 'application/pdf' or (content_type.startswith('multipart/') and content_type != 'multipart/alternative')
+
+def iter_mail_pdfs(path: Path, sender: str = DEFAULT_SENDER, skip: Container[str] = (), on_empty: Optional[Callable[[str], None]] = None) -> Iterator[Tuple[str, ArchiveMember]]:
+    """
+    Read the PDF attachments of the eBon mails in a mailbox, one message at a time.
+
+    Only the headers of each message are parsed first. The rest of the message
+    is read, and only its PDF attachments decoded, when it comes from
+    ``sender``, has not been processed before and can carry attachments.
+
+    Attachments are named after the Message-ID (the SHA-256 of the message
+    when it has none), with ``-2``, ``-3``... for further PDFs of the same
+    message, so that mails with identically named attachments do not clash.
+    Copies of a mail with the same Message-ID are read once.
+
+    Args:
+        path (Path): An mbox file, a Maildir, an ``.eml`` file or a folder of ``.eml`` files.
+        sender (str): Sender address or domain of the eBon mails, see ``sender_matches``.
+        skip (Container[str]): Message-IDs to leave out, e.g. those processed in a previous run.
+        on_empty (Optional[Callable[[str], None]]): Called with the Message-ID of each mail
+            that was read in full but has no PDF attachment.
+
+    Yields:
+        Tuple[str, ArchiveMember]: The Message-ID and the attachment, with the mailbox as its archive.
+    """
+    from email.parser import BytesHeaderParser, BytesParser
+    from email.policy import default as default_policy
+
+    path = Path(path)
+    seen = set()
+    for message_file in _message_files(path):
+        head = _read_header_block(message_file)
+        headers = BytesHeaderParser(policy=default_policy).parsebytes(head)
+        message_id = (headers.get('Message-ID') or '').strip()
+        if not sender_matches(str(headers.get('From', '')), sender) or not _may_have_attachments(headers):
+            continue
+        if message_id in skip or message_id in seen:
+            continue
+        raw = head + message_file.read()
+        if not message_id:
+            message_id = hashlib.sha256(raw).hexdigest()
+            if message_id in skip or message_id in seen:
+                continue
+        seen.add(message_id)
+        message = BytesParser(policy=default_policy).parsebytes(raw)
+        stem = _UNSAFE_NAME_CHARS.sub('_', message_id.strip('<>'))[:150]
+        count = 0
+        for part in message.walk():
+            if part.is_multipart():
+                continue
+            filename = part.get_filename() or ''
+            if part.get_content_type() != 'application/pdf' and not filename.lower().endswith('.pdf'):
+                continue
+            count += 1
+            name = f"{stem}.pdf" if count == 1 else f"{stem}-{count}.pdf"
+            yield message_id, ArchiveMember(path, name, part.get_payload(decode=True) or b'')
+        if count == 0 and on_empty is not None:
+            on_empty(message_id)
+
+def sync_mailbox(mailbox_path: Path, output_folder: Optional[Path] = None, csv_path: Optional[Path] = None, max_workers: Optional[int] = None, preserve_privacy: bool = False, extractor: str = 'pdfplumber', cache: Optional[ResultCache] = None, sender: str = DEFAULT_SENDER, profile: bool = False, compact: bool = False, dedupe: Optional[DedupeIndex] = None) -> Dict[str, int]:
+    """
+    Parse the eBon attachments of a mailbox that have not been parsed yet.
+
+    The PDF attachments are decoded in memory and streamed to the worker
+    pool, without being saved to disk. The Message-IDs of processed mails are
+    kept in a manifest next to the outputs, so repeated runs only parse new
+    mails: their JSON files are added to the output folder, their rows are
+    appended to the CSV table, and ``processing_log.csv`` is regenerated.
+    Mails from the sender without a PDF attachment are recorded too, so they
+    are not read again. Mails with an attachment that failed to parse are
+    retried on the next run.
+
+    The outputs are rebuilt from scratch when the manifest is missing, was
+    written by another parser version or with other options, or no longer
+    matches the CSV table.
+
+    Args:
+        mailbox_path (Path): An mbox file, a Maildir, an ``.eml`` file or a folder of ``.eml`` files.
+        output_folder (Optional[Path]): Path to the output folder for JSON files.
+        csv_path (Optional[Path]): Path to the CSV table of all items.
+        max_workers (Optional[int]): Maximum number of concurrent threads to use.
+        preserve_privacy (bool): If True, anonymize the output.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        cache (Optional[ResultCache]): If given, reuse and store parse results keyed by the PDF content.
+        sender (str): Sender address or domain of the eBon mails. An empty string accepts any sender.
+        profile (bool): If True, print a report of the per-stage timings of the processed attachments.
+        compact (bool): If True, write the JSON files without whitespace.
+        dedupe (Optional[DedupeIndex]): If given, skip attachments repeating a file or receipt
+            recorded in the index, e.g. a forwarded eBon, and log them as duplicates.
+
+    Returns:
+        Dict[str, int]: Number of new mails, parsed attachments, failed attachments,
+        duplicate attachments and mails skipped as already processed.
+
+    Raises:
+        ValueError: If neither an output folder nor a CSV path is given.
+    """
+    if output_folder is None and csv_path is None:
+        raise ValueError("An output folder or a CSV path is required to read eBons from a mailbox.")
+    # Imported here so that detecting mailbox inputs in the CLI stays cheap
+    from .incremental import InputManifest, _drop_csv_rows, manifest_options
+    from .output import PROCESSING_LOG_NAME, _iter_pdf_results, processing_log_row, write_processing_log
+    from .table import CSV_FIELDNAMES, receipt_to_rows
+
+    start_time = time.time()
+    if output_folder:
+        output_folder.mkdir(parents=True, exist_ok=True)
+        manifest_path = output_folder / MAIL_MANIFEST_NAME
+    else:
+        manifest_path = csv_path.with_name(f"{csv_path.stem}_{MAIL_MANIFEST_NAME}")
+
+    manifest = InputManifest.load(manifest_path, manifest_options(preserve_privacy, extractor, compact, output_folder is not None))
+    if csv_path is not None and (not csv_path.exists() or manifest.csv_size != csv_path.stat().st_size):
+        manifest.files = {}
+    # Manifest entries are keyed by attachment name (by Message-ID for mails without
+    # attachments) and record the mail they came from
+    retried = {entry['messageId'] for entry in manifest.files.values() if entry['status'] == "Failure"}
+    if retried:
+        stale_names = {name for name, entry in manifest.files.items() if entry['messageId'] in retried}
+        if csv_path is not None:
+            _drop_csv_rows(csv_path, manifest.files, stale_names)
+        manifest.files = {name: entry for name, entry in manifest.files.items() if name not in stale_names}
+    processed = {entry['messageId'] for entry in manifest.files.values()}
+
+    csvfile = writer = None
+    if csv_path is not None:
+        write_header = not manifest.files
+        csvfile = open(csv_path, 'w' if write_header else 'a', newline='', encoding='utf-8')
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+        if write_header:
+            writer.writeheader()
+
+    message_ids: Dict[str, str] = {}
+
+    def record_empty(message_id: str):
+        manifest.files[message_id] = dict(messageId=message_id, status="NoAttachment", error="", rows=0)
+
+    def sources():
+        for message_id, attachment in iter_mail_pdfs(mailbox_path, sender, processed, record_empty):
+            message_ids[attachment.file_name] = message_id
+            yield attachment
+
+    summary = {'mails': 0, 'parsed': 0, 'failed': 0, 'duplicates': 0, 'skipped': len(processed)}
+    new_names = []
+    try:
+        for pdf_file, result, error, timings in _iter_pdf_results(sources(), output_folder, max_workers, False, False, preserve_privacy, extractor, cache, compact=compact, dedupe=dedupe):
+            rows = 0
+            if error is None and result and writer is not None:
+                for row in receipt_to_rows(result):
+                    writer.writerow(row)
+                    rows += 1
+            if error is None:
+                status = "Success"
+                summary['parsed'] += 1
+            elif isinstance(error, DuplicateReceiptError):
+                status = "Duplicate"
+                summary['duplicates'] += 1
+            else:
+                status = "Failure"
+                summary['failed'] += 1
+            new_names.append(pdf_file.name)
+            manifest.files[pdf_file.name] = dict(
+                messageId=message_ids[pdf_file.name],
+                status=status,
+                error="" if error is None else str(error),
+                rows=rows,
+                timings=timings,
+            )
+    finally:
+        if csvfile is not None:
+            csvfile.close()
+            manifest.csv_size = csv_path.stat().st_size
+        manifest.save()
+    summary['mails'] = len(set(message_ids.values()))
+
+    if output_folder:
+        log_entries = [processing_log_row(name, entry['status'], entry['error'], entry.get('timings'))
+                       for name, entry in manifest.files.items() if entry['status'] != "NoAttachment"]
+        write_processing_log(output_folder / PROCESSING_LOG_NAME, log_entries)
+
+    elapsed_time = time.time() - start_time
+    print(f"Processed {summary['parsed'] + summary['failed'] + summary['duplicates']} attachments from {summary['mails']} new mails in {elapsed_time:.2f} seconds "
+          f"({summary['skipped']} mails already processed).")
+    print(f"Successfully processed: {summary['parsed']}")
+    print(f"Failed to process: {summary['failed']}")
+    if dedupe is not None:
+        print(f"Skipped duplicates: {summary['duplicates']}")
+    if profile and new_names:
+        from .profiling import format_profile
+        print(format_profile((name, manifest.files[name].get('timings')) for name in new_names))
+    return summary
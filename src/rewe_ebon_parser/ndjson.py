@@ -0,0 +1,91 @@
+# src/rewe_ebon_parser/ndjson.py
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, Union
+from .serialize import dumps, loads
+
+NDJSON_SUFFIXES = ('.jsonl', '.ndjson')
+
+# Compression is picked from the last suffix of the file name
+_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+def is_ndjson_path(path: Union[str, Path]) -> bool:
+    """
+    Check whether a path names an NDJSON file, optionally compressed.
+
+    Args:
+        path (Union[str, Path]): The file path.
+
+    Returns:
+        bool: True for ``.jsonl`` and ``.ndjson`` files and their ``.gz``,
+        ``.bz2`` and ``.xz`` compressed variants.
+    """
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    if suffixes and suffixes[-1] in _OPENERS:
+        suffixes = suffixes[:-1]
+    return bool(suffixes) and suffixes[-1] in NDJSON_SUFFIXES
+
+def open_ndjson(path: Union[str, Path], mode: str = 'r') -> BinaryIO:
+    """
+    Open an NDJSON file in binary mode, compressed according to its suffix.
+
+    Args:
+        path (Union[str, Path]): The file path.
+        mode (str): ``'r'`` to read, ``'w'`` to write or ``'a'`` to append.
+
+    Returns:
+        BinaryIO: The open file.
+    """
+    opener = _OPENERS.get(Path(path).suffix.lower(), open)
+    return opener(path, mode + 'b')
+
+def dump_to_ndjson(parsed_receipts: Iterable[Dict], output_path: Union[str, Path]) -> int:
+    """
+    Write parsed receipts to an NDJSON file, one compact receipt per line.
+
+    Receipts are written as they arrive, so ``parsed_receipts`` can be a
+    generator such as ``iter_process_folder``. A ``.gz``, ``.bz2`` or ``.xz``
+    suffix compresses the output.
+
+    Args:
+        parsed_receipts (Iterable[Dict]): Parsed receipt data.
+        output_path (Union[str, Path]): Path to the output file.
+
+    Returns:
+        int: The number of receipts written.
+    """
+    count = 0
+    with open_ndjson(output_path, 'w') as f:
+        for receipt in parsed_receipts:
+            f.write(dumps(receipt, compact=True))
+            f.write(b'\n')
+            count += 1
+    return count
+
+def iter_ndjson(path: Union[str, Path]) -> Iterator[Dict]:
+    """
+    Lazily read parsed receipts from an NDJSON file.
+
+    Args:
+        path (Union[str, Path]): Path to the NDJSON file, optionally compressed.
+
+    Yields:
+        Dict: Parsed receipt data, one per non-empty line.
+
+    Raises:
+        ValueError: If a line is not valid JSON.
+    """
+    with open_ndjson(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON on line {line_number} of {path}: {e}") from e
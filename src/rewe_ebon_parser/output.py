@@ -1,17 +1,20 @@
 # src/rewe_ebon_parser/output.py
-import json
 import time
 import csv
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from tqdm import tqdm
-from .parse import extract_raw_text, parse_ebon
+from typing import Optional
+from .parse import extract_raw_text, open_pdf_buffer, parse_ebon
+from .archive import count_archive_pdfs, is_archive_path, iter_archive_pdfs
+from .cache import ResultCache
+from .dedupe import DedupeIndex, DuplicateReceiptError
+from .serialize import dump_json_file, is_receipt_json, load_json_file
+from .pipeline import STAGES, TEXT_SUFFIX, run_pipeline
 # MODIFICATION START: Import anonymization functions
 from .privacy import anonymize_receipt_dict, anonymize_text_content
 # MODIFICATION END
 
 # MODIFICATION START: Add a new function for text dumping
-def process_pdf_to_text(pdf_path: Path, output_path: Path, preserve_privacy: bool = False):
+def process_pdf_to_text(pdf_path: Path, output_path: Path, preserve_privacy: bool = False, extractor: str = 'pdfplumber'):
     """
     Process a single PDF file to extract and save its raw text content.
 
@@ -19,23 +22,22 @@ def process_pdf_to_text(pdf_path: Path, output_path: Path, preserve_privacy: boo
         pdf_path (Path): Path to the input PDF file.
         output_path (Path): Path to the output TXT file.
         preserve_privacy (bool): If True, anonymize the text content.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
     """
     output_path.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with open(pdf_path, 'rb') as f:
-            data = f.read()
-            raw_text = extract_raw_text(data)
-            
-            if preserve_privacy:
-                raw_text = anonymize_text_content(raw_text)
-            
-            output_path.write_text(raw_text, encoding='utf-8')
+        raw_text = extract_raw_text(pdf_path, extractor)
+
+        if preserve_privacy:
+            raw_text = anonymize_text_content(raw_text)
+
+        output_path.write_text(raw_text, encoding='utf-8')
     except Exception as e:
         print(f"Failed to dump text from {pdf_path}: {e}")
 # MODIFICATION END
 
 # MODIFICATION: Add preserve_privacy parameter
-def process_pdf(pdf_path, output_path=None, rawtext_file=False, rawtext_stdout=False, preserve_privacy: bool = False):
+def process_pdf(pdf_path, output_path=None, rawtext_file=False, rawtext_stdout=False, preserve_privacy: bool = False, extractor: str = 'pdfplumber', cache: Optional[ResultCache] = None, compact: bool = False):
     """
     Process a single PDF file to extract receipt data.
 
@@ -45,6 +47,10 @@ def process_pdf(pdf_path, output_path=None, rawtext_file=False, rawtext_stdout=F
         rawtext_file (bool): If True, output raw text to a file.
         rawtext_stdout (bool): If True, print raw text to the console.
         preserve_privacy (bool): If True, anonymize the output.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        cache (Optional[ResultCache]): If given, reuse and store parse results keyed by the PDF content.
+            With ``preserve_privacy`` results are only looked up, never stored.
+        compact (bool): If True, write the JSON file without whitespace.
 
     Returns:
         dict: Parsed receipt data.
@@ -54,54 +60,162 @@ def process_pdf(pdf_path, output_path=None, rawtext_file=False, rawtext_stdout=F
         output_path.parent.mkdir(parents=True, exist_ok=True)  # Ensure the output directory exists
 
     try:
-        with open(pdf_path, 'rb') as f:
-            data = f.read()
-
-            if rawtext_file or rawtext_stdout:
-                raw_text = extract_raw_text(data)
-                # MODIFICATION: Anonymize raw text if requested
-                if preserve_privacy:
-                    raw_text = anonymize_text_content(raw_text)
-                if rawtext_file:
-                    rawtext_path = output_path.with_suffix('.txt') if output_path else pdf_path.with_suffix('.txt')
-                    rawtext_path.write_text(raw_text, encoding='utf-8')
-                if rawtext_stdout:
-                    print(raw_text)
-                
-                if rawtext_file:
-                    return None # Do not proceed to create JSON
-                
-            result = parse_ebon(data)
-
-            # MODIFICATION: Anonymize the result dictionary if requested
+        if rawtext_file or rawtext_stdout:
+            raw_text = extract_raw_text(pdf_path, extractor)
+            # MODIFICATION: Anonymize raw text if requested
             if preserve_privacy:
-                result = anonymize_receipt_dict(result)
+                raw_text = anonymize_text_content(raw_text)
+            if rawtext_file:
+                rawtext_path = output_path.with_suffix('.txt') if output_path else pdf_path.with_suffix('.txt')
+                rawtext_path.write_text(raw_text, encoding='utf-8')
+            if rawtext_stdout:
+                print(raw_text)
+
+            if rawtext_file:
+                return None # Do not proceed to create JSON
+
+        result = None
+        if cache is not None and preserve_privacy:
+            cache = cache.read_only_copy()
+        if cache is not None:
+            with open_pdf_buffer(pdf_path) as data:
+                cache_key = cache.key(data, extractor)
+            result = cache.get(cache_key)
+        if result is None:
+            result = parse_ebon(pdf_path, extractor)
+            if cache is not None:
+                cache.put(cache_key, result)
+
+        # MODIFICATION: Anonymize the result dictionary if requested
+        if preserve_privacy:
+            result = anonymize_receipt_dict(result)
 
-            if result and output_path:
-                with open(output_path, 'w', encoding='utf-8') as json_file:
-                    json.dump(result, json_file, default=str, indent=2, ensure_ascii=False)
-            
-            return result
+        if result and output_path:
+            dump_json_file(result, output_path, compact)
+
+        return result
     except Exception as e:
         print(f"Failed to process {pdf_path}: {e}")
         raise
 
+PROCESSING_LOG_NAME = 'processing_log.csv'
+PROCESSING_LOG_HEADER = ["File Name", "Status", "Error Message", "Bytes", "Items"] + [f"{stage.capitalize()} (ms)" for stage in STAGES]
+
+def processing_log_row(file_name: str, status: str, error: str = "", timings: Optional[dict] = None) -> list:
+    """
+    Build a row of the processing log.
+
+    Args:
+        file_name (str): Name of the input file.
+        status (str): "Success" or "Failure".
+        error (str): The error message, if any.
+        timings (Optional[dict]): The file's size, item count and stage timings in
+            seconds, as reported by ``run_pipeline``. Missing values are left empty.
+
+    Returns:
+        list: The row, matching ``PROCESSING_LOG_HEADER``.
+    """
+    timings = timings or {}
+    row = [file_name, status, error, timings.get('bytes', ''), timings.get('items', '')]
+    row += [f"{timings[stage] * 1000:.3f}" if stage in timings else '' for stage in STAGES]
+    return row
+
+def write_processing_log(log_file_path: Path, log_entries):
+    """
+    Write the per-file processing log.
+
+    Args:
+        log_file_path (Path): Path to the log CSV file.
+        log_entries (Iterable[list]): Rows built by ``processing_log_row``.
+    """
+    with open(log_file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        log_writer = csv.writer(csvfile)
+        log_writer.writerow(PROCESSING_LOG_HEADER)
+        log_writer.writerows(log_entries)
+
+def _iter_pdf_results(pdf_files, output_folder=None, max_workers=None, rawtext_file=False, rawtext_stdout=False, preserve_privacy: bool = False, extractor: str = 'pdfplumber', cache: Optional[ResultCache] = None, parse_workers: int = 0, write_workers: int = 1, max_in_flight: Optional[int] = None, max_tasks_per_child: Optional[int] = None, compact: bool = False, total: Optional[int] = None, dedupe: Optional[DedupeIndex] = None):
+    """
+    Run PDF (or raw text) files through the staged processing pipeline.
+
+    Args:
+        pdf_files (Iterable[Union[Path, ArchiveMember]]): The PDF or ``.txt`` files to process,
+            or PDFs read from an archive.
+        output_folder (Optional[Path]): Path to the output folder for JSON files.
+        max_workers (Optional[int]): Maximum number of text extraction processes.
+        rawtext_file (bool): If True, output raw text to files.
+        rawtext_stdout (bool): If True, print raw text to the console.
+        preserve_privacy (bool): If True, anonymize the output.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        cache (Optional[ResultCache]): If given, reuse and store parse results keyed by the PDF content.
+        parse_workers (int): Number of parsing processes, see ``run_pipeline``.
+        write_workers (int): Number of output writing threads.
+        max_in_flight (Optional[int]): Maximum number of files in flight, see ``run_pipeline``.
+        max_tasks_per_child (Optional[int]): Replace worker processes after this many files.
+        compact (bool): If True, write the JSON files without whitespace.
+        total (Optional[int]): Number of inputs shown in the progress bar. Defaults to
+            ``len(pdf_files)``.
+        dedupe (Optional[DedupeIndex]): If given, skip repeated files and receipts, see ``run_pipeline``.
+            The index is saved once all files are processed.
+
+    Yields:
+        PipelineResult: The input file, its parsed receipt data, the error raised
+        while processing it and its stage timings, in completion order.
+    """
+    from tqdm import tqdm
+
+    if total is None and hasattr(pdf_files, '__len__'):
+        total = len(pdf_files)
+    with tqdm(total=total, desc="Processing PDFs", unit="file") as pbar:
+        for pipeline_result in run_pipeline(pdf_files, output_folder, max_workers, parse_workers, write_workers,
+                                                    rawtext_file=rawtext_file, rawtext_stdout=rawtext_stdout,
+                                                    preserve_privacy=preserve_privacy, extractor=extractor, cache=cache,
+                                                    max_in_flight=max_in_flight, max_tasks_per_child=max_tasks_per_child, compact=compact, dedupe=dedupe):
+            pbar.update(1)
+            yield pipeline_result
+
+    if cache is not None:
+        cache.prune()
+    if dedupe is not None:
+        dedupe.save()
+
 # MODIFICATION: Add preserve_privacy parameter
-def process_folder(input_folder, output_folder=None, max_workers=None, rawtext_file=False, rawtext_stdout=False, preserve_privacy: bool = False):
+def iter_process_folder(input_folder, output_folder=None, max_workers=None, rawtext_file=False, rawtext_stdout=False, preserve_privacy: bool = False, extractor: str = 'pdfplumber', cache: Optional[ResultCache] = None, parse_workers: int = 0, write_workers: int = 1, max_in_flight: Optional[int] = None, max_tasks_per_child: Optional[int] = None, profile: bool = False, compact: bool = False, dedupe: Optional[DedupeIndex] = None):
     """
-    Process all PDF files in a folder to extract receipt data.
+    Process all PDF files in a folder, yielding receipt data as it completes.
+
+    Files go through the staged pipeline of ``run_pipeline``: text extraction
+    on a pool of ``max_workers`` processes, parsing, and output writing. A
+    folder without PDFs but with ``.txt`` raw text dumps is re-parsed without
+    the extraction stage. ``input_folder`` may also be a zip or tar archive,
+    whose PDF members are streamed to the workers without being unpacked.
+    Results are yielded in completion order and are not accumulated, so
+    consumers such as ``dump_items_to_csv`` can handle arbitrarily large
+    folders in constant memory. The summary and ``processing_log.csv`` are
+    written once the generator is exhausted.
 
     Args:
-        input_folder (Path): Path to the input folder containing PDF files.
+        input_folder (Path): Path to the input folder containing PDF files, or to a zip or tar archive.
         output_folder (Optional[Path]): Path to the output folder for JSON files.
         max_workers (Optional[int]): Maximum number of concurrent threads to use.
         rawtext_file (bool): If True, output raw text to files.
         rawtext_stdout (bool): If True, print raw text to the console.
         preserve_privacy (bool): If True, anonymize the output.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        cache (Optional[ResultCache]): If given, reuse and store parse results keyed by the PDF content.
+            The cache is pruned to its size cap once all files are processed.
+        parse_workers (int): Number of separate parsing processes. 0 parses in the extraction processes.
+        write_workers (int): Number of output writing threads.
+        max_in_flight (Optional[int]): Maximum number of files read but not yet yielded. Bounds memory
+            on large folders; defaults to four per extraction process.
+        max_tasks_per_child (Optional[int]): Replace worker processes after this many files (Python 3.11+).
+        profile (bool): If True, print a report of the per-stage timings and the slowest files.
+        compact (bool): If True, write the JSON files without whitespace.
+        dedupe (Optional[DedupeIndex]): If given, skip PDFs repeating a file or receipt recorded in the
+            index, before their text is extracted or parsed, and log them as duplicates.
+
+    Yields:
+        dict: Parsed receipt data.
 
-    Returns:
-        List[dict]: List of parsed receipt data dictionaries.
-    
     Raises:
         ValueError: If both JSON and PDF files are found in the input folder.
     """
@@ -111,66 +225,95 @@ def process_folder(input_folder, output_folder=None, max_workers=None, rawtext_f
     start_time = time.time()
     success_count = 0
     failure_count = 0
+    duplicate_count = 0
     log_entries = []
 
-    pdf_files = list(input_folder.glob("*.pdf"))
-    json_files = list(input_folder.glob("*.json"))
-    total_files = len(pdf_files)
-    parsed_receipts = []
+    total = None
+    if input_folder.is_file() and is_archive_path(input_folder):
+        pdf_files = iter_archive_pdfs(input_folder)
+        total = count_archive_pdfs(input_folder)
+        json_files = []
+    else:
+        pdf_files = list(input_folder.glob("*.pdf"))
+        json_files = [path for path in input_folder.glob("*.json") if is_receipt_json(path)]
+        if not pdf_files and not json_files:
+            pdf_files = list(input_folder.glob("*" + TEXT_SUFFIX))
 
     if pdf_files and json_files:
         raise ValueError("Only one type of files (PDF or JSON) is allowed in the source folder at the same time.")
     
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {}
-        for pdf_file in pdf_files:
-            output_file = (output_folder / (pdf_file.stem + ".json")) if output_folder else None
-            # MODIFICATION: Pass preserve_privacy flag to the worker
-            future = executor.submit(process_pdf, pdf_file, output_file, rawtext_file, rawtext_stdout, preserve_privacy)
-            futures[future] = pdf_file
-
-        with tqdm(total=total_files, desc="Processing PDFs", unit="file") as pbar:
-            for future in as_completed(futures):
-                pdf_file = futures[future]
-                try:
-                    result = future.result()
-                    if result:
-                        parsed_receipts.append(result)
-                    log_entries.append((pdf_file.name, "Success", ""))
-                    success_count += 1
-                except Exception as exc:
-                    log_entries.append((pdf_file.name, "Failure", str(exc)))
-                    failure_count += 1
-                pbar.update(1)
+    profile_records = []
+    for pdf_file, result, error, timings in _iter_pdf_results(pdf_files, output_folder, max_workers, rawtext_file, rawtext_stdout, preserve_privacy, extractor, cache, parse_workers, write_workers, max_in_flight, max_tasks_per_child, compact, total, dedupe):
+        if error is None:
+            if result:
+                yield result
+            log_entries.append(processing_log_row(pdf_file.name, "Success", "", timings))
+            success_count += 1
+        elif isinstance(error, DuplicateReceiptError):
+            log_entries.append(processing_log_row(pdf_file.name, "Duplicate", str(error), timings))
+            duplicate_count += 1
+        else:
+            log_entries.append(processing_log_row(pdf_file.name, "Failure", str(error), timings))
+            failure_count += 1
+        profile_records.append((pdf_file.name, timings))
 
     for json_file in json_files:
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                receipt = json.load(f)
-                # MODIFICATION: Anonymize if processing from JSON source
-                if preserve_privacy:
-                    receipt = anonymize_receipt_dict(receipt)
-                parsed_receipts.append(receipt)
-            log_entries.append((json_file.name, "Success", ""))
+            receipt = load_json_file(json_file)
+            # MODIFICATION: Anonymize if processing from JSON source
+            if preserve_privacy:
+                receipt = anonymize_receipt_dict(receipt)
+            yield receipt
+            log_entries.append(processing_log_row(json_file.name, "Success"))
             success_count += 1
         except Exception as exc:
-            log_entries.append((json_file.name, "Failure", str(exc)))
+            log_entries.append(processing_log_row(json_file.name, "Failure", str(exc)))
             failure_count += 1
 
     end_time = time.time()
     elapsed_time = end_time - start_time
 
     # Print summary
-    print(f"Processed {success_count + failure_count} files in {elapsed_time:.2f} seconds.")
+    print(f"Processed {success_count + failure_count + duplicate_count} files in {elapsed_time:.2f} seconds.")
     print(f"Successfully processed: {success_count}")
     print(f"Failed to process: {failure_count}")
+    if dedupe is not None:
+        print(f"Skipped duplicates: {duplicate_count}")
+    if profile and profile_records:
+        from .profiling import format_profile
+        print(format_profile(profile_records))
 
     # Save log to CSV
     if output_folder:
-        log_file_path = output_folder / 'processing_log.csv'
-        with open(log_file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            log_writer = csv.writer(csvfile)
-            log_writer.writerow(["File Name", "Status", "Error Message"])
-            log_writer.writerows(log_entries)
-    
-    return parsed_receipts
+        write_processing_log(output_folder / PROCESSING_LOG_NAME, log_entries)
+
+def process_folder(input_folder, output_folder=None, max_workers=None, rawtext_file=False, rawtext_stdout=False, preserve_privacy: bool = False, extractor: str = 'pdfplumber', cache: Optional[ResultCache] = None, parse_workers: int = 0, write_workers: int = 1, max_in_flight: Optional[int] = None, max_tasks_per_child: Optional[int] = None, profile: bool = False, compact: bool = False, dedupe: Optional[DedupeIndex] = None):
+    """
+    Process all PDF files in a folder to extract receipt data.
+
+    Args:
+        input_folder (Path): Path to the input folder containing PDF files, or to a zip or tar archive.
+        output_folder (Optional[Path]): Path to the output folder for JSON files.
+        max_workers (Optional[int]): Maximum number of concurrent threads to use.
+        rawtext_file (bool): If True, output raw text to files.
+        rawtext_stdout (bool): If True, print raw text to the console.
+        preserve_privacy (bool): If True, anonymize the output.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        cache (Optional[ResultCache]): If given, reuse and store parse results keyed by the PDF content.
+            The cache is pruned to its size cap once all files are processed.
+        parse_workers (int): Number of separate parsing processes. 0 parses in the extraction processes.
+        write_workers (int): Number of output writing threads.
+        max_in_flight (Optional[int]): Maximum number of files read but not yet yielded. Bounds memory
+            on large folders; defaults to four per extraction process.
+        max_tasks_per_child (Optional[int]): Replace worker processes after this many files (Python 3.11+).
+        profile (bool): If True, print a report of the per-stage timings and the slowest files.
+        compact (bool): If True, write the JSON files without whitespace.
+        dedupe (Optional[DedupeIndex]): If given, skip PDFs repeating a file or receipt recorded in the index.
+
+    Returns:
+        List[dict]: List of parsed receipt data dictionaries.
+
+    Raises:
+        ValueError: If both JSON and PDF files are found in the input folder.
+    """
+    return list(iter_process_folder(input_folder, output_folder, max_workers, rawtext_file, rawtext_stdout, preserve_privacy, extractor, cache, parse_workers, write_workers, max_in_flight, max_tasks_per_child, profile, compact, dedupe))
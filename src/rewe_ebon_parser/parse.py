@@ -1,13 +1,16 @@
 # src/rewe_ebon_parser/parse.py
 
 import re
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional
-import pdfplumber
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
 import io
 import math
+import mmap
+import os
 import pytz
-from collections import OrderedDict
+from .classify import classify_line
 from .classes import (
     LoyaltyData,
     MarketAddress,
@@ -22,456 +25,285 @@ from .classes import (
     TaxDetailsEntry,
 )
 
-def _parse_date(line: str) -> Optional[datetime]:
+def _date_from_match(timestamp_hit: re.Match) -> datetime:
     """
-    Parse date from a line of text.
+    Build a localized datetime from a receipt timestamp match.
 
     Args:
-        line (str): The line of text.
+        timestamp_hit (re.Match): A match of ``DATE_PATTERN``.
 
     Returns:
-        Optional[datetime]: The parsed date or None.
+        datetime: The receipt date in the Europe/Berlin timezone.
     """
-    timestamp_hit = re.search(r'(\d{2})\.(\d{2})\.(\d{4}) (\d{2}):(\d{2}) Bon-Nr\.:', line)
-    if timestamp_hit:
-        date = datetime(
-            year=int(timestamp_hit.group(3)),
-            month=int(timestamp_hit.group(2)),
-            day=int(timestamp_hit.group(1)),
-            hour=int(timestamp_hit.group(4)),
-            minute=int(timestamp_hit.group(5)),
-            second=0
-        )
-        local_tz = pytz.timezone('Europe/Berlin')
-        date = local_tz.localize(date)
-        return date
-    return None
+    date = datetime(
+        year=int(timestamp_hit.group(3)),
+        month=int(timestamp_hit.group(2)),
+        day=int(timestamp_hit.group(1)),
+        hour=int(timestamp_hit.group(4)),
+        minute=int(timestamp_hit.group(5)),
+        second=0
+    )
+    local_tz = pytz.timezone('Europe/Berlin')
+    return local_tz.localize(date)
 
-def extract_raw_text(data_buffer: bytes) -> str:
-    """
-    Extract raw text from a PDF data buffer.
+EXTRACTORS = ('pdfplumber', 'pdfium')
 
-    Args:
-        data_buffer (bytes): The PDF data buffer.
+# A PDF given as its path or as an in-memory buffer (bytes, memoryview, mmap)
+PdfSource = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap]
 
-    Returns:
-        str: The extracted raw text.
-    """
-    raw_text = ''
-    with pdfplumber.open(io.BytesIO(data_buffer)) as pdf:
-        for page in pdf.pages:
-            raw_text += page.extract_text() + '\n'
-    return raw_text
+# Market address in the receipt header, either on its own lines
+# ("****** Street 1 ******\n****** 12345 City ******") or comma-separated.
+# The lookbehinds skip start positions inside a run the pattern would consume
+# anyway, so a failing search does not rescan the run from every position.
+_ADDRESS_PATTERN = re.compile(r'(?<![\s*])[\s*]*([a-zäöüß \d.,-]+?)\s*[\s*]*(\d{5})\s*([a-zäöüß \d.,-]+)', re.IGNORECASE)
+_ADDRESS_PATTERN_COMMA = re.compile(r'(?<![\wäöüß \d.,-])([\wäöüß \d.,-]+),\s*(\d{5})\s*([\wäöüß \d.,-]+)', re.IGNORECASE)
 
-def parse_ebon(data_buffer: bytes) -> dict:
+def _find_market_address(lines: List[str]) -> Optional[MarketAddress]:
     """
-    Parse receipt data from a PDF data buffer.
+    Find the market address in the header of a receipt.
+
+    Only the lines before the first ``UID Nr.:`` or ``EUR`` line are searched,
+    so the cost does not grow with the number of items.
 
     Args:
-        data_buffer (bytes): The PDF data buffer.
+        lines (List[str]): The normalized lines of a receipt, see ``iter_text_lines``.
 
     Returns:
-        dict: The parsed receipt data.
+        Optional[MarketAddress]: The market address, if found.
     """
-    data_text = extract_raw_text(data_buffer)
-
-    lines = list(filter(None, map(str.strip, data_text.replace('  ', ' ').split('\n'))))
-
-    detected_loyalty_program = None
-    # Pre-scan for loyalty program so items can be labeled correctly
-    for line in lines:
-        if 'Deine REWE PAYBACK Vorteile' in line:
-            detected_loyalty_program = "PAYBACK"
-            break
-        if 'Deine REWE Bonus-Vorteile' in line:
-            detected_loyalty_program = "REWE Bonus"
-            break
-
-    date = None
-    market = '?'
-    market_address = None
-    cashier = '?'
-    checkout = '?'
-    uid = '?'
-    items = []
-    total = float('nan')
-    given = []
-    change = float('nan')
-    payout = float('nan')
-    payback_points_before = float('nan')
-    payback_points = float('nan')
-    payback_revenue = float('nan')
-    payback_card_number = '?'
-    payback_coupons = []
-    rewe_bonus_earned_credit = None
-    rewe_bonus_used_credit = None
-    rewe_bonus_new_total_credit = None
-    rewe_bonus_coupons = []
-    used_rewe_credit = float('nan')
-    new_rewe_credit = float('nan')
-    tax_details_total = TaxDetailsEntry(float('nan'), float('nan'), float('nan'), float('nan'))
-    tax_details_A = None
-    tax_details_B = None
-    tax_details_C = None
-
-    # Improved address extraction logic to handle both formats
-    address_match_1 = re.search(r'[\s\*]*([a-zäöüß \d.,-]+?)\s*[\s\*]*(\d{5})\s*([a-zäöüß \d.,-]+)[\s\*]*', data_text, re.IGNORECASE)
-    address_match_2 = re.search(r'([\wäöüß \d.,-]+),\s*(\d{5})\s*([\wäöüß \d.,-]+)', data_text, re.IGNORECASE)
-    if address_match_1:
-        market_address = MarketAddress(
-            street=address_match_1.group(1).replace('  ', ' ').replace(',', '').strip(),
-            zip=address_match_1.group(2),
-            city=address_match_1.group(3).strip()
-        )
-    elif address_match_2:
-        market_address = MarketAddress(
-            street=address_match_2.group(1).replace('  ', ' ').replace(',', '').strip(),
-            zip=address_match_2.group(2),
-            city=address_match_2.group(3).strip()
-        )
-
-    # Detect the dedicated item block bounded by the EUR marker and dashed separator.
-    uid_index = -1
-    for idx, line in enumerate(lines):
-        if 'UID Nr.:' in line:
-            uid_index = idx
-            break
-
-    start_index = -1
-    if uid_index != -1:
-        for idx in range(uid_index + 1, len(lines)):
-            if lines[idx].strip() == 'EUR':
-                start_index = idx + 1  # start parsing after the EUR marker
-                break
-
-    end_index = -1
-    if start_index != -1:
-        for idx in range(start_index, len(lines)):
-            if lines[idx].strip().startswith('--------------------------------------'):
-                end_index = idx
-                break
-
-    def _process_item_line(line: str) -> bool:
-        # First, check for quantity/weight lines, as they modify the last added item.
-        menge_hit = re.match(r'(.*) (.*) x (.*).*', line)
-        if menge_hit:
-            amount = float(menge_hit.group(1).replace(',', '.'))
-            unit = menge_hit.group(2)
-            price_per_unit_str = re.search(r'(\d+,\d+)', menge_hit.group(3))
-            price_per_unit = float(price_per_unit_str.group(1).replace(',', '.')) if price_per_unit_str else None
-            if unit == 'Stk':
-                amount = int(amount)
-            if items:
-                items[-1].amount = amount
-                items[-1].unit = unit
-                items[-1].price_per_unit = price_per_unit
-            return True
-
-        menge_handeingabe_hit = re.match(r"Handeingabe E-Bon\s*(\d+,\d+)\s*([a-zA-Z]*)", line)
-        if menge_handeingabe_hit:
-            amount = float(menge_handeingabe_hit.group(1).replace(",","."))
-            unit = menge_handeingabe_hit.group(2)
-            if items:
-                items[-1].amount = amount
-                items[-1].unit = unit
-                items[-1].price_per_unit = items[-1].sub_total/amount
-            return True
-
-        # If not a quantity line, check for one or more item definitions.
-        # This handles cases where multiple items are merged onto a single line.
-        item_pattern = r'(-?\d+,\d\d) ([ABC]) ?(\*?)'
-        matches = list(re.finditer(item_pattern, line))
+    header_end = next((idx for idx, line in enumerate(lines) if 'UID Nr.:' in line or line == 'EUR'), len(lines))
+    header = '\n'.join(lines[:header_end])
+    address_hit = _ADDRESS_PATTERN.search(header) or _ADDRESS_PATTERN_COMMA.search(header)
+    if address_hit is None:
+        return None
+    street, zip_code, city = address_hit.groups()
+    return MarketAddress(
+        street=street.replace('  ', ' ').replace(',', '').strip(),
+        zip=zip_code,
+        city=city.strip()
+    )
 
-        if not matches:
-            return False # Not a line with parsable items.
+def _is_path(source: PdfSource) -> bool:
+    return isinstance(source, (str, os.PathLike))
 
-        last_pos = 0
-        processed_item = False
-        for match in matches:
-            # The item name is the text between the end of the last full match and
-            # the beginning of the current price match.
-            item_name = line[last_pos:match.start()].strip()
-            
-            # Skip if there's no item name (e.g., malformed line)
-            if not item_name:
-                last_pos = match.end()
-                continue
-            
-            price_str = match.group(1)
-            category = match.group(2)
-            star = match.group(3)
+@contextmanager
+def open_pdf_buffer(pdf_path: Union[str, os.PathLike]) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Map a PDF file into memory for reading.
 
-            price = float(price_str.replace(',', '.'))
-            loyalty_program_qualified = detected_loyalty_program if (not star and price > 0) else None
+    The file is memory-mapped, so its pages are loaded by the OS on demand
+    instead of being copied into a bytes object. Empty files, which cannot
+    be mapped, are read normally.
 
-            items.append(ReceiptItem(
-                tax_category=category,
-                name=item_name,
-                sub_total=price,
-                amount=1, # Default amount, may be overridden by a following line
-                loyalty_program_qualified=loyalty_program_qualified
-            ))
-            
-            last_pos = match.end()
-            processed_item = True
-        
-        return processed_item
+    Args:
+        pdf_path (Union[str, os.PathLike]): Path to the PDF file.
 
-    def _process_non_item_line(line: str) -> bool:
-        nonlocal total, change, payout, date, market, checkout, cashier, uid
-        nonlocal payback_card_number, payback_points_before, payback_points, payback_revenue
-        nonlocal tax_details_total, tax_details_A, tax_details_B, tax_details_C
-        nonlocal used_rewe_credit, new_rewe_credit
-        nonlocal rewe_bonus_earned_credit, rewe_bonus_used_credit, rewe_bonus_new_total_credit
+    Yields:
+        Union[mmap.mmap, bytes]: The read-only file contents.
+    """
+    with open(pdf_path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield f.read()
+            return
+        with buffer:
+            yield buffer
+
+@contextmanager
+def _pdf_stream(source: PdfSource):
+    if _is_path(source):
+        with open_pdf_buffer(source) as buffer:
+            yield buffer if isinstance(buffer, mmap.mmap) else io.BytesIO(buffer)
+    elif isinstance(source, mmap.mmap):
+        yield source
+    else:
+        yield io.BytesIO(source)
 
-        total_hit = re.match(r'SUMME EUR (-?\d*,\d\d)', line)
-        if total_hit:
-            total = float(total_hit.group(1).replace(',', '.'))
-            return True
+def _iter_pages_pdfplumber(source: PdfSource) -> Iterator[str]:
+    """
+    Extract the text of each page with pdfplumber's layout analysis.
 
-        gegeben_hit = re.match(r'Geg\.(.*) EUR ([0-9,]*)', line)
-        if gegeben_hit:
-            given.append(Payment(
-                type=gegeben_hit.group(1).strip(),
-                value=float(gegeben_hit.group(2).replace(',', '.'))
-            ))
-            return True
+    pdfplumber is imported on first use, so text-only parsing never pays
+    for loading the PDF stack. Paths are memory-mapped and mapped buffers
+    are read in place. Pages are extracted as they are consumed.
 
-        return_hit = re.match(r'Rückgeld BAR EUR ([0-9,]*)', line)
-        if return_hit:
-            change = float(return_hit.group(1).replace(',', '.'))
-            return True
+    Args:
+        source (PdfSource): Path to the PDF file or the PDF data buffer.
 
-        payout_match = re.match(r'AUSZAHLUNG EUR ([0-9,]*)', line)
-        if payout_match:
-            payout = float(payout_match.group(1).replace(',', '.'))
-            return True
+    Yields:
+        str: The text of one page, ending with a newline.
+    """
+    import pdfplumber
 
-        parsed_date = _parse_date(line)
-        if parsed_date:
-            date = parsed_date
-            return True
+    with _pdf_stream(source) as stream, pdfplumber.open(stream) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() + '\n'
+            # Drop the page's parsed layout before moving on to the next one
+            page.close()
 
-        markt_match = re.match(r'Markt:(.*) Kasse:(.*) Bed\.:(.*)', line)
-        if markt_match:
-            market = markt_match.group(1).strip()
-            checkout = markt_match.group(2).strip()
-            cashier = markt_match.group(3).strip()
-            return True
+def _pdfium_pages(source: PdfSource) -> Optional[List[str]]:
+    """
+    Extract the text of each page by reading its text runs in content order.
 
-        uid_match = re.match(r'UID Nr.: (.*)', line)
-        if uid_match:
-            uid = uid_match.group(1).strip()
-            return True
+    eBons are single-column, machine-generated PDFs, so the text runs already
+    come in reading order. Lines are stripped of their padding and blank lines
+    are dropped, which reproduces pdfplumber's output for such documents.
+    Paths are opened by PDFium itself; buffers other than bytes are copied.
 
-        payback_info_match = re.match(r'PAYBACK Karten-Nr\.: ([0-9#]*)Punkte vor dem Einkauf: ([0-9.,]*) Punkte', line)
-        if payback_info_match:
-            payback_card_number = payback_info_match.group(1)
-            payback_points_before = int(payback_info_match.group(2).replace('.', '').replace(',', ''))
-            return True
-
-        payback_points_match = re.match(r'Sie erhalten (\d*) PAYBACK Punkte? auf|Mit diesem Einkauf gesammelt: (\d*) Punkte?', line)
-        if payback_points_match:
-            match = next(group for group in payback_points_match.groups() if group is not None)
-            payback_points = int(match)
-            return True
+    Args:
+        source (PdfSource): Path to the PDF file or the PDF data buffer.
 
-        payback_revenue_match = re.match(r'einen PAYBACK Umsatz von (.*) EUR!', line)
-        if payback_revenue_match:
-            payback_revenue = float(payback_revenue_match.group(1).replace(',', '.'))
-            return True
+    Returns:
+        Optional[List[str]]: The text of each page, ending with a newline, or
+        None if pypdfium2 is not installed.
+    """
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+
+    pages = []
+    if _is_path(source):
+        source = Path(source)
+    elif not isinstance(source, bytes):
+        source = bytes(source)
+    pdf = pypdfium2.PdfDocument(source)
+    try:
+        for page in pdf:
+            textpage = page.get_textpage()
+            page_text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+            page_lines = (line.strip(' ') for line in page_text.replace('\r\n', '\n').split('\n'))
+            pages.append('\n'.join(line for line in page_lines if line) + '\n')
+    finally:
+        pdf.close()
+    return pages
+
+def _looks_like_ebon_text(pages: List[str]) -> bool:
+    """
+    Check whether extracted text looks like a regular eBon.
 
-        payback_points_before_match = re.match(r'Punktestand vor Einkauf: ([0-9.]*)|Punkte vor dem Einkauf: ([0-9.]*)', line)
-        if payback_points_before_match:
-            match = next(group for group in payback_points_before_match.groups() if group is not None)
-            payback_points_before = int(match.replace('.', ''))
-            return True
+    Args:
+        pages (List[str]): The extracted text of each page.
 
-        payback_card_number_match = re.match(r'PAYBACK Karten-Nr\.: ([0-9#]*)', line)
-        if payback_card_number_match:
-            payback_card_number = payback_card_number_match.group(1)
-            return True
+    Returns:
+        bool: False if the text is empty, lacks the EUR marker or contains
+        control or replacement characters.
+    """
+    if not any(page.strip() for page in pages) or not any('EUR' in page for page in pages):
+        return False
+    return not any((ord(char) < 32 and char != '\n') or char in '\ufffd\ufffe' for page in pages for char in page)
 
-        payback_coupon_match = re.match(r'(.*) ([0-9.]*) Punkte?', line)
-        if payback_coupon_match:
-            payback_coupons.append(PaybackCoupon(
-                name=payback_coupon_match.group(1),
-                points=int(payback_coupon_match.group(2).replace('.', ''))
-            ))
-            return True
+def iter_page_texts(data_buffer: PdfSource, extractor: str = 'pdfplumber') -> Iterator[str]:
+    """
+    Extract the text of a PDF page by page.
 
-        if detected_loyalty_program == "REWE Bonus":
-            earned_credit_match = re.match(r'Mit diesem Einkauf hast du ([0-9.,]+) EUR', line)
-            if earned_credit_match:
-                rewe_bonus_earned_credit = float(earned_credit_match.group(1).replace('.', '').replace(',', '.'))
-                return True
-
-            used_bonus_credit_match = re.match(r'Eingesetztes Bonus-Guthaben: ([0-9.,]+) EUR', line)
-            if used_bonus_credit_match:
-                rewe_bonus_used_credit = float(used_bonus_credit_match.group(1).replace('.', '').replace(',', '.'))
-                return True
-
-            new_total_credit_match = re.match(r'Aktuelles Bonus-Guthaben: ([0-9.,]+) EUR', line)
-            if new_total_credit_match:
-                rewe_bonus_new_total_credit = float(new_total_credit_match.group(1).replace('.', '').replace(',', '.'))
-                return True
-
-            rewe_bonus_coupon_match = re.match(r'(.*) ([0-9.,]+) EUR', line)
-            if rewe_bonus_coupon_match and 'Bonus-Guthaben' not in line and 'Mit diesem Einkauf' not in line:
-                coupon_name = rewe_bonus_coupon_match.group(1).strip()
-                if coupon_name:
-                    rewe_bonus_coupons.append(REWEBonusCoupon(
-                        name=coupon_name,
-                        value=float(rewe_bonus_coupon_match.group(2).replace('.', '').replace(',', '.'))
-                    ))
-                    return True
-
-        tax_details_match = re.match(r'([ABC])= ([0-9,]*)% ([0-9,]*) ([0-9,]*) ([0-9,]*)', line)
-        if tax_details_match:
-            category = tax_details_match.group(1)
-            tax_details_entry = TaxDetailsEntry(
-                tax_percent=float(tax_details_match.group(2).replace(',', '.')),
-                net=float(tax_details_match.group(3).replace(',', '.')),
-                tax=float(tax_details_match.group(4).replace(',', '.')),
-                gross=float(tax_details_match.group(5).replace(',', '.'))
-            )
-            if category == 'A':
-                tax_details_A = tax_details_entry
-            elif category == 'B':
-                tax_details_B = tax_details_entry
-            elif category == 'C':
-                tax_details_C = tax_details_entry
-            return True
+    Args:
+        data_buffer (PdfSource): The PDF data buffer, or a path to the PDF file.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
 
-        total_tax_match = re.match(r'Gesamtbetrag ([0-9,]*) ([0-9,]*) ([0-9,]*)', line)
-        if total_tax_match:
-            tax_details_total = TaxDetailsEntry(
-                tax_percent=float('nan'),
-                net=float(total_tax_match.group(1).replace(',', '.')),
-                tax=float(total_tax_match.group(2).replace(',', '.')),
-                gross=float(total_tax_match.group(3).replace(',', '.'))
-            )
-            return True
+    Yields:
+        str: The text of one page, ending with a newline.
 
-        used_rewe_credit_match = re.match(r'Eingesetztes REWE Guthaben: ([0-9,]*) EUR', line)
-        if used_rewe_credit_match:
-            used_rewe_credit = float(used_rewe_credit_match.group(1).replace(',', '.'))
+    Raises:
+        ValueError: If the extractor is unknown.
+    """
+    if extractor not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{extractor}'. Choose one of: {', '.join(EXTRACTORS)}.")
 
-        new_rewe_credit_match = re.match(r'Neues REWE Guthaben: ([0-9,]*) EUR', line)
-        if new_rewe_credit_match:
-            new_rewe_credit = float(new_rewe_credit_match.group(1).replace(',', '.'))
+    if extractor == 'pdfium':
+        try:
+            pages = _pdfium_pages(data_buffer)
+        except Exception:
+            pages = None
+        if pages is not None and _looks_like_ebon_text(pages):
+            yield from pages
+            return
 
-        return False
+    yield from _iter_pages_pdfplumber(data_buffer)
 
-    if start_index != -1 and end_index != -1:
-        header_lines = lines[:start_index]
-        item_lines = lines[start_index:end_index]
-        footer_lines = lines[end_index:]
+def iter_text_lines(pages: Iterable[str]) -> Iterator[str]:
+    """
+    Split extracted text into the normalized lines the parser works on.
 
-        for line in header_lines + footer_lines:
-            if _process_non_item_line(line):
-                continue
+    Double spaces are collapsed, lines are stripped and blank lines are
+    dropped. Pages are split one at a time, so the whole text is never
+    assembled or copied.
 
-        for line in item_lines:
-            if _process_item_line(line):
-                continue
-    else:
-        for line in lines:
-            if _process_item_line(line):
-                continue
-            if _process_non_item_line(line):
-                continue
+    Args:
+        pages (Iterable[str]): The extracted text, e.g. one string per page.
 
-    if date is None:
-        raise ValueError("Date not found in the receipt")
+    Yields:
+        str: One non-empty, normalized line.
+    """
+    for page in pages:
+        for line in page.split('\n'):
+            line = line.replace('  ', ' ').strip()
+            if line:
+                yield line
 
-    real_total_in_cents = sum(item.sub_total * 100 for item in items)
-    total_in_cents = total * 100
+def extract_raw_text(data_buffer: PdfSource, extractor: str = 'pdfplumber') -> str:
+    """
+    Extract raw text from a PDF.
 
-    if round(real_total_in_cents, 2) != round(total_in_cents, 2):
-        raise ValueError(f"Something went wrong when parsing the eBon: The eBon states a total sum of {total_in_cents} but the parser only found items worth {real_total_in_cents}.")
+    Args:
+        data_buffer (PdfSource): The PDF data buffer, or a path to the PDF file.
+            Files and ``mmap`` buffers are read without copying the whole PDF.
+        extractor (str): The text extraction backend, one of ``EXTRACTORS``.
+            ``'pdfium'`` reads the text runs directly and is much faster; it
+            falls back to ``'pdfplumber'`` when its output looks unusual.
 
-    loyalty_data = None
-    if detected_loyalty_program == "PAYBACK" and payback_card_number != '?':
-        qualified_revenue = payback_revenue if not math.isnan(payback_revenue) else sum(item.sub_total for item in items if item.loyalty_program_qualified or item.sub_total < 0)
-        payback_details = PaybackDetails(
-            card=payback_card_number,
-            points_before=payback_points_before,
-            earned_points=payback_points,
-            used_coupons=payback_coupons,
-            used_rewe_credit=used_rewe_credit if not math.isnan(used_rewe_credit) else None,
-            new_rewe_credit=new_rewe_credit if not math.isnan(new_rewe_credit) else None,
-            payback_revenue=qualified_revenue
-        )
-        loyalty_data = LoyaltyData(program="PAYBACK", details=payback_details)
-    elif detected_loyalty_program == "REWE Bonus" and rewe_bonus_earned_credit is not None:
-        rewe_bonus_details = REWEBonusDetails(
-            earned_credit=rewe_bonus_earned_credit,
-            used_credit=rewe_bonus_used_credit,
-            new_total_credit=rewe_bonus_new_total_credit,
-            used_coupons=rewe_bonus_coupons
-        )
-        loyalty_data = LoyaltyData(program="REWE Bonus", details=rewe_bonus_details)
+    Returns:
+        str: The extracted raw text.
 
-    receipt = Receipt(
-        date=date,
-        market=market,
-        market_address=market_address,
-        cashier=cashier,
-        checkout=checkout,
-        vatin=uid,
-        items=items,
-        total=total,
-        given=given,
-        change=change if not math.isnan(change) else None,
-        payout=payout if not math.isnan(payout) else None,
-        loyalty=loyalty_data,
-        tax_details=TaxDetails(
-                total=tax_details_total,
-                A=tax_details_A,
-                B=tax_details_B,
-                C=tax_details_C
-            )
-    )
+    Raises:
+        ValueError: If the extractor is unknown.
+    """
+    return ''.join(iter_page_texts(data_buffer, extractor))
 
-    # Create an ordered dictionary to ensure specific order of keys
-    receipt_dict = receipt.to_dict()
-    ordered_receipt_dict = OrderedDict([
-        ('datetime_local', receipt_dict.get('datetime_local')),
-        ('datetime_utc', receipt_dict.get('datetime_utc')),
-        ('market', receipt_dict.get('market')),
-        ('marketAddress', receipt_dict.get('marketAddress')),
-        ('cashier', receipt_dict.get('cashier')),
-        ('checkout', receipt_dict.get('checkout')),
-        ('vatin', receipt_dict.get('vatin')),
-        ('items', receipt_dict.get('items')),
-        ('total', receipt_dict.get('total')),
-        ('given', receipt_dict.get('given')),
-        ('change', receipt_dict.get('change')),
-        ('payout', receipt_dict.get('payout')),
-        ('loyalty', receipt_dict.get('loyalty')),
-        ('taxDetails', receipt_dict.get('taxDetails')),
-    ])
-
-    # Remove None values to clean up the dictionary
-    ordered_receipt_dict = {k: v for k, v in ordered_receipt_dict.items() if v is not None}
-
-    return ordered_receipt_dict
-
-def parse_text_ebon(text: str) -> dict:
+def parse_text_ebon(text: str, strict: bool = False, as_object: bool = False) -> Union[dict, Receipt]:
     """
     Parse receipt data from extracted text.
 
     Args:
         text (str): The extracted text from a receipt.
+        strict (bool): If True, require a date and a total, as found in text
+            freshly extracted from a PDF. Otherwise anonymized text dumps
+            are accepted: a missing date defaults to 1970-01-01 and a missing
+            total skips the total validation.
+        as_object (bool): If True, return the ``Receipt`` object instead of
+            its dictionary.
 
     Returns:
-        dict: The parsed receipt data.
+        Union[dict, Receipt]: The parsed receipt data.
+
+    Raises:
+        ValueError: If the items do not add up to the total, or if ``strict``
+            is set and the date is missing.
+    """
+    return _parse_lines(list(iter_text_lines([text])), strict, as_object)
+
+def _parse_lines(lines: List[str], strict: bool, as_object: bool) -> Union[dict, Receipt]:
     """
-    data_text = text
+    Parse receipt data from the normalized lines of a receipt.
 
-    lines = list(filter(None, map(str.strip, data_text.replace('  ', ' ').split('\n'))))
+    The lines are collected in a list because the loyalty program, found in
+    the footer, decides how the items above it are labeled.
 
+    Args:
+        lines (List[str]): The lines from ``iter_text_lines``.
+        strict (bool): See ``parse_text_ebon``.
+        as_object (bool): See ``parse_text_ebon``.
+
+    Returns:
+        Union[dict, Receipt]: The parsed receipt data.
+
+    Raises:
+        ValueError: If the items do not add up to the total, or if ``strict``
+            is set and the date is missing.
+    """
     detected_loyalty_program = None
     # Pre-scan for loyalty program so items can be labeled correctly
     for line in lines:
@@ -483,8 +315,8 @@ def parse_text_ebon(text: str) -> dict:
             break
 
     date = None
+    bon_nr = None
     market = '?'
-    market_address = None
     cashier = '?'
     checkout = '?'
     uid = '?'
@@ -509,22 +341,9 @@ def parse_text_ebon(text: str) -> dict:
     tax_details_B = None
     tax_details_C = None
 
-    # Improved address extraction logic to handle both formats
-    address_match_1 = re.search(r'[\s\*]*([a-zäöüß \d.,-]+?)\s*[\s\*]*(\d{5})\s*([a-zäöüß \d.,-]+)[\s\*]*', data_text, re.IGNORECASE)
-    address_match_2 = re.search(r'([\wäöüß \d.,-]+),\s*(\d{5})\s*([\wäöüß \d.,-]+)', data_text, re.IGNORECASE)
-    if address_match_1:
-        market_address = MarketAddress(
-            street=address_match_1.group(1).replace('  ', ' ').replace(',', '').strip(),
-            zip=address_match_1.group(2),
-            city=address_match_1.group(3).strip()
-        )
-    elif address_match_2:
-        market_address = MarketAddress(
-            street=address_match_2.group(1).replace('  ', ' ').replace(',', '').strip(),
-            zip=address_match_2.group(2),
-            city=address_match_2.group(3).strip()
-        )
+    market_address = _find_market_address(lines)
 
+    # Detect the dedicated item block bounded by the EUR marker and dashed separator.
     uid_index = -1
     for idx, line in enumerate(lines):
         if 'UID Nr.:' in line:
@@ -535,7 +354,7 @@ def parse_text_ebon(text: str) -> dict:
     if uid_index != -1:
         for idx in range(uid_index + 1, len(lines)):
             if lines[idx].strip() == 'EUR':
-                start_index = idx + 1
+                start_index = idx + 1  # start parsing after the EUR marker
                 break
 
     end_index = -1
@@ -612,122 +431,72 @@ def parse_text_ebon(text: str) -> dict:
         return processed_item
 
     def _process_non_item_line(line: str) -> bool:
-        nonlocal total, change, payout, date, market, checkout, cashier, uid
+        nonlocal total, change, payout, date, bon_nr, market, checkout, cashier, uid
         nonlocal payback_card_number, payback_points_before, payback_points, payback_revenue
         nonlocal tax_details_total, tax_details_A, tax_details_B, tax_details_C
         nonlocal used_rewe_credit, new_rewe_credit
         nonlocal rewe_bonus_earned_credit, rewe_bonus_used_credit, rewe_bonus_new_total_credit
 
-        total_hit = re.match(r'SUMME EUR (-?\d*,\d\d)', line)
-        if total_hit:
-            total = float(total_hit.group(1).replace(',', '.'))
-            return True
+        classified = classify_line(line, detected_loyalty_program)
+        if classified is None:
+            return False
+        kind, match = classified
 
-        gegeben_hit = re.match(r'Geg\.(.*) EUR ([0-9,]*)', line)
-        if gegeben_hit:
+        if kind == 'total':
+            total = float(match.group(1).replace(',', '.'))
+        elif kind == 'given':
             given.append(Payment(
-                type=gegeben_hit.group(1).strip(),
-                value=float(gegeben_hit.group(2).replace(',', '.'))
+                type=match.group(1).strip(),
+                value=float(match.group(2).replace(',', '.'))
             ))
-            return True
-
-        return_hit = re.match(r'Rückgeld BAR EUR ([0-9,]*)', line)
-        if return_hit:
-            change = float(return_hit.group(1).replace(',', '.'))
-            return True
-
-        payout_match = re.match(r'AUSZAHLUNG EUR ([0-9,]*)', line)
-        if payout_match:
-            payout = float(payout_match.group(1).replace(',', '.'))
-            return True
-
-        parsed_date = _parse_date(line)
-        if parsed_date:
-            date = parsed_date
-            return True
-
-        markt_match = re.match(r'Markt:(.*) Kasse:(.*) Bed\.:(.*)', line)
-        if markt_match:
-            market = markt_match.group(1).strip()
-            checkout = markt_match.group(2).strip()
-            cashier = markt_match.group(3).strip()
-            return True
-
-        uid_match = re.match(r'UID Nr.: (.*)', line)
-        if uid_match:
-            uid = uid_match.group(1).strip()
-            return True
-
-        payback_info_match = re.match(r'PAYBACK Karten-Nr\.: ([0-9#]*)Punkte vor dem Einkauf: ([0-9.,]*) Punkte', line)
-        if payback_info_match:
-            payback_card_number = payback_info_match.group(1)
-            payback_points_before = int(payback_info_match.group(2).replace('.', '').replace(',', ''))
-            return True
-
-        payback_points_match = re.match(r'Sie erhalten (\d*) PAYBACK Punkte? auf|Mit diesem Einkauf gesammelt: (\d*) Punkte?', line)
-        if payback_points_match:
-            match = next(group for group in payback_points_match.groups() if group is not None)
-            payback_points = int(match)
-            return True
-
-        payback_revenue_match = re.match(r'einen PAYBACK Umsatz von (.*) EUR!', line)
-        if payback_revenue_match:
-            payback_revenue = float(payback_revenue_match.group(1).replace(',', '.'))
-            return True
-
-        payback_points_before_match = re.match(r'Punktestand vor Einkauf: ([0-9.]*)|Punkte vor dem Einkauf: ([0-9.]*)', line)
-        if payback_points_before_match:
-            match = next(group for group in payback_points_before_match.groups() if group is not None)
-            payback_points_before = int(match.replace('.', ''))
-            return True
-
-        payback_card_number_match = re.match(r'PAYBACK Karten-Nr\.: ([0-9#]*)', line)
-        if payback_card_number_match:
-            payback_card_number = payback_card_number_match.group(1)
-            return True
-
-        payback_coupon_match = re.match(r'(.*) ([0-9.]*) Punkte?', line)
-        if payback_coupon_match:
+        elif kind == 'change':
+            change = float(match.group(1).replace(',', '.'))
+        elif kind == 'payout':
+            payout = float(match.group(1).replace(',', '.'))
+        elif kind == 'date':
+            date = _date_from_match(match)
+            bon_nr = match.group(6)
+        elif kind == 'market':
+            market = match.group(1).strip()
+            checkout = match.group(2).strip()
+            cashier = match.group(3).strip()
+        elif kind == 'uid':
+            uid = match.group(1).strip()
+        elif kind == 'payback_info':
+            payback_card_number = match.group(1)
+            payback_points_before = int(match.group(2).replace('.', '').replace(',', ''))
+        elif kind == 'payback_points':
+            payback_points = int(next(group for group in match.groups() if group is not None))
+        elif kind == 'payback_revenue':
+            payback_revenue = float(match.group(1).replace(',', '.'))
+        elif kind == 'payback_points_before':
+            points = next(group for group in match.groups() if group is not None)
+            payback_points_before = int(points.replace('.', ''))
+        elif kind == 'payback_card':
+            payback_card_number = match.group(1)
+        elif kind == 'payback_coupon':
             payback_coupons.append(PaybackCoupon(
-                name=payback_coupon_match.group(1),
-                points=int(payback_coupon_match.group(2).replace('.', ''))
+                name=match.group(1),
+                points=int(match.group(2).replace('.', ''))
             ))
-            return True
-
-        if detected_loyalty_program == "REWE Bonus":
-            earned_credit_match = re.match(r'Mit diesem Einkauf hast du ([0-9.,]+) EUR', line)
-            if earned_credit_match:
-                rewe_bonus_earned_credit = float(earned_credit_match.group(1).replace('.', '').replace(',', '.'))
-                return True
-
-            used_bonus_credit_match = re.match(r'Eingesetztes Bonus-Guthaben: ([0-9.,]+) EUR', line)
-            if used_bonus_credit_match:
-                rewe_bonus_used_credit = float(used_bonus_credit_match.group(1).replace('.', '').replace(',', '.'))
-                return True
-
-            new_total_credit_match = re.match(r'Aktuelles Bonus-Guthaben: ([0-9.,]+) EUR', line)
-            if new_total_credit_match:
-                rewe_bonus_new_total_credit = float(new_total_credit_match.group(1).replace('.', '').replace(',', '.'))
-                return True
-
-            rewe_bonus_coupon_match = re.match(r'(.*) ([0-9.,]+) EUR', line)
-            if rewe_bonus_coupon_match and 'Bonus-Guhaben' not in line and 'Mit diesem Einkauf' not in line:
-                coupon_name = rewe_bonus_coupon_match.group(1).strip()
-                if coupon_name:
-                    rewe_bonus_coupons.append(REWEBonusCoupon(
-                        name=coupon_name,
-                        value=float(rewe_bonus_coupon_match.group(2).replace('.', '').replace(',', '.'))
-                    ))
-                    return True
-
-        tax_details_match = re.match(r'([ABC])= ([0-9,]*)% ([0-9,]*) ([0-9,]*) ([0-9,]*)', line)
-        if tax_details_match:
-            category = tax_details_match.group(1)
+        elif kind == 'bonus_earned':
+            rewe_bonus_earned_credit = float(match.group(1).replace('.', '').replace(',', '.'))
+        elif kind == 'bonus_used':
+            rewe_bonus_used_credit = float(match.group(1).replace('.', '').replace(',', '.'))
+        elif kind == 'bonus_total':
+            rewe_bonus_new_total_credit = float(match.group(1).replace('.', '').replace(',', '.'))
+        elif kind == 'bonus_coupon':
+            rewe_bonus_coupons.append(REWEBonusCoupon(
+                name=match.group(1).strip(),
+                value=float(match.group(2).replace('.', '').replace(',', '.'))
+            ))
+        elif kind == 'tax':
+            category = match.group(1)
             tax_details_entry = TaxDetailsEntry(
-                tax_percent=float(tax_details_match.group(2).replace(',', '.')),
-                net=float(tax_details_match.group(3).replace(',', '.')),
-                tax=float(tax_details_match.group(4).replace(',', '.')),
-                gross=float(tax_details_match.group(5).replace(',', '.'))
+                tax_percent=float(match.group(2).replace(',', '.')),
+                net=float(match.group(3).replace(',', '.')),
+                tax=float(match.group(4).replace(',', '.')),
+                gross=float(match.group(5).replace(',', '.'))
             )
             if category == 'A':
                 tax_details_A = tax_details_entry
@@ -735,27 +504,21 @@ def parse_text_ebon(text: str) -> dict:
                 tax_details_B = tax_details_entry
             elif category == 'C':
                 tax_details_C = tax_details_entry
-            return True
-
-        total_tax_match = re.match(r'Gesamtbetrag ([0-9,]*) ([0-9,]*) ([0-9,]*)', line)
-        if total_tax_match:
+        elif kind == 'tax_total':
             tax_details_total = TaxDetailsEntry(
                 tax_percent=float('nan'),
-                net=float(total_tax_match.group(1).replace(',', '.')),
-                tax=float(total_tax_match.group(2).replace(',', '.')),
-                gross=float(total_tax_match.group(3).replace(',', '.'))
+                net=float(match.group(1).replace(',', '.')),
+                tax=float(match.group(2).replace(',', '.')),
+                gross=float(match.group(3).replace(',', '.'))
             )
-            return True
-
-        used_rewe_credit_match = re.match(r'Eingesetztes REWE Guthaben: ([0-9,]*) EUR', line)
-        if used_rewe_credit_match:
-            used_rewe_credit = float(used_rewe_credit_match.group(1).replace(',', '.'))
-
-        new_rewe_credit_match = re.match(r'Neues REWE Guthaben: ([0-9,]*) EUR', line)
-        if new_rewe_credit_match:
-            new_rewe_credit = float(new_rewe_credit_match.group(1).replace(',', '.'))
+        elif kind == 'used_rewe_credit':
+            used_rewe_credit = float(match.group(1).replace(',', '.'))
+            return False
+        elif kind == 'new_rewe_credit':
+            new_rewe_credit = float(match.group(1).replace(',', '.'))
+            return False
 
-        return False
+        return True
 
     if start_index != -1 and end_index != -1:
         header_lines = lines[:start_index]
@@ -776,6 +539,9 @@ def parse_text_ebon(text: str) -> dict:
             if _process_non_item_line(line):
                 continue
 
+    if date is None and strict:
+        raise ValueError("Date not found in the receipt")
+
     # For anonymized text files, date might not be available
     if date is None:
         # Use a default date for anonymized receipts
@@ -788,7 +554,10 @@ def parse_text_ebon(text: str) -> dict:
 
     # For anonymized files, skip total validation if it's off (might have redacted items)
     # Validate that the sum of item sub_totals equals the receipt's total sum.
-    if not math.isnan(total) and round(real_total_in_cents, 2) != round(total_in_cents, 2):
+    if (strict or not math.isnan(total)) and round(real_total_in_cents, 2) != round(total_in_cents, 2):
+        if strict:
+            # PDF parsing has always reported the amounts in cents
+            raise ValueError(f"Something went wrong when parsing the eBon: The eBon states a total sum of {total_in_cents} but the parser only found items worth {real_total_in_cents}.")
         raise ValueError(f"Something went wrong when parsing the eBon: The eBon states a total sum of {total:.2f} but the parser only found items worth {real_total_in_cents / 100:.2f}.")
 
     loyalty_data = None
@@ -831,44 +600,43 @@ def parse_text_ebon(text: str) -> dict:
                 A=tax_details_A,
                 B=tax_details_B,
                 C=tax_details_C
-            )
+            ),
+        bon_nr=bon_nr
     )
 
-    # Create an ordered dictionary to ensure specific order of keys
-    receipt_dict = receipt.to_dict()
-    ordered_receipt_dict = OrderedDict([
-        ('datetime_local', receipt_dict.get('datetime_local')),
-        ('datetime_utc', receipt_dict.get('datetime_utc')),
-        ('market', receipt_dict.get('market')),
-        ('marketAddress', receipt_dict.get('marketAddress')),
-        ('cashier', receipt_dict.get('cashier')),
-        ('checkout', receipt_dict.get('checkout')),
-        ('vatin', receipt_dict.get('vatin')),
-        ('items', receipt_dict.get('items')),
-        ('total', receipt_dict.get('total')),
-        ('given', receipt_dict.get('given')),
-        ('change', receipt_dict.get('change')),
-        ('payout', receipt_dict.get('payout')),
-        ('loyalty', receipt_dict.get('loyalty')),
-        ('taxDetails', receipt_dict.get('taxDetails')),
-    ])
-
-    # Remove None values to clean up the dictionary
-    ordered_receipt_dict = {k: v for k, v in ordered_receipt_dict.items() if v is not None}
-
-    return ordered_receipt_dict
-
-def parse_pdf_ebon(pdf_path: str) -> dict:
+    return receipt if as_object else receipt.to_dict()
+
+def parse_ebon(data_buffer: PdfSource, extractor: str = 'pdfplumber', as_object: bool = False) -> Union[dict, Receipt]:
+    """
+    Parse receipt data from a PDF data buffer.
+
+    Args:
+        data_buffer (PdfSource): The PDF data buffer, or a path to the PDF file,
+            see ``extract_raw_text``.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        as_object (bool): If True, return the ``Receipt`` object instead of
+            its dictionary.
+
+    Returns:
+        Union[dict, Receipt]: The parsed receipt data.
+
+    Raises:
+        ValueError: If the date is missing or the items do not add up to the total.
+    """
+    lines = list(iter_text_lines(iter_page_texts(data_buffer, extractor)))
+    return _parse_lines(lines, strict=True, as_object=as_object)
+
+def parse_pdf_ebon(pdf_path: str, extractor: str = 'pdfplumber', as_object: bool = False) -> Union[dict, Receipt]:
     """
     Parse receipt data from a PDF file.
 
     Args:
         pdf_path (str): Path to the input PDF file.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        as_object (bool): If True, return the ``Receipt`` object instead of
+            its dictionary.
 
     Returns:
-        dict: The parsed receipt data.
+        Union[dict, Receipt]: The parsed receipt data.
     """
-    with open(pdf_path, 'rb') as f:
-        data = f.read()
-        result = parse_ebon(data)
-        return result
+    return parse_ebon(Path(pdf_path), extractor, as_object)
@@ -0,0 +1,530 @@
+# src/rewe_ebon_parser/pipeline.py
+import mmap
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from .archive import ArchiveMember, archive_stem
+from .cache import ResultCache
+from .dedupe import DedupeIndex, DuplicateReceiptError, file_digest, footer_identity, receipt_identity
+from .parse import PdfSource, _is_path, extract_raw_text, open_pdf_buffer, parse_ebon, parse_text_ebon
+from .privacy import anonymize_receipt_dict, anonymize_text_content
+from .serialize import dump_json_file
+
+TEXT_SUFFIX = '.txt'
+
+# Processing stages timed per file, in pipeline order
+STAGES = ('read', 'extract', 'parse', 'anonymize', 'write')
+
+def _warm_up_worker(extractor: Optional[str] = 'pdfplumber'):
+    """
+    Preload the parsing stack in a worker process.
+
+    Runs as the pool initializer so that the imports and the time zone
+    lookup are paid for once per worker up front rather than on each
+    worker's first task.
+
+    Args:
+        extractor (Optional[str]): The text extraction backend the worker will use,
+            or None for workers that only parse text and never load the PDF stack.
+    """
+    import pytz
+    if extractor is not None:
+        import pdfplumber  # noqa: F401
+        from pdfminer import converter, layout, pdfinterp  # noqa: F401
+    if extractor == 'pdfium':
+        import pypdfium2  # noqa: F401
+    pytz.timezone('Europe/Berlin')
+
+def worker_pool(max_workers: Optional[int] = None, max_tasks_per_child: Optional[int] = None, extractor: Optional[str] = 'pdfplumber') -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers preload the parsing stack.
+
+    Args:
+        max_workers (Optional[int]): Number of worker processes. Defaults to the CPU count.
+        max_tasks_per_child (Optional[int]): Replace each worker after this many tasks, which
+            bounds the memory a long-running worker can accumulate. Needs Python 3.11 or later
+            and is ignored with a warning on older versions.
+        extractor (Optional[str]): The text extraction backend the workers will use, or None
+            for a pool that only parses text.
+
+    Returns:
+        ProcessPoolExecutor: The process pool.
+    """
+    kwargs = {}
+    if max_tasks_per_child:
+        if sys.version_info >= (3, 11):
+            kwargs['max_tasks_per_child'] = max_tasks_per_child
+        else:
+            warnings.warn("max_tasks_per_child requires Python 3.11 or later and is ignored.", RuntimeWarning)
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_warm_up_worker, initargs=(extractor,), **kwargs)
+
+class PipelineResult(NamedTuple):
+    """
+    Outcome of running one input file through the pipeline.
+
+    Attributes:
+        source (Path): The input PDF or text file.
+        result (Optional[dict]): The parsed receipt data, or None on failure or in raw text modes.
+        error (Optional[Exception]): The error raised while processing the file, if any.
+        timings (Dict[str, float]): Seconds spent in each stage of ``STAGES`` the file went
+            through, plus its size in ``bytes`` and its number of ``items``.
+    """
+    source: Path
+    result: Optional[dict]
+    error: Optional[Exception]
+    timings: Optional[Dict[str, float]] = None
+
+def _page_in(buffer: mmap.mmap):
+    """Touch every page of a memory-mapped file, so that it is read from disk now."""
+    for offset in range(0, len(buffer), mmap.PAGESIZE):
+        buffer[offset]
+
+def _extract_stage(source: Union[Path, bytes], extractor: str, cache: Optional[ResultCache]) -> Tuple[Optional[str], Optional[dict], Optional[str], Dict[str, float]]:
+    """
+    Extract the raw text of a PDF, unless its parse result is cached.
+
+    For files only the path is sent to the worker; the file is memory-mapped
+    for hashing and extraction rather than read into a bytes object. Its
+    pages are loaded before extraction starts, so that the time spent on the
+    disk is reported as reading rather than extraction.
+
+    Args:
+        source (Union[Path, bytes]): Path to the PDF file, or the PDF data of an archive member.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        cache (Optional[ResultCache]): Parse-result cache to consult first.
+
+    Returns:
+        Tuple[Optional[str], Optional[dict], Optional[str], Dict[str, float]]: The raw
+        text (None on a cache hit), the cached receipt data (None on a miss), the
+        cache key and the read and extraction timings.
+    """
+    with ExitStack() as stack:
+        start = time.perf_counter()
+        data = source if isinstance(source, bytes) else stack.enter_context(open_pdf_buffer(source))
+        if isinstance(data, mmap.mmap):
+            _page_in(data)
+        cache_key = None
+        cached = None
+        if cache is not None:
+            cache_key = cache.key(data, extractor)
+            cached = cache.get(cache_key)
+        timings = {'bytes': len(data), 'read': time.perf_counter() - start}
+        if cached is not None:
+            return None, cached, cache_key, timings
+        start = time.perf_counter()
+        # PDFium opens files itself, which are now served from the page cache
+        raw_text = extract_raw_text(source if extractor == 'pdfium' else data, extractor)
+        timings['extract'] = time.perf_counter() - start
+    return raw_text, None, cache_key, timings
+
+def _parse_stage(raw_text: str, strict: bool, cache: Optional[ResultCache] = None, cache_key: Optional[str] = None) -> Tuple[dict, float]:
+    """
+    Parse raw receipt text and store the result in the cache.
+
+    Args:
+        raw_text (str): The raw text of a receipt.
+        strict (bool): Passed on to ``parse_text_ebon``.
+        cache (Optional[ResultCache]): Parse-result cache to store the result in.
+        cache_key (Optional[str]): The cache key of the source PDF.
+
+    Returns:
+        Tuple[dict, float]: The parsed receipt data and the seconds spent parsing.
+    """
+    start = time.perf_counter()
+    result = parse_text_ebon(raw_text, strict=strict)
+    elapsed = time.perf_counter() - start
+    if cache is not None and cache_key is not None:
+        cache.put(cache_key, result)
+    return result, elapsed
+
+def _extract_and_parse_stage(source: Union[Path, bytes], extractor: str, cache: Optional[ResultCache]) -> Tuple[None, dict, Optional[str], Dict[str, float]]:
+    """
+    Extract and parse a PDF in one worker task, see ``_extract_stage`` and ``_parse_stage``.
+
+    Returns:
+        Tuple[None, dict, Optional[str], Dict[str, float]]: No raw text, the cached or
+        freshly parsed receipt data, the cache key and the stage timings.
+    """
+    raw_text, result, cache_key, timings = _extract_stage(source, extractor, cache)
+    if result is None:
+        result, timings['parse'] = _parse_stage(raw_text, True, cache, cache_key)
+    return None, result, cache_key, timings
+
+def _write_json(output_path: Path, result: dict, compact: bool = False) -> float:
+    start = time.perf_counter()
+    dump_json_file(result, output_path, compact)
+    return time.perf_counter() - start
+
+def _write_text(output_path: Path, text: str) -> float:
+    start = time.perf_counter()
+    output_path.write_text(text, encoding='utf-8')
+    return time.perf_counter() - start
+
+def _rawtext_path(source: Path, output_folder: Optional[Path]) -> Path:
+    """
+    Get the path of the raw text file written for an input.
+
+    Without an output folder the text goes next to the input. The path of a
+    PDF read from an archive points inside the archive file, so its text
+    goes to a ``<archive>_txt_out`` folder next to the archive instead.
+
+    Args:
+        source (Path): The input file, or the ``ArchiveMember.path`` of a PDF read from an archive.
+        output_folder (Optional[Path]): Path to the output folder.
+
+    Returns:
+        Path: The ``.txt`` file to write.
+    """
+    if output_folder:
+        return output_folder / (source.stem + TEXT_SUFFIX)
+    if source.parent.is_file():
+        text_folder = source.parent.with_name(f"{archive_stem(source.parent)}_txt_out")
+        text_folder.mkdir(exist_ok=True)
+        return text_folder / (source.stem + TEXT_SUFFIX)
+    return source.with_suffix(TEXT_SUFFIX)
+
+def run_pipeline(sources: Iterable[Union[Path, ArchiveMember]], output_folder: Optional[Path] = None, extract_workers: Optional[int] = None, parse_workers: int = 0, write_workers: int = 1, max_in_flight: Optional[int] = None, rawtext_file: bool = False, rawtext_stdout: bool = False, preserve_privacy: bool = False, extractor: str = 'pdfplumber', cache: Optional[ResultCache] = None, max_tasks_per_child: Optional[int] = None, compact: bool = False, dedupe: Optional[DedupeIndex] = None) -> Iterator[PipelineResult]:
+    """
+    Process receipts through separate extraction, parsing and writing stages.
+
+    PDFs are read and their text is extracted on a process pool. Without
+    ``parse_workers`` the same processes parse the text as well; otherwise
+    the raw text is parsed on a second process pool. The JSON (or raw text)
+    outputs are written by a thread pool. ``.txt`` sources
+    hold raw text already and skip the extraction stage, so a folder of text
+    dumps can be re-parsed without touching any PDF.
+
+    The total number of files in flight across all stages is capped at
+    ``max_in_flight``; new files are only read once earlier ones have moved
+    through the pipeline, so memory stays bounded for any number of inputs.
+
+    Each result carries the time the file spent in every stage: reading
+    (including the cache lookup), text extraction, parsing, anonymization and
+    writing. A cache hit skips extraction and parsing.
+
+    With a ``dedupe`` index, a PDF whose bytes were seen before under another
+    path is skipped before its text is extracted, and one whose footer
+    identity was seen before is skipped before it is parsed, or before it is
+    written when it was parsed in the extraction process. Skipped inputs
+    are reported with a ``DuplicateReceiptError``. The claims of an input
+    that fails are released again, so that a later copy is processed.
+
+    Args:
+        sources (Iterable[Union[Path, ArchiveMember]]): Input PDF or ``.txt`` files, or PDFs
+            read from an archive, whose data is sent to the workers directly. These are
+            reported and named after their ``ArchiveMember.path``.
+        output_folder (Optional[Path]): Path to the output folder for JSON files.
+        extract_workers (Optional[int]): Number of extraction processes. Defaults to the CPU count.
+        parse_workers (int): Number of separate parsing processes. 0 parses PDFs in the
+            extraction processes and text files and raw text dumps in the calling thread.
+        write_workers (int): Number of output writing threads.
+        max_in_flight (Optional[int]): Maximum number of files in flight. Defaults to four per extraction process.
+        rawtext_file (bool): If True, write the raw text to files instead of parsing it.
+        rawtext_stdout (bool): If True, print the raw text to the console.
+        preserve_privacy (bool): If True, anonymize the output.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        cache (Optional[ResultCache]): If given, reuse and store parse results keyed by the PDF content.
+            With ``preserve_privacy`` results are only looked up, never stored.
+        max_tasks_per_child (Optional[int]): Replace worker processes after this many files, see ``worker_pool``.
+        compact (bool): If True, write the JSON files without whitespace.
+        dedupe (Optional[DedupeIndex]): If given, skip inputs repeating a file or receipt recorded in it.
+
+    Yields:
+        PipelineResult: The outcome of each file, in completion order.
+    """
+    extract_workers = extract_workers or os.cpu_count() or 1
+    if cache is not None and preserve_privacy:
+        cache = cache.read_only_copy()
+    max_in_flight = max_in_flight or 4 * extract_workers
+    need_text = rawtext_file or rawtext_stdout
+    sources = iter(sources)
+
+    with ExitStack() as stack:
+        extract_pool = stack.enter_context(worker_pool(extract_workers, max_tasks_per_child, extractor))
+        parse_pool = stack.enter_context(worker_pool(parse_workers, max_tasks_per_child, None)) if parse_workers else None
+        # Without a parse pool, PDFs are parsed right after extraction in the extraction processes
+        extract_stage = _extract_and_parse_stage if parse_pool is None and not need_text else _extract_stage
+        write_pool = stack.enter_context(ThreadPoolExecutor(max_workers=write_workers))
+        pending = {}
+        ready = []
+
+        def dedupe_name(source):
+            return str(Path(source).resolve())
+
+        def fail(source, exc, timings):
+            print(f"Failed to process {source}: {exc}")
+            if dedupe is not None:
+                dedupe.release(dedupe_name(source))
+            ready.append(PipelineResult(source, None, exc, timings))
+
+        def succeed(source, result, timings):
+            if dedupe is not None:
+                dedupe.confirm(dedupe_name(source))
+            ready.append(PipelineResult(source, result, None, timings))
+
+        def is_duplicate(source, original, reason, timings):
+            if original is None:
+                return False
+            dedupe.confirm(dedupe_name(source))
+            ready.append(PipelineResult(source, None, DuplicateReceiptError(original, reason), timings))
+            return True
+
+        def is_duplicate_file(source, data=None):
+            if dedupe is None:
+                return False
+            try:
+                if data is None:
+                    with open_pdf_buffer(source) as buffer:
+                        digest = file_digest(buffer)
+                else:
+                    digest = file_digest(data)
+            except OSError as exc:
+                fail(source, exc, {})
+                return True
+            return is_duplicate(source, dedupe.claim_file(dedupe_name(source), digest), 'identical file', {})
+
+        def is_duplicate_receipt(source, identity, timings):
+            if dedupe is None or identity is None:
+                return False
+            return is_duplicate(source, dedupe.claim_receipt(dedupe_name(source), identity), 'same receipt', timings)
+
+        def finish(source, result, timings):
+            timings['items'] = len(result.get('items', ())) if result else 0
+            if preserve_privacy:
+                start = time.perf_counter()
+                result = anonymize_receipt_dict(result)
+                timings['anonymize'] = time.perf_counter() - start
+            if result and output_folder:
+                future = write_pool.submit(_write_json, output_folder / (source.stem + ".json"), result, compact)
+                pending[future] = ('write', source, result, timings)
+            else:
+                succeed(source, result, timings)
+
+        def parse(source, raw_text, strict, timings, cache_key=None):
+            if parse_pool is None:
+                try:
+                    result, timings['parse'] = _parse_stage(raw_text, strict, cache, cache_key)
+                except Exception as exc:
+                    fail(source, exc, timings)
+                else:
+                    finish(source, result, timings)
+            else:
+                future = parse_pool.submit(_parse_stage, raw_text, strict, cache, cache_key)
+                pending[future] = ('parse', source, None, timings)
+
+        def handle_text(source, raw_text, timings, cache_key=None):
+            if dedupe is not None and is_duplicate_receipt(source, footer_identity(raw_text), timings):
+                return
+            if not need_text:
+                # Text dumps may be anonymized, so only freshly extracted text is parsed strictly.
+                parse(source, raw_text, source.suffix.lower() != TEXT_SUFFIX, timings, cache_key)
+                return
+            if preserve_privacy:
+                start = time.perf_counter()
+                raw_text = anonymize_text_content(raw_text)
+                timings['anonymize'] = time.perf_counter() - start
+            if rawtext_stdout:
+                print(raw_text)
+            if rawtext_file:
+                rawtext_path = _rawtext_path(source, output_folder)
+                future = write_pool.submit(_write_text, rawtext_path, raw_text)
+                pending[future] = ('write', source, None, timings)
+            else:
+                parse(source, raw_text, True, timings, cache_key)
+
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_in_flight:
+                source = next(sources, None)
+                if source is None:
+                    exhausted = True
+                    break
+                if isinstance(source, ArchiveMember):
+                    if not is_duplicate_file(source.path, source.data):
+                        future = extract_pool.submit(extract_stage, source.data, extractor, None if need_text else cache)
+                        pending[future] = ('extract', source.path, None, {})
+                elif Path(source).suffix.lower() == TEXT_SUFFIX:
+                    source = Path(source)
+                    start = time.perf_counter()
+                    try:
+                        data = source.read_bytes()
+                        raw_text = data.decode('utf-8')
+                    except Exception as exc:
+                        fail(source, exc, {})
+                    else:
+                        handle_text(source, raw_text, {'bytes': len(data), 'read': time.perf_counter() - start})
+                else:
+                    source = Path(source)
+                    if not is_duplicate_file(source):
+                        future = extract_pool.submit(extract_stage, source, extractor, None if need_text else cache)
+                        pending[future] = ('extract', source, None, {})
+                if ready:
+                    break
+
+            while ready:
+                yield ready.pop(0)
+            if not pending:
+                if exhausted:
+                    break
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, source, result, timings = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as exc:
+                    fail(source, exc, timings)
+                    continue
+                if stage == 'extract':
+                    raw_text, result, cache_key, extract_timings = value
+                    timings.update(extract_timings)
+                    if result is not None:
+                        if not is_duplicate_receipt(source, receipt_identity(result), timings):
+                            finish(source, result, timings)
+                    else:
+                        handle_text(source, raw_text, timings, cache_key)
+                elif stage == 'parse':
+                    result, timings['parse'] = value
+                    finish(source, result, timings)
+                else:
+                    timings['write'] = value
+                    succeed(source, result, timings)
+            while ready:
+                yield ready.pop(0)
+
+DEFAULT_CHUNKSIZE = 16
+
+class ParseResult(NamedTuple):
+    """
+    Outcome of parsing one input of ``parse_many``.
+
+    Attributes:
+        index (int): Position of the input in the ``inputs`` iterable.
+        source (Optional[Path]): The input path, or None for data buffers.
+        result (Optional[dict]): The parsed receipt data, or None on failure.
+        error (Optional[Exception]): The error raised while parsing the input, if any.
+    """
+    index: int
+    source: Optional[Path]
+    result: Optional[dict]
+    error: Optional[Exception]
+
+def _parse_chunk(chunk: List[Tuple[int, PdfSource]], extractor: str) -> List[ParseResult]:
+    """
+    Parse a chunk of PDF paths or data buffers.
+
+    Args:
+        chunk (List[Tuple[int, PdfSource]]): Input positions and inputs.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+
+    Returns:
+        List[ParseResult]: One result per input, failures included.
+    """
+    results = []
+    for index, item in chunk:
+        source = Path(item) if _is_path(item) else None
+        try:
+            results.append(ParseResult(index, source, parse_ebon(item if source is None else source, extractor), None))
+        except Exception as exc:
+            results.append(ParseResult(index, source, None, exc))
+    return results
+
+def _failed_chunk(chunk: List[Tuple[int, PdfSource]], exc: Exception) -> List[ParseResult]:
+    # A chunk that could not be sent to or returned from a worker fails as a whole
+    return [ParseResult(index, Path(item) if _is_path(item) else None, None, exc) for index, item in chunk]
+
+def _chunked(inputs: Iterable, chunksize: int) -> Iterator[List[Tuple[int, PdfSource]]]:
+    chunk = []
+    for index, item in enumerate(inputs):
+        chunk.append((index, item))
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def parse_many(inputs: Iterable[PdfSource], chunksize: int = DEFAULT_CHUNKSIZE, workers: Optional[int] = None, ordered: bool = False, extractor: str = 'pdfplumber', max_in_flight: Optional[int] = None, max_tasks_per_child: Optional[int] = None) -> Iterator[ParseResult]:
+    """
+    Parse many eBons on a pool of worker processes.
+
+    Inputs are grouped into chunks of ``chunksize`` and each chunk is parsed
+    by one task, so the per-task overhead of process pools is paid once per
+    chunk instead of once per receipt. At most ``max_in_flight`` chunks are
+    submitted or waiting to be yielded at any time, so ``inputs`` may be a lazy iterable of any length.
+    A failing input is reported in its ``ParseResult`` and does not affect
+    the rest of the batch. ``memoryview`` and ``mmap`` buffers cannot be
+    pickled and are copied to send them to the workers. Should a chunk fail
+    to reach a worker or to come back, e.g. because a worker died, each of
+    its inputs is reported with that error.
+
+    Args:
+        inputs (Iterable[PdfSource]): PDF file paths or PDF data buffers.
+        chunksize (int): Number of inputs per worker task.
+        workers (Optional[int]): Number of worker processes. Defaults to the CPU count;
+            0 parses in the calling process.
+        ordered (bool): If True, yield results in input order instead of completion order.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        max_in_flight (Optional[int]): Maximum number of chunks in flight. Defaults to two per worker.
+        max_tasks_per_child (Optional[int]): Replace worker processes after this many chunks, see ``worker_pool``.
+
+    Yields:
+        ParseResult: The outcome of each input.
+
+    Raises:
+        ValueError: If ``chunksize`` is smaller than 1.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1.")
+    chunks = _chunked(inputs, chunksize)
+    if workers == 0:
+        for chunk in chunks:
+            yield from _parse_chunk(chunk, extractor)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    next_index = 0
+    held = {}
+    with worker_pool(workers, max_tasks_per_child, extractor) as executor:
+        pending = {}
+        exhausted = False
+        while True:
+            completed = []
+            # Results held back for ordering count against the window too
+            while not exhausted and len(pending) + len(held) // chunksize < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                chunk = [(index, bytes(item) if isinstance(item, (memoryview, mmap.mmap)) else item) for index, item in chunk]
+                try:
+                    pending[executor.submit(_parse_chunk, chunk, extractor)] = chunk
+                except Exception as exc:
+                    # The pool is broken; report the chunk before taking more inputs
+                    completed.append(_failed_chunk(chunk, exc))
+                    break
+            if pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        completed.append(future.result())
+                    except Exception as exc:
+                        completed.append(_failed_chunk(chunk, exc))
+            elif not completed:
+                break
+            for results in completed:
+                for result in results:
+                    if not ordered:
+                        yield result
+                        continue
+                    held[result.index] = result
+                    while next_index in held:
+                        yield held.pop(next_index)
+                        next_index += 1
@@ -55,6 +55,8 @@ def anonymize_receipt_dict(receipt_dict: Dict) -> Dict:
     receipt_dict['cashier'] = "[REDACTED]"
     receipt_dict['checkout'] = "[REDACTED]"
     receipt_dict['vatin'] = "[REDACTED]"
+    # The receipt number identifies the purchase together with the market and time
+    receipt_dict.pop('bonNr', None)
 
     # Anonymize market address
     if 'marketAddress' in receipt_dict and receipt_dict['marketAddress']:
@@ -0,0 +1,56 @@
+# src/rewe_ebon_parser/profiling.py
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+from .pipeline import STAGES
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Compute a percentile with the nearest-rank method.
+
+    Args:
+        values (Sequence[float]): The sorted values.
+        q (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The percentile, or NaN for no values.
+    """
+    if not values:
+        return float('nan')
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+def format_profile(records: Iterable[Tuple[str, Dict[str, float]]], slowest: int = 20) -> str:
+    """
+    Summarize per-file stage timings into a text report.
+
+    The report has the total, mean, p50, p95 and p99 time of every stage over
+    the files that went through it, followed by the slowest files by their
+    summed stage times.
+
+    Args:
+        records (Iterable[Tuple[str, Dict[str, float]]]): File names and their
+            timings in seconds, keyed by ``STAGES``.
+        slowest (int): Number of slowest files to list.
+
+    Returns:
+        str: The report.
+    """
+    records = [(name, timings or {}) for name, timings in records]
+    lines = [f"Stage timings over {len(records)} files:",
+             f"  {'stage':10s} {'files':>7s} {'total s':>10s} {'mean ms':>10s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s}"]
+    for stage in STAGES:
+        values = sorted(timings[stage] for _, timings in records if stage in timings)
+        if not values:
+            continue
+        lines.append(f"  {stage:10s} {len(values):7d} {sum(values):10.2f} {sum(values) / len(values) * 1000:10.2f} "
+                     f"{percentile(values, 50) * 1000:10.2f} {percentile(values, 95) * 1000:10.2f} {percentile(values, 99) * 1000:10.2f}")
+
+    totals: List[Tuple[float, str, Dict[str, float]]] = sorted(
+        ((sum(timings.get(stage, 0.0) for stage in STAGES), name, timings) for name, timings in records),
+        key=lambda record: record[0], reverse=True,
+    )
+    lines.append(f"Slowest {min(slowest, len(totals))} files:")
+    for total, name, timings in totals[:slowest]:
+        stages = ', '.join(f"{stage} {timings[stage] * 1000:.1f} ms" for stage in STAGES if stage in timings)
+        lines.append(f"  {total * 1000:10.1f} ms  {name}  ({stages})")
+    return '\n'.join(lines)
@@ -0,0 +1,132 @@
+# src/rewe_ebon_parser/serialize.py
+import json
+import math
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bookkeeping files written next to receipt JSON files: the incremental and mailbox
+# manifests and the duplicate index, or ``<table>_<name>`` next to a table output
+SIDE_FILE_NAMES = ('input_manifest.json', 'mail_manifest.json', 'dedupe_index.json')
+
+def is_receipt_json(path: Union[str, Path]) -> bool:
+    """
+    Check whether a path names a receipt JSON file.
+
+    Args:
+        path (Union[str, Path]): The file path.
+
+    Returns:
+        bool: True for ``.json`` files other than the bookkeeping files in
+        ``SIDE_FILE_NAMES``.
+    """
+    path = Path(path)
+    name = path.name.lower()
+    if path.suffix.lower() != '.json':
+        return False
+    return not any(name == side_name or name.endswith('_' + side_name) for side_name in SIDE_FILE_NAMES)
+
+def json_backend() -> str:
+    """
+    Get the name of the JSON library in use.
+
+    Returns:
+        str: ``'orjson'`` if it is installed, otherwise ``'json'``.
+    """
+    return 'json' if orjson is None else 'orjson'
+
+def _default(obj: Any) -> Any:
+    # Datetimes are written in ISO 8601 like the parser's own timestamps, anything else as its string form
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return str(obj)
+
+def _without_nan(obj: Any) -> Any:
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _without_nan(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_without_nan(value) for value in obj]
+    return obj
+
+def dumps(obj: Any, compact: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON.
+
+    Uses orjson when it is installed and the standard library otherwise; both
+    produce the same output for parsed receipts. Datetimes are written in ISO
+    8601 format, and NaN and infinite floats as ``null`` to keep the output
+    valid JSON.
+
+    Args:
+        obj (Any): The object to serialize.
+        compact (bool): If True, write no whitespace. Otherwise indent by two spaces.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=0 if compact else orjson.OPT_INDENT_2)
+    kwargs = {'separators': (',', ':')} if compact else {'indent': 2}
+    try:
+        text = json.dumps(obj, default=_default, ensure_ascii=False, allow_nan=False, **kwargs)
+    except ValueError:
+        text = json.dumps(_without_nan(obj), default=_default, ensure_ascii=False, allow_nan=False, **kwargs)
+    return text.encode('utf-8')
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Deserialize a JSON document.
+
+    Documents with ``NaN`` values, as written by earlier versions, are read
+    with the standard library.
+
+    Args:
+        data (Union[bytes, str]): The JSON document.
+
+    Returns:
+        Any: The deserialized object.
+
+    Raises:
+        ValueError: If the document is not valid JSON.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+def dump_json_file(obj: Any, path: Union[str, Path], compact: bool = False):
+    """
+    Write an object to a JSON file.
+
+    Args:
+        obj (Any): The object to serialize.
+        path (Union[str, Path]): Path to the output file.
+        compact (bool): If True, write no whitespace. Otherwise indent by two spaces.
+    """
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, compact))
+
+def load_json_file(path: Union[str, Path]) -> Any:
+    """
+    Read a JSON file.
+
+    Args:
+        path (Union[str, Path]): Path to the JSON file.
+
+    Returns:
+        Any: The deserialized object.
+
+    Raises:
+        ValueError: If the file is not valid JSON.
+    """
+    with open(path, 'rb') as f:
+        return loads(f.read())
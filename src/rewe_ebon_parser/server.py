@@ -0,0 +1,316 @@
+# src/rewe_ebon_parser/server.py
+import csv
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from email.parser import BytesParser
+from email.policy import HTTP
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from . import __version__
+from .cache import ResultCache
+from .parse import parse_ebon
+from .pipeline import _warm_up_worker, worker_pool
+from .privacy import anonymize_receipt_dict
+from .serialize import dumps
+from .table import CSV_FIELDNAMES, receipt_to_rows
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+RESPONSE_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+def _timed_parse(data: bytes, extractor: str) -> Tuple[dict, float]:
+    """Parse an upload in a worker process, returning the receipt and the seconds spent on it."""
+    start = time.perf_counter()
+    result = parse_ebon(data, extractor)
+    return result, time.perf_counter() - start
+
+class EbonServer(ThreadingHTTPServer):
+    """
+    HTTP server parsing uploaded eBons on a pre-warmed process pool.
+
+    Every worker process has loaded the parsing stack before the server
+    accepts its first request, so a request only pays for the parse itself.
+    Requests are handled on threads that hand the PDFs to the pool. When a
+    worker dies, e.g. killed for running out of memory, the uploads it was
+    parsing fail and the pool is replaced by a fresh one.
+
+    Attributes:
+        pool (ProcessPoolExecutor): The worker processes.
+        workers (int): Number of worker processes.
+        max_tasks_per_child (Optional[int]): Replace each worker after this many parses.
+        extractor (str): The text extraction backend.
+        preserve_privacy (bool): If True, anonymize every receipt.
+        cache (Optional[ResultCache]): Parse-result cache shared with the CLI, read-only
+            with ``preserve_privacy``.
+        compact (bool): If True, write JSON responses without whitespace.
+        max_upload_bytes (int): Largest accepted request body.
+        stats (dict): Request and parse counters, see ``snapshot_stats``.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], workers: Optional[int] = None, extractor: str = 'pdfplumber', preserve_privacy: bool = False, cache: Optional[ResultCache] = None, compact: bool = False, max_tasks_per_child: Optional[int] = None, max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES):
+        super().__init__(address, _RequestHandler)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.extractor = extractor
+        self.preserve_privacy = preserve_privacy
+        self.cache = cache.read_only_copy() if cache is not None and preserve_privacy else cache
+        self.compact = compact
+        self.max_upload_bytes = max_upload_bytes
+        self.started = time.time()
+        self.stats = {'requests': 0, 'receipts': 0, 'failures': 0, 'cacheHits': 0, 'parses': 0, 'parseSeconds': 0.0}
+        self._stats_lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self.pool = self._start_pool()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        pool = worker_pool(self.workers, self.max_tasks_per_child, self.extractor)
+        # Submitting one warm-up task per worker starts all of them up front
+        wait([pool.submit(_warm_up_worker, self.extractor) for _ in range(self.workers)])
+        return pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor):
+        """Replace a pool whose worker died, unless another request has already done so."""
+        with self._pool_lock:
+            if self.pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._start_pool()
+
+    def _submit(self, data: bytes) -> Tuple[ProcessPoolExecutor, Future]:
+        pool = self.pool
+        try:
+            return pool, pool.submit(_timed_parse, data, self.extractor)
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            pool = self.pool
+            return pool, pool.submit(_timed_parse, data, self.extractor)
+
+    def server_close(self):
+        """Close the socket and shut down the worker processes."""
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+    def count(self, **increments):
+        """
+        Add to the request and parse counters.
+
+        Args:
+            **increments: Amounts to add, keyed by ``stats`` field.
+        """
+        with self._stats_lock:
+            for field, amount in increments.items():
+                self.stats[field] += amount
+
+    def snapshot_stats(self) -> dict:
+        """
+        Get the server statistics.
+
+        Returns:
+            dict: The version, uptime, number of workers, request, receipt,
+            failure and cache hit counts, and the mean time a worker took to
+            parse an upload, leaving out cache hits and failed uploads.
+        """
+        with self._stats_lock:
+            stats = dict(self.stats)
+        parse_seconds = stats.pop('parseSeconds')
+        parsed = stats.pop('parses')
+        return dict(
+            version=__version__,
+            uptimeSeconds=round(time.time() - self.started, 3),
+            workers=self.workers,
+            **stats,
+            meanParseMs=round(parse_seconds * 1000 / parsed, 3) if parsed else None,
+        )
+
+    def parse_uploads(self, uploads: List[Tuple[str, bytes]]) -> List[Tuple[str, Optional[dict], Optional[str]]]:
+        """
+        Parse uploaded PDFs on the worker pool.
+
+        Args:
+            uploads (List[Tuple[str, bytes]]): File names and PDF data.
+
+        Returns:
+            List[Tuple[str, Optional[dict], Optional[str]]]: The file name, the
+            receipt data (None on failure) and the error message (None on
+            success) of each upload, in upload order.
+        """
+        cache_keys = [None] * len(uploads)
+        futures = {}
+        results = [None] * len(uploads)
+        for index, (_, data) in enumerate(uploads):
+            if self.cache is not None:
+                cache_keys[index] = self.cache.key(data, self.extractor)
+                results[index] = self.cache.get(cache_keys[index])
+            if results[index] is None:
+                futures[index] = self._submit(data)
+
+        outcomes = []
+        cache_hits = failures = parses = 0
+        parse_seconds = 0.0
+        broken_pools = set()
+        for index, (name, _) in enumerate(uploads):
+            result, error = results[index], None
+            if result is None:
+                pool, future = futures[index]
+                try:
+                    result, elapsed = future.result()
+                except BrokenProcessPool as e:
+                    broken_pools.add(pool)
+                    error = str(e)
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                else:
+                    parses += 1
+                    parse_seconds += elapsed
+                    if self.cache is not None:
+                        self.cache.put(cache_keys[index], result)
+            else:
+                cache_hits += 1
+            if error is None and self.preserve_privacy:
+                result = anonymize_receipt_dict(result)
+            failures += error is not None
+            outcomes.append((name, result, error))
+        for pool in broken_pools:
+            self._replace_pool(pool)
+        self.count(receipts=len(uploads) - failures, failures=failures, cacheHits=cache_hits,
+                   parses=parses, parseSeconds=parse_seconds)
+        return outcomes
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = f"rewe-ebon-parser/{__version__}"
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str = RESPONSE_FORMATS['json'], headers: Optional[dict] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str):
+        # The request body may be left unread, so the connection cannot be reused
+        self.close_connection = True
+        self._send(status, dumps({'error': message}, compact=True))
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/health':
+            self._send(HTTPStatus.OK, dumps({'status': 'ok', 'version': __version__}, compact=True))
+        elif path == '/stats':
+            self._send(HTTPStatus.OK, dumps(self.server.snapshot_stats(), self.server.compact))
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path '{path}'.")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/parse':
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path '{url.path}'.")
+            return
+        self.server.count(requests=1)
+        response_format = parse_qs(url.query).get('format', ['json'])[0]
+        if response_format not in RESPONSE_FORMATS:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"Unknown format '{response_format}'. Choose one of: {', '.join(RESPONSE_FORMATS)}.")
+            return
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "A Content-Length header is required.")
+            return
+        if int(length) > self.server.max_upload_bytes:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Uploads are limited to {self.server.max_upload_bytes} bytes.")
+            return
+        body = self.rfile.read(int(length))
+
+        content_type = self.headers.get('Content-Type', 'application/pdf')
+        batch = content_type.startswith('multipart/form-data')
+        uploads = _multipart_files(content_type, body) if batch else [(None, body)]
+        if not uploads:
+            self._send_error(HTTPStatus.BAD_REQUEST, "The multipart request contains no files.")
+            return
+
+        outcomes = self.server.parse_uploads(uploads)
+        failures = [(name, error) for name, _, error in outcomes if error is not None]
+        if not batch and failures:
+            self._send_error(HTTPStatus.UNPROCESSABLE_ENTITY, failures[0][1])
+            return
+
+        receipts = [result for _, result, error in outcomes if error is None]
+        headers = {'X-Parse-Failures': str(len(failures))}
+        if response_format == 'ndjson':
+            body = b''.join(dumps(receipt, compact=True) + b'\n' for receipt in receipts)
+        elif response_format == 'csv':
+            body = _csv_table(receipts)
+        elif batch:
+            body = dumps([{'file': name, 'receipt': result} if error is None else {'file': name, 'error': error}
+                          for name, result, error in outcomes], self.server.compact)
+        else:
+            body = dumps(receipts[0], self.server.compact)
+        self._send(HTTPStatus.OK, body, RESPONSE_FORMATS[response_format], headers)
+
+def _multipart_files(content_type: str, body: bytes) -> List[Tuple[str, bytes]]:
+    """
+    Get the uploaded files of a multipart/form-data request body.
+
+    Form fields without a filename are not uploads and are left out.
+
+    Args:
+        content_type (str): The request's Content-Type header, with the boundary.
+        body (bytes): The request body.
+
+    Returns:
+        List[Tuple[str, bytes]]: The file name and data of each uploaded file.
+    """
+    message = BytesParser(policy=HTTP).parsebytes(b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body)
+    files = []
+    for part in message.iter_parts():
+        name = part.get_filename()
+        if name is not None:
+            files.append((name, part.get_payload(decode=True) or b''))
+    return files
+
+def _csv_table(receipts: List[dict]) -> bytes:
+    """Build the CSV items table of ``dump_items_to_csv`` in memory."""
+    buffer = io.StringIO(newline='')
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDNAMES)
+    writer.writeheader()
+    for receipt in receipts:
+        writer.writerows(receipt_to_rows(receipt))
+    return buffer.getvalue().encode('utf-8')
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **options):
+    """
+    Run the parsing service until interrupted.
+
+    Endpoints:
+        ``POST /parse``: a single PDF as the request body, or several as
+        ``multipart/form-data``. ``?format=json`` (default), ``ndjson`` or
+        ``csv`` selects the response format.
+        ``GET /health``: liveness check.
+        ``GET /stats``: request, receipt and timing counters.
+
+    Args:
+        host (str): Interface to listen on.
+        port (int): Port to listen on.
+        **options: Keyword arguments for ``EbonServer``.
+    """
+    server = EbonServer((host, port), **options)
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]} with {server.workers} workers. Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
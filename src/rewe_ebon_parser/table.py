@@ -1,46 +1,237 @@
 # src/rewe_ebon_parser/table.py
 import csv
+from datetime import datetime
 import json
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
-def dump_items_to_csv(parsed_receipts: List[Dict], output_path: Path):
+# The desired field order of the items table
+CSV_FIELDNAMES = [
+    'datetime_local', 'market', 'marketStreet', 'marketZip', 'marketCity',
+    'name', 'subTotal', 'amount',
+    'pricePerUnit', 'unit', 'taxCategory', 'loyaltyProgramQualified'
+]
+
+def receipt_to_rows(receipt: Dict) -> Iterator[Dict]:
+    """
+    Build the CSV rows of a parsed receipt, one per item.
+
+    Each row is a new dictionary holding the item fields and the receipt-level
+    metadata used in the CSV table; the receipt itself is left unchanged.
+
+    Args:
+        receipt (Dict): Parsed receipt data.
+
+    Yields:
+        Dict: A row keyed by ``CSV_FIELDNAMES``.
+    """
+    market_address = receipt.get('marketAddress') or {}
+    receipt_fields = {
+        'datetime_local': receipt.get('datetime_local'),
+        'market': receipt.get('market'),
+        'marketStreet': market_address.get('street'),
+        'marketZip': market_address.get('zip'),
+        'marketCity': market_address.get('city'),
+    }
+    for item in receipt['items']:
+        row = dict(receipt_fields)
+        for field in CSV_FIELDNAMES[5:]:
+            row[field] = item.get(field)
+        yield row
+
+def dump_items_to_csv(parsed_receipts: Iterable[Dict], output_path: Path) -> int:
     """
     Dump all items from parsed receipts into a CSV file.
 
+    Receipts are consumed one at a time and their rows are written right
+    away, so ``parsed_receipts`` can be a generator yielding results as they
+    are produced. The output file is only created once the first item is
+    found.
+
     Args:
-        parsed_receipts (List[Dict]): List of parsed receipt data.
+        parsed_receipts (Iterable[Dict]): Parsed receipt data.
         output_path (Path): Path to the output CSV file.
+
+    Returns:
+        int: The number of item rows written.
     """
-    items = []
-    for receipt in parsed_receipts:
-        market_address = receipt.get('marketAddress') or {}
-        for item in receipt['items']:
-            # Attach receipt-level metadata used in the CSV table.
-            item['datetime_local'] = receipt.get('datetime_local')
-            item['market'] = receipt.get('market')
-            item['marketStreet'] = market_address.get('street')
-            item['marketZip'] = market_address.get('zip')
-            item['marketCity'] = market_address.get('city')
-            items.append(item)
-
-    if items:
-        # Define the desired field order
-        fieldnames = [
-            'datetime_local', 'market', 'marketStreet', 'marketZip', 'marketCity',
-            'name', 'subTotal', 'amount', 
-            'pricePerUnit', 'unit', 'taxCategory', 'loyaltyProgramQualified'
-        ]
-
-        # Ensure all keys are present in each item
-        for item in items:
-            for field in fieldnames:
-                if field not in item:
-                    item[field] = None
-
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(items)
-    else:
+    row_count = 0
+    csvfile = None
+    try:
+        for receipt in parsed_receipts:
+            for row in receipt_to_rows(receipt):
+                if csvfile is None:
+                    csvfile = open(output_path, 'w', newline='', encoding='utf-8')
+                    writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+                    writer.writeheader()
+                writer.writerow(row)
+                row_count += 1
+    finally:
+        if csvfile is not None:
+            csvfile.close()
+
+    if not row_count:
         print("No items found in the parsed receipts.")
+    return row_count
+
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
+PARQUET_ITEMS_NAME = 'items.parquet'
+PARQUET_RECEIPTS_NAME = 'receipts.parquet'
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow. Install it with: pip install 'rewe-ebon-parser[parquet]'") from e
+    return pyarrow
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        # Missing or anonymized timestamps
+        return None
+
+def parquet_schemas():
+    """
+    Get the Arrow schemas of the items and receipts tables.
+
+    Text columns with few distinct values are dictionary-encoded, timestamps
+    are timezone-aware and amounts are floats. Both tables carry a
+    ``receiptId`` column to join items to their receipt.
+
+    Returns:
+        Tuple[pyarrow.Schema, pyarrow.Schema]: The items and receipts schemas.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    pa = _import_pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    timestamp = pa.timestamp('ms', tz='Europe/Berlin')
+    store_fields = [
+        ('datetime_local', timestamp),
+        ('market', text),
+        ('marketStreet', text),
+        ('marketZip', text),
+        ('marketCity', text),
+    ]
+    items_schema = pa.schema([('receiptId', pa.int32())] + store_fields + [
+        ('name', text),
+        ('subTotal', pa.float64()),
+        ('amount', pa.float64()),
+        ('pricePerUnit', pa.float64()),
+        ('unit', text),
+        ('taxCategory', text),
+        ('loyaltyProgramQualified', text),
+    ])
+    receipts_schema = pa.schema([('receiptId', pa.int32())] + store_fields + [
+        ('cashier', text),
+        ('checkout', text),
+        ('vatin', text),
+        ('itemCount', pa.int32()),
+        ('total', pa.float64()),
+        ('change', pa.float64()),
+        ('payout', pa.float64()),
+        ('taxNet', pa.float64()),
+        ('taxAmount', pa.float64()),
+        ('taxGross', pa.float64()),
+        ('loyaltyProgram', text),
+    ])
+    return items_schema, receipts_schema
+
+class _ParquetTableWriter:
+    """Buffers rows column by column and writes them to a Parquet file in row groups."""
+
+    def __init__(self, path: Path, schema, row_group_size: int):
+        pa = _import_pyarrow()
+        self._pa = pa
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.row_count = 0
+        self._columns = {name: [] for name in schema.names}
+        self._writer = pa.parquet.ParquetWriter(str(path), schema)
+
+    def append(self, row: Dict):
+        for name, values in self._columns.items():
+            values.append(row.get(name))
+        self.row_count += 1
+        if len(self._columns['receiptId']) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self._columns['receiptId']:
+            return
+        arrays = [self._pa.array(self._columns[field.name], type=field.type) for field in self.schema]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self.schema))
+        for values in self._columns.values():
+            values.clear()
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+def dump_to_parquet(parsed_receipts: Iterable[Dict], output_dir: Path, row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> Tuple[int, int]:
+    """
+    Dump parsed receipts into typed Parquet tables of items and receipts.
+
+    Writes ``items.parquet`` (one row per item, the same columns as the CSV
+    table) and ``receipts.parquet`` (one row per receipt) into ``output_dir``.
+    Receipts are consumed one at a time and buffered rows are written as a
+    row group whenever ``row_group_size`` rows have accumulated, so memory use
+    does not grow with the number of receipts.
+
+    Args:
+        parsed_receipts (Iterable[Dict]): Parsed receipt data.
+        output_dir (Path): Directory for the Parquet files.
+        row_group_size (int): Number of rows per Parquet row group.
+
+    Returns:
+        Tuple[int, int]: The number of receipts and items written.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    items_schema, receipts_schema = parquet_schemas()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    items_writer = _ParquetTableWriter(output_dir / PARQUET_ITEMS_NAME, items_schema, row_group_size)
+    receipts_writer = _ParquetTableWriter(output_dir / PARQUET_RECEIPTS_NAME, receipts_schema, row_group_size)
+    try:
+        for receipt_id, receipt in enumerate(parsed_receipts):
+            timestamp = _parse_timestamp(receipt.get('datetime_local'))
+            item_count = 0
+            for row in receipt_to_rows(receipt):
+                row['receiptId'] = receipt_id
+                row['datetime_local'] = timestamp
+                items_writer.append(row)
+                item_count += 1
+
+            market_address = receipt.get('marketAddress') or {}
+            tax_total = (receipt.get('taxDetails') or {}).get('total') or {}
+            receipts_writer.append({
+                'receiptId': receipt_id,
+                'datetime_local': timestamp,
+                'market': receipt.get('market'),
+                'marketStreet': market_address.get('street'),
+                'marketZip': market_address.get('zip'),
+                'marketCity': market_address.get('city'),
+                'cashier': receipt.get('cashier'),
+                'checkout': receipt.get('checkout'),
+                'vatin': receipt.get('vatin'),
+                'itemCount': item_count,
+                'total': receipt.get('total'),
+                'change': receipt.get('change'),
+                'payout': receipt.get('payout'),
+                'taxNet': tax_total.get('net'),
+                'taxAmount': tax_total.get('tax'),
+                'taxGross': tax_total.get('gross'),
+                'loyaltyProgram': (receipt.get('loyalty') or {}).get('program'),
+            })
+    finally:
+        items_writer.close()
+        receipts_writer.close()
+
+    return receipts_writer.row_count, items_writer.row_count
@@ -0,0 +1,278 @@
+# src/rewe_ebon_parser/watch.py
+import csv
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from .cache import ResultCache
+from .ndjson import open_ndjson
+from .parse import open_pdf_buffer, parse_ebon
+from .pipeline import _warm_up_worker, worker_pool
+from .privacy import anonymize_receipt_dict
+from .serialize import dump_json_file, dumps
+from .table import CSV_FIELDNAMES, receipt_to_rows
+
+DEFAULT_SETTLE_SECONDS = 1.0
+DEFAULT_POLL_SECONDS = 1.0
+
+# inotify(7) event masks and the layout of struct inotify_event
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_Q_OVERFLOW = 0x4000
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+class _InotifyWatcher:
+    """
+    Reports the names of files created, written or moved into a folder, via inotify.
+
+    When the kernel's event queue overflows, events are lost and ``overflowed``
+    is set, so that the caller can rescan the folder.
+    """
+
+    def __init__(self, folder: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {folder}")
+        self.overflowed = False
+
+    def wait(self, timeout: float) -> List[str]:
+        """Wait up to ``timeout`` seconds for events; return the names of the files concerned."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            if mask & _IN_Q_OVERFLOW:
+                self.overflowed = True
+            else:
+                names.append(os.fsdecode(data[offset:offset + length].rstrip(b'\0')))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+def _inotify_watcher(folder: Path) -> Optional[_InotifyWatcher]:
+    """Start an inotify watch on ``folder``, or return None where inotify is unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        return _InotifyWatcher(folder)
+    except (OSError, AttributeError):
+        # No libc with inotify, or too many watches
+        return None
+
+class _ResultSink:
+    """Appends parsed receipts to a JSON folder, an NDJSON file and/or a CSV table."""
+
+    def __init__(self, output_folder: Optional[Path], ndjson_path: Optional[Path], csv_path: Optional[Path], compact: bool):
+        self.output_folder = output_folder
+        self.compact = compact
+        self._ndjson = self._csvfile = self._writer = None
+        if output_folder is not None:
+            output_folder.mkdir(parents=True, exist_ok=True)
+        if ndjson_path is not None:
+            self._ndjson = open_ndjson(ndjson_path, 'a')
+        if csv_path is not None:
+            write_header = not csv_path.exists() or csv_path.stat().st_size == 0
+            self._csvfile = open(csv_path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._csvfile, fieldnames=CSV_FIELDNAMES)
+            if write_header:
+                self._writer.writeheader()
+                self._csvfile.flush()
+
+    def write(self, source: Path, result: dict):
+        if self.output_folder is not None:
+            dump_json_file(result, self.output_folder / (source.stem + '.json'), self.compact)
+        if self._ndjson is not None:
+            self._ndjson.write(dumps(result, compact=True) + b'\n')
+            self._ndjson.flush()
+        if self._writer is not None:
+            self._writer.writerows(receipt_to_rows(result))
+            self._csvfile.flush()
+
+    def close(self):
+        if self._ndjson is not None:
+            self._ndjson.close()
+        if self._csvfile is not None:
+            self._csvfile.close()
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def watch_folder(input_folder: Path, output_folder: Optional[Path] = None, ndjson_path: Optional[Path] = None, csv_path: Optional[Path] = None, max_workers: Optional[int] = None, preserve_privacy: bool = False, extractor: str = 'pdfplumber', cache: Optional[ResultCache] = None, compact: bool = False, settle: float = DEFAULT_SETTLE_SECONDS, poll_interval: float = DEFAULT_POLL_SECONDS, process_existing: bool = False, use_inotify: bool = True, stop: Optional[threading.Event] = None, on_result: Optional[Callable[[Path, Optional[dict], Optional[Exception]], None]] = None) -> Dict[str, int]:
+    """
+    Parse PDFs as they arrive in a folder until stopped.
+
+    New and changed PDFs are noticed through inotify on Linux, or by
+    rescanning the folder every ``poll_interval`` seconds elsewhere. The
+    folder is also rescanned when the inotify event queue overflows. A file
+    is only parsed once its size and modification time have not changed for
+    ``settle`` seconds, so files still being written are left alone. Parsing
+    runs on a worker pool that is started and warmed up once, and every
+    result is appended to the sinks as soon as it is ready.
+
+    Args:
+        input_folder (Path): The folder to watch.
+        output_folder (Optional[Path]): Folder for one JSON file per eBon.
+        ndjson_path (Optional[Path]): NDJSON file to append the receipts to.
+        csv_path (Optional[Path]): CSV table to append the items to.
+        max_workers (Optional[int]): Number of worker processes. Defaults to the CPU count.
+        preserve_privacy (bool): If True, anonymize the output.
+        extractor (str): The text extraction backend, see ``extract_raw_text``.
+        cache (Optional[ResultCache]): If given, reuse and store parse results keyed by the PDF content.
+            With ``preserve_privacy`` results are only looked up, never stored.
+        compact (bool): If True, write the JSON files without whitespace.
+        settle (float): Seconds a file must stay unchanged before it is parsed.
+        poll_interval (float): Seconds between folder scans without inotify,
+            and the longest wait between checks of pending files.
+        process_existing (bool): If True, also parse the PDFs already in the
+            folder, except those whose JSON file already exists.
+        use_inotify (bool): If False, always poll.
+        stop (Optional[threading.Event]): Stop watching once this is set. Runs
+            until interrupted if not given.
+        on_result (Optional[Callable]): Called with the path, the receipt data
+            and the error of every processed file.
+
+    Returns:
+        Dict[str, int]: Number of parsed and failed files.
+
+    Raises:
+        ValueError: If no sink is given.
+    """
+    if output_folder is None and ndjson_path is None and csv_path is None:
+        raise ValueError("An output folder, an NDJSON path or a CSV path is required to watch a folder.")
+    stop = stop or threading.Event()
+    input_folder = Path(input_folder)
+    if cache is not None and preserve_privacy:
+        cache = cache.read_only_copy()
+
+    # Signatures of the files handled so far; a changed signature means a new version
+    handled: Dict[str, Tuple[int, int]] = {}
+    for pdf_file in input_folder.glob('*.pdf'):
+        already_done = output_folder is not None and (output_folder / (pdf_file.stem + '.json')).exists()
+        if not process_existing or already_done:
+            handled[pdf_file.name] = _signature(pdf_file)
+    pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+    in_flight = {}
+    summary = {'parsed': 0, 'failed': 0}
+
+    watcher = _inotify_watcher(input_folder) if use_inotify else None
+    sink = _ResultSink(output_folder, ndjson_path, csv_path, compact)
+    max_workers = max_workers or os.cpu_count() or 1
+    pool = worker_pool(max_workers, None, extractor)
+    # One warm-up task per worker starts all of them before the first eBon arrives
+    wait([pool.submit(_warm_up_worker, extractor) for _ in range(max_workers)])
+    print(f"Watching {input_folder} ({'inotify' if watcher else 'polling'}). Press Ctrl+C to stop.")
+
+    def finish(pdf_file, result, error):
+        if error is None and preserve_privacy:
+            result = anonymize_receipt_dict(result)
+        if error is None:
+            sink.write(pdf_file, result)
+            summary['parsed'] += 1
+            print(f"Parsed {pdf_file.name}")
+        else:
+            summary['failed'] += 1
+            print(f"Failed to process {pdf_file.name}: {error}", file=sys.stderr)
+        if on_result is not None:
+            on_result(pdf_file, result, error)
+
+    def submit(pdf_file):
+        cache_key = None
+        if cache is not None:
+            try:
+                with open_pdf_buffer(pdf_file) as data:
+                    cache_key = cache.key(data, extractor)
+            except OSError as e:
+                finish(pdf_file, None, e)
+                return
+            cached = cache.get(cache_key)
+            if cached is not None:
+                finish(pdf_file, cached, None)
+                return
+        in_flight[pool.submit(parse_ebon, pdf_file, extractor)] = (pdf_file, cache_key)
+
+    def collect(future):
+        pdf_file, cache_key = in_flight.pop(future)
+        error = future.exception()
+        result = None if error else future.result()
+        if error is None and cache is not None:
+            cache.put(cache_key, result)
+        finish(pdf_file, result, error)
+
+    try:
+        scan = True
+        while not stop.is_set():
+            # Check pending files often enough to honour the settle time
+            timeout = min(poll_interval, settle) if pending or in_flight else poll_interval
+            if watcher is not None:
+                names = watcher.wait(timeout)
+                if watcher.overflowed:
+                    # Events were dropped, so files may have arrived unnoticed
+                    watcher.overflowed = False
+                    scan = True
+            else:
+                stop.wait(timeout)
+                names = [path.name for path in input_folder.glob('*.pdf')]
+            if scan:
+                # The first pass picks up the files to process at startup, later ones what inotify missed
+                names += [path.name for path in input_folder.glob('*.pdf')]
+                scan = False
+            for name in names:
+                path = input_folder / name
+                if path.suffix.lower() == '.pdf' and path not in pending and _signature(path) != handled.get(name):
+                    pending[path] = (None, 0.0)
+
+            now = time.monotonic()
+            for path, (last_signature, since) in list(pending.items()):
+                signature = _signature(path)
+                if signature is None:
+                    del pending[path]
+                elif signature != last_signature:
+                    pending[path] = (signature, now)
+                elif now - since >= settle and signature[0] > 0:
+                    del pending[path]
+                    handled[path.name] = signature
+                    submit(path)
+
+            for future in [future for future in in_flight if future.done()]:
+                collect(future)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for future in list(in_flight):
+            collect(future)
+        pool.shutdown()
+        sink.close()
+        if watcher is not None:
+            watcher.close()
+        if cache is not None:
+            cache.prune()
+    return summary
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep CLI runs from writing to the user's parse-result cache."""
+    monkeypatch.setenv('REWE_EBON_PARSER_CACHE_DIR', str(tmp_path / 'rewe-ebon-parser-cache'))
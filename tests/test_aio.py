@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from rewe_ebon_parser import AsyncParser, parse_ebon_async, parse_pdf_ebon
+from rewe_ebon_parser import aio
+from rewe_ebon_parser.aio import shared_parser
+
+EXAMPLES_DIR = Path('./examples/eBons')
+PDF_FILES = sorted(EXAMPLES_DIR.glob('*.pdf'))
+
+
+def test_parse_ebon_async_matches_parse_pdf_ebon():
+    async def main():
+        async with AsyncParser(max_workers=2) as parser:
+            return await asyncio.gather(
+                parser.parse_ebon(PDF_FILES[0]),
+                parser.parse_ebon(PDF_FILES[1].read_bytes()),
+                parser.parse_ebon(str(PDF_FILES[2]), as_object=True),
+            )
+
+    from_path, from_bytes, receipt = asyncio.run(main())
+    assert from_path == parse_pdf_ebon(PDF_FILES[0])
+    assert from_bytes == parse_pdf_ebon(PDF_FILES[1])
+    assert receipt.to_dict() == parse_pdf_ebon(PDF_FILES[2])
+
+
+def test_parse_many_async_reports_failures_per_item():
+    inputs = [PDF_FILES[0], b"not a pdf", EXAMPLES_DIR / "missing.pdf", PDF_FILES[1].read_bytes()]
+
+    async def main():
+        async with AsyncParser(max_workers=2, max_concurrency=1) as parser:
+            return [result async for result in parser.parse_many(inputs)]
+
+    results = sorted(asyncio.run(main()), key=lambda r: r.index)
+    assert [r.error is None for r in results] == [True, False, False, True]
+    assert results[0].source == PDF_FILES[0]
+    assert results[3].source is None
+    assert results[3].result == parse_pdf_ebon(PDF_FILES[1])
+    assert isinstance(results[2].error, FileNotFoundError)
+
+
+def test_timeouts_and_cancellation():
+    async def main():
+        async with AsyncParser(max_workers=1) as parser:
+            with pytest.raises(asyncio.TimeoutError):
+                await parser.parse_ebon(PDF_FILES[0], timeout=0)
+            task = asyncio.ensure_future(parser.parse_ebon(PDF_FILES[0]))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # The pool stays usable after a cancelled call
+            return await parser.parse_ebon(PDF_FILES[1])
+
+    assert asyncio.run(main()) == parse_pdf_ebon(PDF_FILES[1])
+
+
+def test_shared_parser_is_reused_across_event_loops():
+    try:
+        first = asyncio.run(parse_ebon_async(PDF_FILES[0]))
+        pool = shared_parser()._pool
+        second = asyncio.run(parse_ebon_async(PDF_FILES[0]))
+        assert shared_parser()._pool is pool
+        assert first == second == parse_pdf_ebon(PDF_FILES[0])
+    finally:
+        shared_parser().close()
+
+
+def test_parser_extractor_is_used_by_default(monkeypatch):
+    calls = []
+
+    def record(data_buffer, extractor, as_object):
+        calls.append(extractor)
+        return {}
+    monkeypatch.setattr(aio, 'parse_ebon', record)
+
+    async def main():
+        parser = AsyncParser(max_workers=1, extractor='pdfium')
+        # A thread pool runs the patched function in this process
+        parser._pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            await parser.parse_ebon(b"pdf")
+            await parser.parse_ebon(b"pdf", extractor='pdfplumber')
+            [result async for result in parser.parse_many([b"pdf"])]
+        finally:
+            parser.close()
+
+    asyncio.run(main())
+    assert calls == ['pdfium', 'pdfplumber', 'pdfium']
+
+
+def test_parse_many_async_pulls_inputs_lazily():
+    pulled = []
+
+    def inputs():
+        for pdf_file in PDF_FILES * 2:
+            pulled.append(pdf_file)
+            yield pdf_file
+
+    async def main():
+        completed = 0
+        async with AsyncParser(max_workers=2, max_concurrency=2) as parser:
+            async for result in parser.parse_many(inputs()):
+                assert result.error is None
+                assert len(pulled) <= completed + 2
+                completed += 1
+        return completed
+
+    assert asyncio.run(main()) == 2 * len(PDF_FILES)
+
+
+def test_timed_out_call_holds_its_slot_until_the_worker_is_done(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def first_call_hangs(data_buffer, extractor, as_object):
+        calls.append(data_buffer)
+        if len(calls) == 1:
+            release.wait(10)
+        return {}
+    monkeypatch.setattr(aio, 'parse_ebon', first_call_hangs)
+
+    async def main():
+        parser = AsyncParser(max_workers=2, max_concurrency=1)
+        parser._pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await parser.parse_ebon(b"pdf", timeout=0.05)
+            # The abandoned job still runs, so the next call waits for it
+            waiting = asyncio.ensure_future(parser.parse_ebon(b"pdf"))
+            await asyncio.sleep(0.1)
+            assert not waiting.done() and len(calls) == 1
+            release.set()
+            return await asyncio.wait_for(waiting, 10)
+        finally:
+            release.set()
+            parser.close()
+
+    assert asyncio.run(main()) == {}
@@ -0,0 +1,108 @@
+import csv
+import sys
+import tarfile
+import zipfile
+import pytest
+from pathlib import Path
+from rewe_ebon_parser.archive import archive_stem, count_archive_pdfs, is_archive_path, iter_archive_pdfs
+from rewe_ebon_parser.cli import main
+from rewe_ebon_parser.output import PROCESSING_LOG_NAME, process_folder
+from rewe_ebon_parser.parse import parse_pdf_ebon
+from rewe_ebon_parser.serialize import load_json_file
+
+PDF_FILES = sorted(Path('./examples/eBons').glob('*.pdf'))
+
+
+def _make_zip(path):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for pdf_file in PDF_FILES:
+            archive.write(pdf_file, f"2023/{pdf_file.name}")
+        archive.writestr("notes.txt", "not an eBon")
+    return path
+
+
+def _make_tar(path):
+    with tarfile.open(path, 'w:gz') as archive:
+        for pdf_file in PDF_FILES:
+            archive.add(pdf_file, f"export/{pdf_file.name}")
+    return path
+
+
+def test_archive_helpers(tmp_path):
+    zip_path = _make_zip(tmp_path / "exports.zip")
+    tar_path = _make_tar(tmp_path / "exports.tar.gz")
+    assert is_archive_path(zip_path) and is_archive_path("a.TGZ") and not is_archive_path("a.pdf")
+    assert archive_stem(tar_path) == "exports" and archive_stem("a.tbz2") == "a"
+    assert count_archive_pdfs(zip_path) == len(PDF_FILES)
+    assert count_archive_pdfs(tar_path) is None
+    members = list(iter_archive_pdfs(tar_path))
+    assert [member.name for member in members] == [f"export/{pdf_file.name}" for pdf_file in PDF_FILES]
+    assert members[0].data == PDF_FILES[0].read_bytes()
+    assert members[0].path == tar_path / f"export__{PDF_FILES[0].name}"
+    with pytest.raises(ValueError, match="Not a zip or tar archive"):
+        list(iter_archive_pdfs(PDF_FILES[0]))
+
+
+@pytest.mark.parametrize("make_archive, name, folder", [(_make_zip, "exports.zip", "2023"), (_make_tar, "exports.tar.gz", "export")])
+def test_process_folder_reads_archive_members(tmp_path, make_archive, name, folder):
+    archive = make_archive(tmp_path / name)
+    output_folder = tmp_path / "out"
+
+    process_folder(archive, output_folder, max_workers=2)
+
+    for pdf_file in PDF_FILES:
+        assert load_json_file(output_folder / f"{folder}__{pdf_file.stem}.json") == parse_pdf_ebon(pdf_file)
+    log = (output_folder / PROCESSING_LOG_NAME).read_text(encoding='utf-8')
+    assert log.count("Success") == len(PDF_FILES)
+
+
+def test_broken_archive_member_is_logged(tmp_path):
+    archive = tmp_path / "exports.zip"
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.write(PDF_FILES[0], PDF_FILES[0].name)
+        zf.writestr("broken.pdf", b"not a pdf")
+    output_folder = tmp_path / "out"
+
+    process_folder(archive, output_folder, max_workers=1)
+
+    with open(output_folder / PROCESSING_LOG_NAME, newline='', encoding='utf-8') as f:
+        status = {row[0]: row[1] for row in list(csv.reader(f))[1:]}
+    assert status == {PDF_FILES[0].name: "Success", "broken.pdf": "Failure"}
+
+
+def test_members_with_the_same_name_do_not_collide(tmp_path):
+    archive = tmp_path / "exports.zip"
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.write(PDF_FILES[0], "2023/1.pdf")
+        zf.write(PDF_FILES[1], "2024/1.pdf")
+    output_folder = tmp_path / "out"
+
+    assert len(process_folder(archive, output_folder, max_workers=1)) == 2
+
+    assert load_json_file(output_folder / "2023__1.json") == parse_pdf_ebon(PDF_FILES[0])
+    assert load_json_file(output_folder / "2024__1.json") == parse_pdf_ebon(PDF_FILES[1])
+    with open(output_folder / PROCESSING_LOG_NAME, newline='', encoding='utf-8') as f:
+        assert sorted(row[0] for row in list(csv.reader(f))[1:]) == ["2023__1.pdf", "2024__1.pdf"]
+
+
+def test_cli_archive_rawtext_file_goes_next_to_archive(tmp_path, monkeypatch):
+    archive = _make_zip(tmp_path / "exports.zip")
+    monkeypatch.setattr(sys, 'argv', ['rewe-ebon-parser', str(archive), str(tmp_path / "items.csv"), '--csv-table', '--rawtext-file', '--nthreads', '1', '--no-cache'])
+    main()
+    assert sorted(path.name for path in (tmp_path / "exports_txt_out").glob("*.txt")) == sorted(f"2023__{pdf_file.stem}.txt" for pdf_file in PDF_FILES)
+
+
+def test_cli_converts_archive_to_csv_table(tmp_path, monkeypatch):
+    archive = _make_tar(tmp_path / "exports.tgz")
+    monkeypatch.setattr(sys, 'argv', ['rewe-ebon-parser', str(archive), '--csv-table', '--nthreads', '1', '--no-cache'])
+    main()
+    with open(tmp_path / "exports.csv", newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == sum(len(parse_pdf_ebon(pdf_file)['items']) for pdf_file in PDF_FILES)
+
+
+def test_cli_archive_defaults_to_sibling_output_folder(tmp_path, monkeypatch):
+    archive = _make_zip(tmp_path / "exports.zip")
+    monkeypatch.setattr(sys, 'argv', ['rewe-ebon-parser', str(archive), '--nthreads', '1', '--no-cache'])
+    main()
+    assert sorted(path.name for path in (tmp_path / "exports_json_out").glob("*.json")) == sorted(f"2023__{pdf_file.stem}.json" for pdf_file in PDF_FILES)
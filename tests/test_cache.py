@@ -0,0 +1,86 @@
+import os
+import pytest
+from pathlib import Path
+from rewe_ebon_parser import output
+from rewe_ebon_parser import cache as cache_module
+from rewe_ebon_parser.cache import ResultCache
+from rewe_ebon_parser.output import process_folder, process_pdf
+
+PDF_PATH = Path('./examples/eBons/5.pdf')
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path / "cache")
+
+
+def test_key_depends_on_content_and_parser_version(tmp_path):
+    data = PDF_PATH.read_bytes()
+    cache = ResultCache(tmp_path, parser_version="1.0")
+    assert cache.key(data) == cache.key(bytes(data))
+    assert cache.key(data) != cache.key(data + b'\n')
+    assert cache.key(data) != ResultCache(tmp_path, parser_version="2.0").key(data)
+    assert cache.key(data) != cache.key(data, 'pdfium')
+
+
+def test_key_depends_on_cache_format(tmp_path, monkeypatch):
+    data = PDF_PATH.read_bytes()
+    cache = ResultCache(tmp_path)
+    key = cache.key(data)
+    monkeypatch.setattr(cache_module, 'CACHE_FORMAT', cache_module.CACHE_FORMAT + 1)
+    assert cache.key(data) != key
+
+
+def test_get_put_roundtrip(cache):
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, {'total': 1.5, 'items': []})
+    assert cache.get("ab" * 32) == {'total': 1.5, 'items': []}
+
+
+def test_process_pdf_hit_skips_parsing(cache, monkeypatch):
+    first = process_pdf(PDF_PATH, cache=cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("parse_ebon called on a cache hit")
+    monkeypatch.setattr(output, 'parse_ebon', fail)
+    assert process_pdf(PDF_PATH, cache=cache) == first
+
+
+def test_cached_result_is_anonymized_per_call(cache):
+    process_pdf(PDF_PATH, cache=cache)
+    anonymized = process_pdf(PDF_PATH, preserve_privacy=True, cache=cache)
+    assert anonymized['market'] == "[REDACTED]"
+    assert process_pdf(PDF_PATH, cache=cache)['market'] == '5472'
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=0)
+    keys = [f"{i:02d}" * 32 for i in range(3)]
+    for age, key in enumerate(keys):
+        cache.put(key, {'value': 'x' * 100})
+        entry = tmp_path / key[:2] / (key + '.json')
+        os.utime(entry, (1000 + age, 1000 + age))
+    entry_size = (tmp_path / keys[0][:2] / (keys[0] + '.json')).stat().st_size
+
+    # Touch the oldest entry so it becomes the most recently used one.
+    cache.get(keys[0])
+    cache.max_bytes = entry_size
+    assert cache.prune() == 2
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is None
+
+
+def test_preserve_privacy_never_writes_the_cache(cache, tmp_path):
+    input_folder = tmp_path / "in"
+    input_folder.mkdir()
+    (input_folder / PDF_PATH.name).write_bytes(PDF_PATH.read_bytes())
+
+    assert process_pdf(PDF_PATH, preserve_privacy=True, cache=cache)['market'] == "[REDACTED]"
+    process_folder(input_folder, tmp_path / "out", max_workers=1, preserve_privacy=True, cache=cache)
+    assert not cache.cache_dir.exists()
+
+    # Entries from runs without the option are still used
+    process_pdf(PDF_PATH, cache=cache)
+    assert process_pdf(PDF_PATH, preserve_privacy=True, cache=cache.read_only_copy())['market'] == "[REDACTED]"
+    assert len(list(cache.cache_dir.rglob('*.json'))) == 1
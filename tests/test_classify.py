@@ -0,0 +1,60 @@
+import pytest
+from rewe_ebon_parser.classify import FOOTER_RULES, LineClassifier, LineRule, classify_line
+
+
+@pytest.mark.parametrize("line, kind", [
+    ("SUMME EUR 16,34", 'total'),
+    ("Geg. Geldgeräte EUR 20,00", 'given'),
+    ("Rückgeld BAR EUR 3,66", 'change'),
+    ("11.08.2023 16:09 Bon-Nr.:12345", 'date'),
+    ("f0:0011.08.2023 16:09 Bon-Nr.:12345", 'date'),
+    ("Markt:5472 Kasse:3 Bed.:303030", 'market'),
+    ("UID Nr.: DE812706034", 'uid'),
+    ("PAYBACK Karten-Nr.: #########1234", 'payback_card'),
+    ("Punktestand vor Einkauf: 1.234", 'payback_points_before'),
+    ("Sie erhalten 8 PAYBACK Punkte auf", 'payback_points'),
+    ("Extra Coupon 20 Punkte", 'payback_coupon'),
+    ("B= 7,0% 15,27 1,07 16,34", 'tax'),
+    ("Gesamtbetrag 15,27 1,07 16,34", 'tax_total'),
+    ("Neues REWE Guthaben: 1,50 EUR", 'new_rewe_credit'),
+])
+def test_classify_line_kinds(line, kind):
+    classified = classify_line(line)
+    assert classified is not None
+    assert classified[0] == kind
+
+
+def test_unrelated_lines_are_not_classified():
+    assert classify_line("BLUMEN/BROCCOLI 3,49 B") is None
+    assert classify_line("Steuer % Netto Steuer Brutto") is None
+
+
+def test_rewe_bonus_rules_require_program():
+    line = "10% auf REWE Bio 1,53 EUR"
+    assert classify_line(line) is None
+    assert classify_line(line, 'REWE Bonus')[0] == 'bonus_coupon'
+    assert classify_line("Mit diesem Einkauf hast du 6,28 EUR", 'REWE Bonus')[0] == 'bonus_earned'
+    assert classify_line("Aktuelles Bonus-Guthaben: 7,26 EUR", 'REWE Bonus')[0] == 'bonus_total'
+
+
+def test_payback_info_line_takes_priority_over_card_number():
+    line = "PAYBACK Karten-Nr.: ####1234Punkte vor dem Einkauf: 1.234 Punkte"
+    kind, match = classify_line(line)
+    assert kind == 'payback_info'
+    assert match.group(2) == '1.234'
+
+
+def test_dispatch_matches_sequential_order():
+    classifier = LineClassifier(FOOTER_RULES)
+    line = "Mit diesem Einkauf gesammelt: 12 Punkte"
+    candidates = classifier.candidates(line)
+    assert len(candidates) < len(FOOTER_RULES)
+    expected = next(rule.kind for rule in FOOTER_RULES if rule.apply(line))
+    assert classifier.classify(line)[0] == expected == 'payback_points'
+
+
+def test_rule_requires_exactly_one_gate():
+    with pytest.raises(ValueError):
+        LineRule('broken', r'.*')
+    with pytest.raises(ValueError):
+        LineRule('broken', r'AB', prefixes=('AB',))
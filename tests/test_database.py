@@ -0,0 +1,71 @@
+import sqlite3
+import sys
+import pytest
+from pathlib import Path
+from rewe_ebon_parser.cli import main
+from rewe_ebon_parser.database import dump_to_sqlite
+from rewe_ebon_parser.parse import parse_pdf_ebon
+from rewe_ebon_parser.privacy import anonymize_receipt_dict
+
+
+@pytest.fixture(scope="module")
+def receipts():
+    return [parse_pdf_ebon(str(path)) for path in sorted(Path('./examples/eBons').glob('*.pdf'))]
+
+
+def _count(db_path, table):
+    with sqlite3.connect(db_path) as connection:
+        return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_dump_to_sqlite_writes_normalized_tables(tmp_path, receipts):
+    db_path = tmp_path / "receipts.sqlite"
+    receipt_count, item_count = dump_to_sqlite(iter(receipts), db_path, batch_size=2)
+    assert receipt_count == len(receipts)
+    assert item_count == sum(len(receipt['items']) for receipt in receipts)
+
+    with sqlite3.connect(db_path) as connection:
+        connection.row_factory = sqlite3.Row
+        row = connection.execute("SELECT * FROM receipts WHERE bonNr = ?", (receipts[0]['bonNr'],)).fetchone()
+        assert row['market'] == receipts[0]['market'] and row['total'] == receipts[0]['total']
+        assert row['itemCount'] == len(receipts[0]['items'])
+        items = connection.execute("SELECT name, subTotal FROM items WHERE receiptId = ? ORDER BY position", (row['id'],)).fetchall()
+        assert [tuple(item) for item in items] == [(item['name'], item['subTotal']) for item in receipts[0]['items']]
+        categories = {r['category']: r['gross'] for r in connection.execute("SELECT * FROM taxDetails WHERE receiptId = ?", (row['id'],))}
+        assert categories == {category: details['gross'] for category, details in receipts[0]['taxDetails'].items() if details}
+        indexes = {r['name'] for r in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {'receipts_key', 'items_name', 'items_receipt'} <= indexes
+    assert _count(db_path, "payments") == sum(len(receipt['given']) for receipt in receipts)
+
+
+def test_dump_to_sqlite_upserts_receipts(tmp_path, receipts):
+    db_path = tmp_path / "receipts.sqlite"
+    dump_to_sqlite(receipts, db_path)
+    changed = dict(receipts[0], total=99.0, items=receipts[0]['items'][:1])
+    # A copy within the same batch and one in a later run update the existing receipt
+    dump_to_sqlite([receipts[0], changed], db_path)
+
+    assert _count(db_path, "receipts") == len(receipts)
+    assert _count(db_path, "items") == sum(len(receipt['items']) for receipt in receipts[1:]) + 1
+    with sqlite3.connect(db_path) as connection:
+        assert connection.execute("SELECT total FROM receipts WHERE bonNr = ?", (receipts[0]['bonNr'],)).fetchone()[0] == 99.0
+
+
+def test_dump_to_sqlite_stores_coupons_and_anonymized_receipts(tmp_path, receipts):
+    db_path = tmp_path / "receipts.sqlite"
+    with_coupons = dict(receipts[0], loyalty={'program': 'REWE Bonus', 'details': {
+        'earnedCredit': 1.0, 'usedCoupons': [{'name': '10% auf REWE Bio', 'value': 1.53}]}})
+    anonymized = anonymize_receipt_dict(dict(receipts[1]))
+    assert 'bonNr' not in anonymized
+    dump_to_sqlite([with_coupons, anonymized, anonymized], db_path)
+
+    assert _count(db_path, "receipts") == 3
+    with sqlite3.connect(db_path) as connection:
+        assert connection.execute("SELECT program, name, value FROM coupons").fetchall() == [('REWE Bonus', '10% auf REWE Bio', 1.53)]
+
+
+def test_cli_writes_sqlite(tmp_path, monkeypatch):
+    db_path = tmp_path / "receipts.sqlite"
+    monkeypatch.setattr(sys, 'argv', ['rewe-ebon-parser', './examples/eBons', '--sqlite', str(db_path), '--nthreads', '1', '--no-cache'])
+    main()
+    assert _count(db_path, "receipts") == len(list(Path('./examples/eBons').glob('*.pdf')))
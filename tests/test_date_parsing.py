@@ -1,7 +1,14 @@
 import pytest
 from datetime import datetime
 import pytz
-from rewe_ebon_parser.parse import _parse_date
+from rewe_ebon_parser.classify import classify_line
+from rewe_ebon_parser.parse import _date_from_match
+
+def _parse_date(line):
+    classified = classify_line(line)
+    if classified is None or classified[0] != 'date':
+        return None
+    return _date_from_match(classified[1])
 
 def test_parse_date_with_text_before_it():
     """Test that a valid date string is parsed correctly."""
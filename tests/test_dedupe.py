@@ -0,0 +1,136 @@
+import csv
+import shutil
+import sys
+from pathlib import Path
+from rewe_ebon_parser.cli import main
+from rewe_ebon_parser.dedupe import DEDUPE_INDEX_NAME, DedupeIndex, footer_identity, receipt_identity
+from rewe_ebon_parser.output import PROCESSING_LOG_NAME, process_folder
+from rewe_ebon_parser.parse import extract_raw_text, parse_pdf_ebon
+
+PDF_FILES = sorted(Path('./examples/eBons').glob('*.pdf'))
+
+
+def _log_status(output_folder):
+    with open(output_folder / PROCESSING_LOG_NAME, newline='', encoding='utf-8') as f:
+        return {row[0]: (row[1], row[2]) for row in list(csv.reader(f))[1:]}
+
+
+def test_footer_identity_matches_parsed_receipt():
+    for pdf_file in PDF_FILES:
+        identity = footer_identity(extract_raw_text(pdf_file))
+        assert identity is not None
+        assert identity == receipt_identity(parse_pdf_ebon(pdf_file))
+    assert footer_identity(Path('examples/eBons_txt_anonymized/1.txt').read_text(encoding='utf-8')) is None
+    assert receipt_identity({'market': '1234'}) is None
+
+
+def test_dedupe_index_claims_and_persists(tmp_path):
+    index = DedupeIndex.load(tmp_path / DEDUPE_INDEX_NAME)
+    assert index.claim_file("a.pdf", "digest") is None
+    assert index.claim_file("a.pdf", "digest") is None
+    assert index.claim_file("b.pdf", "digest") == "a.pdf"
+    assert index.claim_receipt("b.pdf", "identity") is None
+    index.save()
+
+    index = DedupeIndex.load(tmp_path / DEDUPE_INDEX_NAME)
+    assert index.claim_file("c.pdf", "digest") == "a.pdf"
+    assert index.claim_receipt("c.pdf", "identity") == "b.pdf"
+    (tmp_path / "broken.json").write_text("{", encoding='utf-8')
+    assert DedupeIndex.load(tmp_path / "broken.json").files == {}
+
+
+def test_released_claims_are_withdrawn(tmp_path):
+    index = DedupeIndex.load(tmp_path / DEDUPE_INDEX_NAME)
+    assert index.claim_file("a.pdf", "kept") is None
+    index.confirm("a.pdf")
+    assert index.claim_file("b.pdf", "broken") is None and index.claim_receipt("b.pdf", "identity") is None
+    index.release("b.pdf")
+    assert index.files == {"kept": "a.pdf"} and index.receipts == {}
+    # Releasing a rerun input keeps the claims confirmed in an earlier run
+    assert index.claim_file("a.pdf", "kept") is None
+    index.release("a.pdf")
+    assert index.files == {"kept": "a.pdf"}
+
+
+def test_process_folder_skips_duplicates_across_runs(tmp_path):
+    input_folder = tmp_path / "in"
+    input_folder.mkdir()
+    for pdf_file in PDF_FILES[:2]:
+        shutil.copy(pdf_file, input_folder / pdf_file.name)
+    shutil.copy(PDF_FILES[0], input_folder / "copy.pdf")
+    output_folder = tmp_path / "out"
+    index_path = output_folder / DEDUPE_INDEX_NAME
+
+    results = process_folder(input_folder, output_folder, max_workers=1, dedupe=DedupeIndex.load(index_path))
+
+    assert len(results) == 2
+    status = _log_status(output_folder)
+    # Whichever copy is listed first is kept
+    duplicates = [name for name, (state, _) in status.items() if state == "Duplicate"]
+    assert len(duplicates) == 1 and duplicates[0] in ("copy.pdf", PDF_FILES[0].name)
+    original = ({"copy.pdf", PDF_FILES[0].name} - set(duplicates)).pop()
+    assert status[duplicates[0]][1] == f"Duplicate of {(input_folder / original).resolve()} (identical file)"
+    assert not (output_folder / (Path(duplicates[0]).stem + ".json")).exists()
+    assert index_path.exists()
+
+    # Processing the same files again does not flag them, a new copy is caught by the saved index
+    shutil.copy(PDF_FILES[1], input_folder / "forwarded.pdf")
+    results = process_folder(input_folder, output_folder, max_workers=1, dedupe=DedupeIndex.load(index_path))
+    assert len(results) == 2
+    status = _log_status(output_folder)
+    assert sorted(name for name, (state, _) in status.items() if state == "Duplicate") == sorted(duplicates + ["forwarded.pdf"])
+    assert status["forwarded.pdf"][1] == f"Duplicate of {(input_folder / PDF_FILES[1].name).resolve()} (identical file)"
+
+
+def test_same_name_in_another_folder_is_a_duplicate(tmp_path):
+    index_path = tmp_path / DEDUPE_INDEX_NAME
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        shutil.copy(PDF_FILES[0], tmp_path / folder / "1.pdf")
+        process_folder(tmp_path / folder, tmp_path / f"{folder}_out", max_workers=1, dedupe=DedupeIndex.load(index_path))
+    assert _log_status(tmp_path / "b_out")["1.pdf"] == ("Duplicate", f"Duplicate of {(tmp_path / 'a' / '1.pdf').resolve()} (identical file)")
+
+
+def test_failed_file_does_not_claim_its_copies(tmp_path):
+    input_folder = tmp_path / "in"
+    input_folder.mkdir()
+    (input_folder / "broken.pdf").write_bytes(b"not a pdf")
+    output_folder = tmp_path / "out"
+    index_path = output_folder / DEDUPE_INDEX_NAME
+
+    process_folder(input_folder, output_folder, max_workers=1, dedupe=DedupeIndex.load(index_path))
+    assert DedupeIndex.load(index_path).files == {}
+
+    (input_folder / "broken.pdf").unlink()
+    (input_folder / "copy.pdf").write_bytes(b"not a pdf")
+    process_folder(input_folder, output_folder, max_workers=1, dedupe=DedupeIndex.load(index_path))
+    assert _log_status(output_folder)["copy.pdf"][0] == "Failure"
+
+
+def test_byte_different_copy_is_caught_by_footer(tmp_path):
+    input_folder = tmp_path / "in"
+    input_folder.mkdir()
+    raw_text = extract_raw_text(PDF_FILES[0])
+    (input_folder / "a.txt").write_text(raw_text, encoding='utf-8')
+    (input_folder / "b.txt").write_text(raw_text + "\nWeitergeleitet\n", encoding='utf-8')
+    output_folder = tmp_path / "out"
+
+    results = process_folder(input_folder, output_folder, max_workers=1, dedupe=DedupeIndex())
+
+    assert len(results) == 1
+    status = _log_status(output_folder)
+    assert sorted(state for state, _ in status.values()) == ["Duplicate", "Success"]
+    assert "(same receipt)" in max(error for _, error in status.values())
+
+
+def test_cli_dedupe_writes_index_next_to_csv(tmp_path, monkeypatch):
+    input_folder = tmp_path / "in"
+    input_folder.mkdir()
+    shutil.copy(PDF_FILES[2], input_folder / "1.pdf")
+    shutil.copy(PDF_FILES[2], input_folder / "2.pdf")
+    csv_path = tmp_path / "items.csv"
+    monkeypatch.setattr(sys, 'argv', ['rewe-ebon-parser', str(input_folder), str(csv_path), '--csv-table', '--dedupe', '--nthreads', '1', '--no-cache'])
+    main()
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        assert len(list(csv.DictReader(f))) == len(parse_pdf_ebon(PDF_FILES[2])['items'])
+    assert (tmp_path / f"items_{DEDUPE_INDEX_NAME}").exists()
@@ -0,0 +1,74 @@
+import pytest
+from pathlib import Path
+from rewe_ebon_parser import parse
+from rewe_ebon_parser.parse import extract_raw_text, parse_pdf_ebon
+
+PDF_FILES = sorted(Path('./examples/eBons').glob('*.pdf'))
+
+
+@pytest.mark.parametrize("pdf_path", PDF_FILES, ids=lambda path: path.name)
+def test_pdfium_output_matches_pdfplumber(pdf_path):
+    pytest.importorskip("pypdfium2")
+    data = pdf_path.read_bytes()
+    fast_text = ''.join(parse._pdfium_pages(data))
+    assert fast_text == ''.join(parse._iter_pages_pdfplumber(data))
+    assert extract_raw_text(data, extractor='pdfium') == fast_text
+
+
+def test_pdfium_parse_matches_pdfplumber():
+    pdf_path = PDF_FILES[-1]
+    assert parse_pdf_ebon(str(pdf_path), extractor='pdfium') == parse_pdf_ebon(str(pdf_path))
+
+
+@pytest.mark.parametrize("unusual_text", [None, "", "SUMME\n", "SUMME EUR 1,00\x02\n", "EUR �\n"])
+def test_pdfium_falls_back_to_pdfplumber(monkeypatch, unusual_text):
+    monkeypatch.setattr(parse, '_pdfium_pages', lambda data: None if unusual_text is None else [unusual_text])
+    monkeypatch.setattr(parse, '_iter_pages_pdfplumber', lambda data: iter(["from pdfplumber"]))
+    assert extract_raw_text(b'%PDF', extractor='pdfium') == "from pdfplumber"
+
+
+def test_pdfium_falls_back_on_error(monkeypatch):
+    def broken(data):
+        raise RuntimeError("cannot open")
+    monkeypatch.setattr(parse, '_pdfium_pages', broken)
+    monkeypatch.setattr(parse, '_iter_pages_pdfplumber', lambda data: iter(["from pdfplumber"]))
+    assert extract_raw_text(b'%PDF', extractor='pdfium') == "from pdfplumber"
+
+
+def test_unknown_extractor():
+    with pytest.raises(ValueError):
+        extract_raw_text(b'%PDF', extractor='ocr')
+
+
+@pytest.mark.parametrize("extractor", ["pdfplumber", "pdfium"])
+def test_paths_and_mapped_buffers_match_bytes(extractor):
+    pdf_path = PDF_FILES[0]
+    expected = extract_raw_text(pdf_path.read_bytes(), extractor)
+    assert extract_raw_text(pdf_path, extractor) == expected
+    assert extract_raw_text(str(pdf_path), extractor) == expected
+    with parse.open_pdf_buffer(pdf_path) as buffer:
+        assert extract_raw_text(buffer, extractor) == expected
+        assert extract_raw_text(memoryview(buffer), extractor) == expected
+
+
+def test_open_pdf_buffer_handles_empty_files(tmp_path):
+    empty = tmp_path / "empty.pdf"
+    empty.write_bytes(b"")
+    with parse.open_pdf_buffer(empty) as buffer:
+        assert len(buffer) == 0
+
+
+@pytest.mark.parametrize("extractor", ["pdfplumber", "pdfium"])
+def test_page_texts_and_lines_match_raw_text(extractor):
+    pdf_path = PDF_FILES[0]
+    pages = list(parse.iter_page_texts(pdf_path, extractor))
+    assert pages and all(page.endswith('\n') for page in pages)
+    raw_text = ''.join(pages)
+    assert raw_text == extract_raw_text(pdf_path, extractor)
+    expected = [line.strip() for line in raw_text.replace('  ', ' ').split('\n') if line.strip()]
+    assert list(parse.iter_text_lines(pages)) == expected
+
+
+def test_text_lines_are_normalized_across_pages():
+    pages = ["  A  B \n\n", "C\n  \n D\n"]
+    assert list(parse.iter_text_lines(pages)) == ["A B", "C", "D"]
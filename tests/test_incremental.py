@@ -0,0 +1,136 @@
+import csv
+import os
+import shutil
+import pytest
+from pathlib import Path
+from rewe_ebon_parser import incremental
+from rewe_ebon_parser.incremental import MANIFEST_NAME, InputManifest, sync_folder
+from rewe_ebon_parser.output import process_folder
+from rewe_ebon_parser.table import dump_items_to_csv
+
+EXAMPLES_DIR = Path('./examples/eBons')
+
+
+def _read_rows(csv_path):
+    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+        return sorted(tuple(row.values()) for row in csv.DictReader(csvfile))
+
+
+def _full_rebuild_rows(input_folder, tmp_path):
+    reference_csv = tmp_path / "reference.csv"
+    dump_items_to_csv(process_folder(input_folder, max_workers=1), reference_csv)
+    return _read_rows(reference_csv)
+
+
+def test_manifest_roundtrip_uses_serialize_helpers(tmp_path, monkeypatch):
+    written = []
+    real_dump = incremental.dump_json_file
+    monkeypatch.setattr(incremental, 'dump_json_file', lambda data, path: written.append(path) or real_dump(data, path))
+    options = {'parserVersion': '1.0'}
+    manifest = InputManifest(tmp_path / MANIFEST_NAME, options)
+    manifest.files = {"Kassenbon-Müller.pdf": {'status': "Success", 'rows': 2, 'timings': {'parse': 0.01}}}
+    manifest.csv_size = 123
+    manifest.save()
+
+    assert len(written) == 1 and not written[0].exists()
+    loaded = InputManifest.load(tmp_path / MANIFEST_NAME, options)
+    assert loaded.files == manifest.files and loaded.csv_size == 123
+    assert InputManifest.load(tmp_path / MANIFEST_NAME, {'parserVersion': '2.0'}).files == {}
+
+
+@pytest.fixture
+def input_folder(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    for name in ('1.pdf', '2.pdf', '3.pdf'):
+        shutil.copy(EXAMPLES_DIR / name, folder / name)
+    return folder
+
+
+def test_sync_folder_processes_only_new_or_changed_files(input_folder, tmp_path):
+    output_folder = tmp_path / "out"
+    csv_path = tmp_path / "items.csv"
+
+    summary = sync_folder(input_folder, output_folder, csv_path, max_workers=1)
+    assert summary['new'] == 3
+    assert (output_folder / MANIFEST_NAME).exists()
+    assert sorted(p.name for p in output_folder.glob('*.json') if p.name != MANIFEST_NAME) == ['1.json', '2.json', '3.json']
+    assert _read_rows(csv_path) == _full_rebuild_rows(input_folder, tmp_path)
+
+    # Touching a file without changing its content is detected via the hash.
+    os.utime(input_folder / '1.pdf', (1, 1))
+    summary = sync_folder(input_folder, output_folder, csv_path, max_workers=1)
+    assert summary == {'new': 0, 'changed': 0, 'unchanged': 3, 'removed': 0, 'failed': 0}
+
+    (input_folder / '1.pdf').unlink()
+    shutil.copy(EXAMPLES_DIR / '4.pdf', input_folder / '2.pdf')
+    shutil.copy(EXAMPLES_DIR / '5.pdf', input_folder / '5.pdf')
+    summary = sync_folder(input_folder, output_folder, csv_path, max_workers=1)
+    assert summary == {'new': 1, 'changed': 1, 'unchanged': 1, 'removed': 1, 'failed': 0}
+    assert not (output_folder / '1.json').exists()
+    assert (output_folder / '5.json').exists()
+    assert _read_rows(csv_path) == _full_rebuild_rows(input_folder, tmp_path)
+
+    with open(output_folder / 'processing_log.csv', 'r', newline='', encoding='utf-8') as log_file:
+        logged = sorted(row['File Name'] for row in csv.DictReader(log_file))
+    assert logged == ['2.pdf', '3.pdf', '5.pdf']
+
+
+def test_sync_folder_rebuilds_when_options_change(input_folder, tmp_path):
+    csv_path = tmp_path / "items.csv"
+    sync_folder(input_folder, csv_path=csv_path, max_workers=1)
+    summary = sync_folder(input_folder, csv_path=csv_path, max_workers=1, preserve_privacy=True)
+    assert summary['new'] == 3
+    assert {row[1] for row in _read_rows(csv_path)} == {'[REDACTED]'}
+
+
+def test_sync_folder_rebuilds_when_extractor_or_compact_change(input_folder, tmp_path):
+    output_folder = tmp_path / "out"
+    sync_folder(input_folder, output_folder, max_workers=1)
+    assert sync_folder(input_folder, output_folder, max_workers=1, compact=True)['new'] == 3
+    assert b"\n" not in (output_folder / "1.json").read_bytes()
+    assert sync_folder(input_folder, output_folder, max_workers=1, compact=True)['unchanged'] == 3
+    assert sync_folder(input_folder, output_folder, max_workers=1, compact=True, extractor='pdfium')['new'] == 3
+
+
+def test_cli_rejects_incremental_without_a_pdf_folder(input_folder, tmp_path, monkeypatch):
+    from rewe_ebon_parser.cli import main
+
+    monkeypatch.setattr('sys.argv', ['rewe-ebon-parser', str(input_folder / "1.pdf"), str(tmp_path / "items.csv"), '--csv-table', '--incremental'])
+    with pytest.raises(SystemExit):
+        main()
+    assert not (tmp_path / "items.csv").exists()
+
+
+def test_sync_folder_rebuilds_when_csv_was_modified(input_folder, tmp_path):
+    csv_path = tmp_path / "items.csv"
+    sync_folder(input_folder, csv_path=csv_path, max_workers=1)
+    with open(csv_path, 'a', encoding='utf-8') as csvfile:
+        csvfile.write("edited by hand\n")
+    summary = sync_folder(input_folder, csv_path=csv_path, max_workers=1)
+    assert summary['new'] == 3
+    assert _read_rows(csv_path) == _full_rebuild_rows(input_folder, tmp_path)
+
+
+def test_sync_folder_requires_an_output(input_folder):
+    with pytest.raises(ValueError):
+        sync_folder(input_folder)
+
+
+@pytest.mark.parametrize("option", ["--incremental", "--dedupe"])
+def test_output_folder_can_be_aggregated_again(input_folder, tmp_path, monkeypatch, option):
+    from rewe_ebon_parser.cli import main
+    from rewe_ebon_parser.dedupe import DEDUPE_INDEX_NAME
+    from rewe_ebon_parser.mail import MAIL_MANIFEST_NAME
+    from rewe_ebon_parser.serialize import SIDE_FILE_NAMES, is_receipt_json
+
+    assert set(SIDE_FILE_NAMES) == {MANIFEST_NAME, MAIL_MANIFEST_NAME, DEDUPE_INDEX_NAME}
+    assert not is_receipt_json(tmp_path / f"items_{MANIFEST_NAME}") and is_receipt_json(tmp_path / "1.json")
+
+    output_folder = tmp_path / "out"
+    monkeypatch.setattr('sys.argv', ['rewe-ebon-parser', str(input_folder), str(output_folder), '--folder', option, '--nthreads', '1', '--no-cache'])
+    main()
+    csv_path = tmp_path / "items.csv"
+    monkeypatch.setattr('sys.argv', ['rewe-ebon-parser', str(output_folder), str(csv_path), '--csv-table'])
+    main()
+    assert _read_rows(csv_path) == _full_rebuild_rows(input_folder, tmp_path)
@@ -0,0 +1,57 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from rewe_ebon_parser.parse import parse_text_ebon
+
+PDF_MODULES = ('pdfplumber', 'pdfminer', 'tqdm')
+MAIL_MODULES = ('mailbox', 'email')
+
+
+def _loaded_modules(code, modules=PDF_MODULES):
+    output = subprocess.run(
+        [sys.executable, '-c', code + f"\nimport sys; print([m for m in {modules!r} if m in sys.modules])"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return output.strip().splitlines()[-1]
+
+
+def test_package_import_does_not_load_pdf_stack():
+    assert _loaded_modules("import rewe_ebon_parser") == "[]"
+
+
+def test_text_parsing_does_not_load_pdf_stack():
+    code = "from rewe_ebon_parser.parse import parse_text_ebon; parse_text_ebon(open('examples/eBons_txt_anonymized/1.txt', encoding='utf-8').read())"
+    assert _loaded_modules(code) == "[]"
+
+
+def test_json_csv_table_cli_does_not_load_pdf_stack(tmp_path):
+    text = Path('examples/eBons_txt_anonymized/3.txt').read_text(encoding='utf-8')
+    json_path = tmp_path / "receipt.json"
+    json_path.write_text(json.dumps(parse_text_ebon(text), default=str), encoding='utf-8')
+    csv_path = tmp_path / "items.csv"
+
+    code = (f"import sys; sys.argv = ['rewe-ebon-parser', {str(json_path)!r}, {str(csv_path)!r}, '--csv-table']\n"
+            "from rewe_ebon_parser.cli import main; main()")
+    assert _loaded_modules(code) == "[]"
+    assert csv_path.exists()
+
+
+def test_cli_import_does_not_load_mail_modules():
+    assert _loaded_modules("import rewe_ebon_parser.cli", PDF_MODULES + MAIL_MODULES) == "[]"
+
+
+def test_batch_api_is_still_exported():
+    import rewe_ebon_parser
+    from rewe_ebon_parser import ParseResult, parse_many
+    assert rewe_ebon_parser.parse_many is parse_many
+    assert ParseResult._fields == ('index', 'source', 'result', 'error')
+
+
+def test_parse_only_workers_do_not_load_pdf_stack():
+    check = f"[m for m in {PDF_MODULES!r} if m in __import__('sys').modules]"
+    code = ("from rewe_ebon_parser.pipeline import worker_pool\n"
+            "with worker_pool(1, extractor=None) as pool:\n"
+            f"    print(pool.submit(eval, {check!r}).result())")
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,152 @@
+import csv
+import mailbox
+import sys
+import pytest
+from email.message import EmailMessage
+from pathlib import Path
+from rewe_ebon_parser.cli import main
+from rewe_ebon_parser.mail import MAIL_MANIFEST_NAME, is_mailbox_path, iter_mail_pdfs, sender_matches, sync_mailbox
+from rewe_ebon_parser.output import PROCESSING_LOG_NAME
+from rewe_ebon_parser.parse import parse_pdf_ebon
+from rewe_ebon_parser.serialize import load_json_file
+
+PDF_FILES = sorted(Path('./examples/eBons').glob('*.pdf'))
+
+
+def _ebon_mail(index, pdf_file, sender="REWE eBon <ebon@mailing.rewe.de>"):
+    message = EmailMessage()
+    message['From'] = sender
+    message['To'] = "kunde@example.com"
+    message['Subject'] = "Dein REWE eBon"
+    message['Message-ID'] = f"<ebon-{index}@mailing.rewe.de>"
+    message.set_content("Im Anhang findest du deinen eBon.")
+    message.add_attachment(pdf_file.read_bytes(), maintype='application', subtype='pdf', filename="REWE-eBon.pdf")
+    return message
+
+
+def _newsletter():
+    message = EmailMessage()
+    message['From'] = "newsletter@rewe.de"
+    message['Message-ID'] = "<newsletter@rewe.de>"
+    message.set_content("Angebote der Woche")
+    message.add_alternative("<p>Angebote der Woche</p>", subtype='html')
+    return message
+
+
+def _messages(pdf_files):
+    messages = [_ebon_mail(index, pdf_file) for index, pdf_file in enumerate(pdf_files)]
+    messages.append(_newsletter())
+    messages.append(_ebon_mail(99, PDF_FILES[0], sender="someone@example.com"))
+    return messages
+
+
+def _write_mbox(path, messages):
+    box = mailbox.mbox(path)
+    for message in messages:
+        box.add(message)
+    box.close()
+
+
+def test_sender_matches():
+    assert sender_matches("REWE <ebon@mailing.rewe.de>", "rewe.de")
+    assert sender_matches("ebon@rewe.de", "rewe.de") and sender_matches("x@example.com", "")
+    assert not sender_matches("ebon@notrewe.de", "rewe.de")
+    assert sender_matches("ebon@rewe.de", "EBON@rewe.de") and not sender_matches("other@rewe.de", "ebon@rewe.de")
+
+
+def test_is_mailbox_path(tmp_path):
+    (tmp_path / "mails.mbox").write_bytes(b"")
+    mailbox.Maildir(tmp_path / "Maildir")
+    (tmp_path / "eml").mkdir()
+    (tmp_path / "eml" / "1.eml").write_bytes(b"")
+    assert is_mailbox_path(tmp_path / "mails.mbox") and is_mailbox_path(tmp_path / "Maildir") and is_mailbox_path(tmp_path / "eml")
+    assert not is_mailbox_path(Path('./examples/eBons')) and not is_mailbox_path(PDF_FILES[0])
+
+
+def test_iter_mail_pdfs_reads_only_ebon_attachments(tmp_path):
+    path = tmp_path / "mails.mbox"
+    _write_mbox(path, _messages(PDF_FILES[:2]))
+    attachments = list(iter_mail_pdfs(path))
+    assert [message_id for message_id, _ in attachments] == ["<ebon-0@mailing.rewe.de>", "<ebon-1@mailing.rewe.de>"]
+    assert attachments[0][1].name == "ebon-0@mailing.rewe.de.pdf"
+    assert attachments[1][1].data == PDF_FILES[1].read_bytes()
+    assert [message_id for message_id, _ in iter_mail_pdfs(path, skip={"<ebon-0@mailing.rewe.de>"})] == ["<ebon-1@mailing.rewe.de>"]
+    assert len(list(iter_mail_pdfs(path, sender=""))) == 3
+
+
+@pytest.mark.parametrize("kind", ["mbox", "maildir", "eml"])
+def test_sync_mailbox_is_incremental(tmp_path, kind):
+    if kind == "mbox":
+        path = tmp_path / "mails.mbox"
+        write = lambda messages: _write_mbox(path, messages)
+    elif kind == "maildir":
+        path = tmp_path / "Maildir"
+        box = mailbox.Maildir(path)
+        write = lambda messages: [box.add(message) for message in messages]
+    else:
+        path = tmp_path / "eml"
+        path.mkdir()
+        write = lambda messages: [(path / f"{message['Message-ID'].strip('<>')}.eml").write_bytes(bytes(message)) for message in messages]
+    output_folder = tmp_path / "out"
+    csv_path = tmp_path / "items.csv"
+
+    write(_messages(PDF_FILES[:2]))
+    summary = sync_mailbox(path, output_folder, max_workers=1)
+    assert summary == {'mails': 2, 'parsed': 2, 'failed': 0, 'duplicates': 0, 'skipped': 0}
+    assert load_json_file(output_folder / "ebon-1@mailing.rewe.de.json") == parse_pdf_ebon(PDF_FILES[1])
+    assert (output_folder / MAIL_MANIFEST_NAME).exists()
+
+    if kind == "mbox":
+        write(_messages(PDF_FILES[:3]))
+    else:
+        write([_ebon_mail(2, PDF_FILES[2])])
+    summary = sync_mailbox(path, output_folder, max_workers=1)
+    assert summary == {'mails': 1, 'parsed': 1, 'failed': 0, 'duplicates': 0, 'skipped': 2}
+    assert len(list(output_folder.glob("*.json"))) == 4  # three eBons and the manifest
+    log = (output_folder / PROCESSING_LOG_NAME).read_text(encoding='utf-8')
+    assert log.count("Success") == 3
+
+    summary = sync_mailbox(path, None, csv_path, max_workers=1)
+    assert summary['parsed'] == 3
+    assert sync_mailbox(path, None, csv_path, max_workers=1)['parsed'] == 0
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        assert len(list(csv.DictReader(f))) == sum(len(parse_pdf_ebon(pdf_file)['items']) for pdf_file in PDF_FILES[:3])
+
+
+def test_cli_parses_mailbox(tmp_path, monkeypatch):
+    path = tmp_path / "mails.mbox"
+    _write_mbox(path, _messages(PDF_FILES[:2]))
+    monkeypatch.setattr(sys, 'argv', ['rewe-ebon-parser', str(path), '--nthreads', '1', '--no-cache'])
+    main()
+    assert sorted(p.name for p in (tmp_path / "mails_json_out").glob("ebon-*.json")) == ["ebon-0@mailing.rewe.de.json", "ebon-1@mailing.rewe.de.json"]
+
+
+def test_mail_without_pdf_is_recorded(tmp_path):
+    message = _ebon_mail(0, PDF_FILES[0])
+    message.clear_content()
+    message.set_content("Dein Einkauf")
+    message.add_attachment(b"Kassenbon", maintype='text', subtype='plain', filename="bon.txt")
+    path = tmp_path / "mails.mbox"
+    _write_mbox(path, [message])
+    empty = []
+    assert list(iter_mail_pdfs(path, on_empty=empty.append)) == [] and empty == ["<ebon-0@mailing.rewe.de>"]
+
+    output_folder = tmp_path / "out"
+    assert sync_mailbox(path, output_folder, max_workers=1)['skipped'] == 0
+    assert sync_mailbox(path, output_folder, max_workers=1)['skipped'] == 1
+    assert "ebon-0" not in (output_folder / PROCESSING_LOG_NAME).read_text(encoding='utf-8')
+
+
+def test_mail_with_failed_attachment_is_retried(tmp_path):
+    message = _ebon_mail(0, PDF_FILES[0])
+    message.add_attachment(b"not a pdf", maintype='application', subtype='pdf', filename="broken.pdf")
+    path = tmp_path / "mails.mbox"
+    _write_mbox(path, [message, _ebon_mail(1, PDF_FILES[1])])
+    csv_path = tmp_path / "items.csv"
+    expected_rows = sum(len(parse_pdf_ebon(pdf_file)['items']) for pdf_file in PDF_FILES[:2])
+
+    for _ in range(2):
+        summary = sync_mailbox(path, None, csv_path, max_workers=1)
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            assert len(list(csv.DictReader(f))) == expected_rows
+    assert summary == {'mails': 1, 'parsed': 1, 'failed': 1, 'duplicates': 0, 'skipped': 1}
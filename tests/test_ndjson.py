@@ -0,0 +1,58 @@
+import csv
+import gzip
+import json
+import sys
+import pytest
+from pathlib import Path
+from rewe_ebon_parser.cli import main
+from rewe_ebon_parser.ndjson import dump_to_ndjson, is_ndjson_path, iter_ndjson
+from rewe_ebon_parser.parse import parse_text_ebon
+from rewe_ebon_parser.serialize import dumps, loads
+
+TXT_DIR = Path('./examples/eBons_txt_anonymized')
+
+
+@pytest.fixture
+def receipts():
+    return [loads(dumps(parse_text_ebon(path.read_text(encoding='utf-8'))))
+            for path in sorted(TXT_DIR.glob('*.txt'))]
+
+
+@pytest.mark.parametrize("name", ["receipts.jsonl", "receipts.ndjson.gz", "receipts.jsonl.bz2", "receipts.jsonl.xz"])
+def test_ndjson_round_trip(tmp_path, receipts, name):
+    path = tmp_path / name
+    assert dump_to_ndjson(iter(receipts), path) == len(receipts)
+    assert list(iter_ndjson(path)) == receipts
+
+
+def test_ndjson_lines_are_compact(tmp_path, receipts):
+    path = tmp_path / "receipts.jsonl.gz"
+    dump_to_ndjson(receipts, path)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == len(receipts)
+    assert all(json.dumps(json.loads(line), ensure_ascii=False, separators=(',', ':')) == line for line in lines)
+
+
+def test_iter_ndjson_is_lazy_and_reports_bad_lines(tmp_path, receipts):
+    path = tmp_path / "receipts.jsonl"
+    path.write_text(json.dumps(receipts[0]) + "\n\n{broken\n", encoding='utf-8')
+    reader = iter_ndjson(path)
+    assert next(reader) == receipts[0]
+    with pytest.raises(ValueError, match="line 3"):
+        next(reader)
+
+
+def test_is_ndjson_path():
+    assert is_ndjson_path("a.jsonl") and is_ndjson_path("a.NDJSON") and is_ndjson_path("a.jsonl.gz")
+    assert not is_ndjson_path("a.json") and not is_ndjson_path("a.gz") and not is_ndjson_path("a.txt.gz")
+
+
+def test_cli_converts_ndjson_to_csv_table(tmp_path, receipts, monkeypatch):
+    path = tmp_path / "receipts.jsonl.gz"
+    dump_to_ndjson(receipts, path)
+    csv_path = tmp_path / "items.csv"
+    monkeypatch.setattr(sys, 'argv', ['rewe-ebon-parser', str(path), str(csv_path), '--csv-table'])
+    main()
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        assert len(list(csv.DictReader(f))) == sum(len(receipt['items']) for receipt in receipts)
@@ -0,0 +1,42 @@
+import pytest
+from pathlib import Path
+from rewe_ebon_parser.parse import parse_pdf_ebon
+from rewe_ebon_parser.privacy import anonymize_receipt_dict
+from rewe_ebon_parser.table import dump_to_parquet
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture(scope="module")
+def receipts():
+    return [parse_pdf_ebon(str(path)) for path in sorted(Path('./examples/eBons').glob('*.pdf'))]
+
+
+def test_dump_to_parquet_writes_typed_tables(tmp_path, receipts):
+    receipt_count, item_count = dump_to_parquet(iter(receipts), tmp_path, row_group_size=16)
+    assert receipt_count == len(receipts)
+    assert item_count == sum(len(receipt['items']) for receipt in receipts)
+
+    items = pq.read_table(tmp_path / 'items.parquet')
+    assert items.num_rows == item_count
+    assert pq.ParquetFile(tmp_path / 'items.parquet').num_row_groups == -(-item_count // 16)
+    assert items.schema.field('subTotal').type == pa.float64()
+    assert pa.types.is_timestamp(items.schema.field('datetime_local').type)
+    assert pa.types.is_dictionary(items.schema.field('name').type)
+
+    first_item = items.slice(0, 1).to_pylist()[0]
+    assert first_item['subTotal'] == pytest.approx(receipts[0]['items'][0]['subTotal'])
+    assert first_item['datetime_local'].isoformat() == receipts[0]['datetime_local']
+
+    receipts_table = pq.read_table(tmp_path / 'receipts.parquet')
+    assert receipts_table.column('itemCount').to_pylist() == [len(receipt['items']) for receipt in receipts]
+    assert receipts_table.column('total').to_pylist() == pytest.approx([receipt['total'] for receipt in receipts])
+
+
+def test_dump_to_parquet_handles_anonymized_receipts(tmp_path, receipts):
+    anonymized = anonymize_receipt_dict(dict(receipts[-1]))
+    dump_to_parquet([anonymized], tmp_path)
+    receipts_table = pq.read_table(tmp_path / 'receipts.parquet')
+    assert receipts_table.column('datetime_local').to_pylist() == [None]
+    assert receipts_table.column('loyaltyProgram').to_pylist() == [None]
@@ -1,6 +1,7 @@
 import pytest
 from datetime import datetime
-from rewe_ebon_parser.parse import parse_pdf_ebon, parse_text_ebon
+from rewe_ebon_parser.classes import Receipt
+from rewe_ebon_parser.parse import _find_market_address, extract_raw_text, parse_pdf_ebon, parse_text_ebon
 
 @pytest.fixture(scope="module")
 def example_ebon():
@@ -18,6 +19,9 @@ def test_correct_cashier(example_ebon):
 def test_correct_checkout(example_ebon):
     assert example_ebon['checkout'] == '3'
 
+def test_correct_bon_nr(example_ebon):
+    assert example_ebon['bonNr'] == '558'
+
 def test_correct_store(example_ebon):
     assert example_ebon['market'] == '5472'
 
@@ -94,3 +98,31 @@ def test_correct_handles_ec_cash(example_ebon):
 
 def test_change_is_undefined(example_ebon):
     assert example_ebon.get('change') is None
+
+def test_keys_are_in_output_order(example_ebon):
+    assert list(example_ebon) == [
+        'datetime_local', 'datetime_utc', 'market', 'marketAddress', 'cashier', 'checkout',
+        'bonNr', 'vatin', 'items', 'total', 'given', 'loyalty', 'taxDetails'
+    ]
+
+def test_as_object_returns_slotted_receipt(example_ebon):
+    receipt = parse_pdf_ebon('./examples/eBons/5.pdf', as_object=True)
+    assert isinstance(receipt, Receipt)
+    assert not hasattr(receipt, '__dict__')
+    assert not hasattr(receipt.items[0], '__dict__')
+    assert receipt.to_dict() == example_ebon
+
+def test_market_address_is_read_from_the_header_only():
+    header = ["****** Hauptstr. 12 ******", "****** 10115 Berlin ******", "UID Nr.: DE812706034", "EUR"]
+    assert _find_market_address(header).to_dict() == {'street': "Hauptstr. 12", 'zip': "10115", 'city': "Berlin"}
+    assert _find_market_address(["Hauptstr. 12, 10115 Berlin", "UID Nr.: DE812706034"]).city == "Berlin"
+    assert _find_market_address(["UID Nr.: DE812706034", "EUR", "ARTIKEL 12345 STK 1,00 A"]) is None
+
+
+def test_total_mismatch_message():
+    text = extract_raw_text('./examples/eBons/1.pdf').replace('SUMME EUR 13,05', 'SUMME EUR 14,05')
+    # Freshly extracted text reports the amounts in cents, text dumps in euros
+    with pytest.raises(ValueError, match="total sum of 1405.0 but the parser only found items worth 1305"):
+        parse_text_ebon(text, strict=True)
+    with pytest.raises(ValueError, match="total sum of 14.05 but the parser only found items worth 13.05"):
+        parse_text_ebon(text)
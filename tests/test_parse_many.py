@@ -0,0 +1,60 @@
+import sys
+import pytest
+from pathlib import Path
+from rewe_ebon_parser import parse_many, parse_pdf_ebon
+
+EXAMPLES_DIR = Path('./examples/eBons')
+PDF_FILES = sorted(EXAMPLES_DIR.glob('*.pdf'))
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_parse_many_matches_parse_pdf_ebon_in_input_order(workers):
+    results = list(parse_many(PDF_FILES, chunksize=2, workers=workers, ordered=True))
+
+    assert [r.index for r in results] == list(range(len(PDF_FILES)))
+    for pdf_file, result in zip(PDF_FILES, results):
+        assert result.source == pdf_file
+        assert result.error is None
+        assert result.result == parse_pdf_ebon(pdf_file)
+
+
+def test_parse_many_accepts_buffers_and_reports_failures_per_item():
+    inputs = [PDF_FILES[0].read_bytes(), b"not a pdf", PDF_FILES[1], EXAMPLES_DIR / "missing.pdf"]
+
+    results = sorted(parse_many(inputs, chunksize=3, workers=2), key=lambda r: r.index)
+
+    assert [r.error is None for r in results] == [True, False, True, False]
+    assert results[0].source is None
+    assert results[0].result == parse_pdf_ebon(PDF_FILES[0])
+    assert isinstance(results[3].error, FileNotFoundError)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_parse_many_accepts_memoryviews(workers):
+    data = PDF_FILES[0].read_bytes()
+    results = list(parse_many([memoryview(data), memoryview(data)[:10]], chunksize=1, workers=workers, ordered=True))
+
+    assert results[0].error is None and results[0].source is None
+    assert results[0].result == parse_pdf_ebon(PDF_FILES[0])
+    assert results[1].error is not None
+
+
+def test_parse_many_reports_inputs_that_cannot_reach_a_worker():
+    unpicklable = (byte for byte in b"")
+    results = list(parse_many([PDF_FILES[0], unpicklable, PDF_FILES[1]], chunksize=1, workers=1, ordered=True))
+
+    assert [r.error is None for r in results] == [True, False, True]
+    assert results[2].result == parse_pdf_ebon(PDF_FILES[1])
+
+
+def test_parse_many_rejects_invalid_chunksize():
+    with pytest.raises(ValueError):
+        list(parse_many(PDF_FILES, chunksize=0))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="max_tasks_per_child requires Python 3.11")
+def test_parse_many_recycles_workers():
+    results = list(parse_many(PDF_FILES, chunksize=1, workers=1, ordered=True, max_in_flight=1, max_tasks_per_child=1))
+
+    assert [r.error for r in results] == [None] * len(PDF_FILES)
+    assert [r.result for r in results] == [parse_pdf_ebon(pdf_file) for pdf_file in PDF_FILES]
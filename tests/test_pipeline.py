@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import pytest
+from pathlib import Path
+from rewe_ebon_parser import pipeline
+from rewe_ebon_parser.output import process_folder
+from rewe_ebon_parser.parse import extract_raw_text, parse_pdf_ebon
+from rewe_ebon_parser.pipeline import run_pipeline
+
+EXAMPLES_DIR = Path('./examples/eBons')
+PDF_NAMES = ('1.pdf', '2.pdf', '3.pdf', '4.pdf')
+
+
+@pytest.fixture
+def input_folder(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    for name in PDF_NAMES:
+        shutil.copy(EXAMPLES_DIR / name, folder / name)
+    return folder
+
+
+@pytest.mark.parametrize("parse_workers", [0, 2])
+def test_pipeline_matches_single_file_parsing(input_folder, tmp_path, parse_workers):
+    output_folder = tmp_path / "out"
+    output_folder.mkdir()
+    sources = sorted(input_folder.glob('*.pdf'))
+
+    results = list(run_pipeline(sources, output_folder, extract_workers=2, parse_workers=parse_workers, max_in_flight=2))
+
+    assert sorted(r.source.name for r in results) == list(PDF_NAMES)
+    for source, result, error, _ in results:
+        assert error is None
+        expected = json.loads(json.dumps(parse_pdf_ebon(source), default=str))
+        assert json.loads(json.dumps(result, default=str)) == expected
+        with open(output_folder / (source.stem + '.json'), 'r', encoding='utf-8') as f:
+            assert json.load(f) == expected
+
+
+def test_pipeline_reparses_text_dumps_without_pdfs(tmp_path):
+    text_folder = tmp_path / "txt"
+    text_folder.mkdir()
+    for name in PDF_NAMES:
+        with open(EXAMPLES_DIR / name, 'rb') as f:
+            raw_text = extract_raw_text(f.read())
+        (text_folder / name).with_suffix('.txt').write_text(raw_text, encoding='utf-8')
+
+    results = process_folder(text_folder, max_workers=1)
+
+    expected = sorted(parse_pdf_ebon(EXAMPLES_DIR / name)['total'] for name in PDF_NAMES)
+    assert sorted(result['total'] for result in results) == expected
+
+
+def test_pipeline_reports_failures_per_file(input_folder, tmp_path):
+    broken = input_folder / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    output_folder = tmp_path / "out"
+
+    results = process_folder(input_folder, output_folder, max_workers=2)
+
+    assert len(results) == len(PDF_NAMES)
+    with open(output_folder / 'processing_log.csv', 'r', encoding='utf-8') as f:
+        log = f.read()
+    assert "broken.pdf,Failure" in log
+    assert log.count(",Success,") == len(PDF_NAMES)
+
+
+def test_pipeline_bounds_files_in_flight(input_folder):
+    consumed = []
+
+    def sources():
+        for source in sorted(input_folder.glob('*.pdf')):
+            consumed.append(source)
+            yield source
+
+    results = run_pipeline(sources(), extract_workers=1, max_in_flight=1)
+    next(results)
+    # One file in flight and at most one more read before the first result is yielded
+    assert len(consumed) <= 2
+    assert len(list(results)) == len(PDF_NAMES) - 1
+
+
+def test_extract_stage_reads_the_file_before_extracting(input_folder, monkeypatch):
+    touched = []
+    real_page_in = pipeline._page_in
+    monkeypatch.setattr(pipeline, '_page_in', lambda buffer: touched.append(len(buffer)) or real_page_in(buffer))
+    # Extraction gets the mapped file rather than the path, so it does not read the file itself
+    monkeypatch.setattr(pipeline, 'extract_raw_text', lambda data, extractor: type(data).__name__)
+
+    raw_text, cached, _, timings = pipeline._extract_stage(input_folder / '1.pdf', 'pdfplumber', None)
+
+    assert raw_text == 'mmap' and cached is None
+    assert touched == [(input_folder / '1.pdf').stat().st_size] == [timings['bytes']]
+    assert timings['read'] > 0 and 'extract' in timings
+
+
+def test_pdfs_are_parsed_in_the_extraction_processes(input_folder, monkeypatch):
+    main_pid = os.getpid()
+    real_parse_stage = pipeline._parse_stage
+
+    def parse_stage(*args):
+        assert os.getpid() != main_pid, "parsed in the main process"
+        return real_parse_stage(*args)
+
+    monkeypatch.setattr(pipeline, '_parse_stage', parse_stage)
+    results = list(run_pipeline(sorted(input_folder.glob('*.pdf')), extract_workers=2))
+    assert [error for _, _, error, _ in results] == [None] * len(PDF_NAMES)
+    assert all('parse' in timings for _, _, _, timings in results)
+
@@ -0,0 +1,51 @@
+import csv
+import math
+import shutil
+from pathlib import Path
+from rewe_ebon_parser.output import PROCESSING_LOG_HEADER, process_folder
+from rewe_ebon_parser.profiling import format_profile, percentile
+
+EXAMPLES_DIR = Path('./examples/eBons')
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 99) == 3.0
+    assert math.isnan(percentile([], 50))
+
+
+def test_format_profile_lists_stages_and_slowest_files():
+    records = [(f"{i}.pdf", {'read': 0.001, 'extract': i / 10, 'parse': 0.002}) for i in range(30)]
+    report = format_profile(records, slowest=3)
+
+    assert "Stage timings over 30 files" in report
+    assert report.splitlines()[3].split()[:2] == ["extract", "30"]
+    assert "write" not in report
+    slowest = report.split("Slowest 3 files:\n")[1].splitlines()
+    assert [line.split()[2] for line in slowest] == ["29.pdf", "28.pdf", "27.pdf"]
+
+
+def test_processing_log_records_stage_timings(tmp_path, capsys):
+    input_folder = tmp_path / "in"
+    input_folder.mkdir()
+    for name in ('1.pdf', '2.pdf'):
+        shutil.copy(EXAMPLES_DIR / name, input_folder / name)
+    (input_folder / "broken.pdf").write_bytes(b"not a pdf")
+    output_folder = tmp_path / "out"
+
+    process_folder(input_folder, output_folder, max_workers=1, profile=True)
+
+    with open(output_folder / 'processing_log.csv', 'r', newline='', encoding='utf-8') as f:
+        rows = {row['File Name']: row for row in csv.DictReader(f)}
+    assert list(rows['1.pdf']) == PROCESSING_LOG_HEADER
+    for name in ('1.pdf', '2.pdf'):
+        assert int(rows[name]['Bytes']) == (EXAMPLES_DIR / name).stat().st_size
+        assert int(rows[name]['Items']) > 0
+        for column in ('Read (ms)', 'Extract (ms)', 'Parse (ms)', 'Write (ms)'):
+            assert float(rows[name][column]) >= 0
+        assert rows[name]['Anonymize (ms)'] == ''
+    assert rows['broken.pdf']['Status'] == 'Failure'
+    assert "Slowest 3 files:" in capsys.readouterr().out
@@ -0,0 +1,51 @@
+import json
+import math
+import pytest
+from datetime import datetime
+from pathlib import Path
+import pytz
+from rewe_ebon_parser import serialize
+from rewe_ebon_parser.parse import parse_pdf_ebon, parse_text_ebon
+
+EXAMPLES_DIR = Path('./examples/eBons')
+TXT_DIR = Path('./examples/eBons_txt_anonymized')
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(serialize, "orjson", None)
+    return request.param
+
+
+def test_output_matches_stdlib_formatting(backend):
+    for pdf_file in sorted(EXAMPLES_DIR.glob('*.pdf')):
+        receipt = parse_pdf_ebon(pdf_file)
+        assert serialize.json_backend() == backend
+        assert serialize.dumps(receipt) == json.dumps(receipt, indent=2, ensure_ascii=False).encode('utf-8')
+        assert serialize.dumps(receipt, compact=True) == json.dumps(receipt, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def test_nan_is_written_as_null_and_read_back(backend):
+    receipt = parse_text_ebon((TXT_DIR / '4.txt').read_text(encoding='utf-8'))
+    assert math.isnan(receipt['taxDetails']['total']['net'])
+    data = serialize.dumps(receipt, compact=True)
+    assert b'NaN' not in data
+    assert serialize.loads(data)['taxDetails']['total']['net'] is None
+    # Files written by earlier versions may contain NaN
+    assert math.isnan(serialize.loads(b'{"total": NaN}')['total'])
+
+
+def test_datetimes_are_written_in_iso_format(backend):
+    timestamp = pytz.timezone('Europe/Berlin').localize(datetime(2020, 1, 13, 17, 25))
+    assert serialize.loads(serialize.dumps({'date': timestamp})) == {'date': '2020-01-13T17:25:00+01:00'}
+
+
+def test_json_file_round_trip(backend, tmp_path):
+    receipt = parse_pdf_ebon(EXAMPLES_DIR / '1.pdf')
+    path = tmp_path / 'receipt.json'
+    serialize.dump_json_file(receipt, path, compact=True)
+    assert b'\n' not in path.read_bytes()
+    assert serialize.load_json_file(path) == receipt
@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from pathlib import Path
+from rewe_ebon_parser.cache import ResultCache
+from rewe_ebon_parser.parse import parse_pdf_ebon
+from rewe_ebon_parser.server import EbonServer
+
+PDF_FILES = sorted(Path('./examples/eBons').glob('*.pdf'))
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = EbonServer(('127.0.0.1', 0), workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _request(url, data=None, content_type='application/pdf'):
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': content_type} if data is not None else {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def _multipart(files):
+    boundary = 'ebonboundary'
+    body = b''
+    for name, data in files:
+        body += (f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="{name}"\r\n'
+                 'Content-Type: application/pdf\r\n\r\n').encode() + data + b'\r\n'
+    return body + f'--{boundary}--\r\n'.encode(), f'multipart/form-data; boundary={boundary}'
+
+
+def test_single_pdf_returns_receipt_json(server_url):
+    status, _, body = _request(server_url + '/parse', PDF_FILES[0].read_bytes())
+    assert status == 200
+    assert json.loads(body) == json.loads(json.dumps(parse_pdf_ebon(PDF_FILES[0])))
+
+
+def test_invalid_pdf_is_rejected(server_url):
+    status, _, body = _request(server_url + '/parse', b'not a pdf')
+    assert status == 422
+    assert 'error' in json.loads(body)
+
+
+def test_multipart_batch_in_every_format(server_url):
+    body, content_type = _multipart([(PDF_FILES[0].name, PDF_FILES[0].read_bytes()), ('broken.pdf', b'not a pdf'),
+                                     (PDF_FILES[1].name, PDF_FILES[1].read_bytes())])
+    expected = [json.loads(json.dumps(parse_pdf_ebon(path))) for path in PDF_FILES[:2]]
+
+    status, headers, response = _request(server_url + '/parse', body, content_type)
+    outcomes = json.loads(response)
+    assert status == 200 and headers['X-Parse-Failures'] == '1'
+    assert [outcome['file'] for outcome in outcomes] == [PDF_FILES[0].name, 'broken.pdf', PDF_FILES[1].name]
+    assert [outcomes[0]['receipt'], outcomes[2]['receipt']] == expected
+    assert 'error' in outcomes[1]
+
+    _, _, response = _request(server_url + '/parse?format=ndjson', body, content_type)
+    assert [json.loads(line) for line in response.splitlines()] == expected
+
+    _, headers, response = _request(server_url + '/parse?format=csv', body, content_type)
+    assert headers['Content-Type'].startswith('text/csv')
+    rows = list(csv.DictReader(io.StringIO(response.decode('utf-8'))))
+    assert len(rows) == sum(len(receipt['items']) for receipt in expected)
+
+
+def test_health_stats_and_errors(server_url):
+    status, _, body = _request(server_url + '/health')
+    assert status == 200 and json.loads(body)['status'] == 'ok'
+    _request(server_url + '/parse', PDF_FILES[0].read_bytes())
+    stats = json.loads(_request(server_url + '/stats')[2])
+    assert stats['workers'] == 1 and stats['requests'] >= 1 and stats['receipts'] >= 1
+    assert _request(server_url + '/missing')[0] == 404
+    assert _request(server_url + '/parse?format=xml', b'%PDF')[0] == 400
+
+
+def test_form_fields_are_not_uploads(server_url):
+    body, content_type = _multipart([(PDF_FILES[0].name, PDF_FILES[0].read_bytes())])
+    field = b'--ebonboundary\r\nContent-Disposition: form-data; name="comment"\r\n\r\nmy eBons\r\n'
+    status, headers, response = _request(server_url + '/parse', field + body, content_type)
+    assert status == 200 and headers['X-Parse-Failures'] == '0'
+    assert [outcome['file'] for outcome in json.loads(response)] == [PDF_FILES[0].name]
+    status, _, _ = _request(server_url + '/parse', field + b'--ebonboundary--\r\n', content_type)
+    assert status == 400
+
+
+def test_mean_parse_time_leaves_out_cache_hits(tmp_path):
+    server = EbonServer(('127.0.0.1', 0), workers=1, cache=ResultCache(tmp_path))
+    try:
+        server.parse_uploads([('a.pdf', PDF_FILES[0].read_bytes())])
+        first = server.snapshot_stats()['meanParseMs']
+        server.parse_uploads([('a.pdf', PDF_FILES[0].read_bytes())] * 20)
+        stats = server.snapshot_stats()
+    finally:
+        server.server_close()
+    assert stats['cacheHits'] == 20 and stats['meanParseMs'] == first > 0
+    assert 'parses' not in stats and 'parseSeconds' not in stats
+
+
+def test_pool_is_replaced_after_a_worker_dies():
+    server = EbonServer(('127.0.0.1', 0), workers=1)
+    try:
+        broken = server.pool
+        for process in list(broken._processes.values()):
+            process.kill()
+            process.join()
+        server.parse_uploads([('a.pdf', PDF_FILES[0].read_bytes())])
+        outcomes = server.parse_uploads([('a.pdf', PDF_FILES[0].read_bytes())])
+    finally:
+        server.server_close()
+    assert server.pool is not broken
+    assert outcomes[0][2] is None and outcomes[0][1] == parse_pdf_ebon(PDF_FILES[0])
@@ -0,0 +1,28 @@
+import importlib.util
+import math
+from collections import Counter
+from pathlib import Path
+from rewe_ebon_parser.parse import parse_text_ebon
+
+_spec = importlib.util.spec_from_file_location('synthetic_corpus', Path('./benchmarks/synthetic_corpus.py'))
+synthetic_corpus = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(synthetic_corpus)
+
+
+def test_synthetic_receipts_parse_strictly_and_add_up():
+    programs = Counter()
+    units = Counter()
+    for text in synthetic_corpus.generate_corpus(300, seed=1):
+        receipt = parse_text_ebon(text, strict=True)
+        assert math.isclose(sum(item['subTotal'] for item in receipt['items']), receipt['total'], abs_tol=0.005)
+        assert receipt['taxDetails']['total']['gross'] == receipt['total']
+        programs[(receipt.get('loyalty') or {}).get('program')] += 1
+        units.update(item.get('unit') for item in receipt['items'])
+
+    assert set(programs) == {None, 'PAYBACK', 'REWE Bonus'}
+    assert units['kg'] and units['Stk']
+
+
+def test_synthetic_corpus_is_reproducible():
+    assert list(synthetic_corpus.generate_corpus(5, seed=7)) == list(synthetic_corpus.generate_corpus(5, seed=7))
+    assert list(synthetic_corpus.generate_corpus(5, seed=7)) != list(synthetic_corpus.generate_corpus(5, seed=8))
@@ -1,8 +1,10 @@
 import pytest
+import copy
 import csv
 import sys
 from pathlib import Path
 from rewe_ebon_parser.cli import main as cli_main
+from rewe_ebon_parser.table import dump_items_to_csv
 
 @pytest.fixture
 def examples_ebons_dir():
@@ -91,3 +93,48 @@ def test_csv_table_cli_with_mixed_files(tmp_path, examples_ebons_dir, monkeypatc
         # Clean up the test JSON file
         if test_json_file.exists():
             test_json_file.unlink()
+
+def test_dump_items_to_csv_does_not_mutate_receipts(tmp_path):
+    receipt = {
+        'datetime_local': '2023-08-11T16:09:00+02:00',
+        'market': '5472',
+        'marketAddress': {'street': 'Im Weidenbruch 136', 'zip': '51061', 'city': 'Köln'},
+        'items': [
+            {'taxCategory': 'B', 'name': 'SALAMI', 'amount': 1, 'subTotal': 1.79, 'loyaltyProgramQualified': None},
+            {'taxCategory': 'B', 'name': 'BAG.', 'amount': 2, 'subTotal': 4.58, 'loyaltyProgramQualified': 'PAYBACK',
+             'unit': 'Stk', 'pricePerUnit': 2.29},
+        ],
+    }
+    original = copy.deepcopy(receipt)
+    output_csv = tmp_path / "items.csv"
+
+    assert dump_items_to_csv(iter([receipt]), output_csv) == 2
+    assert receipt == original
+
+    with open(output_csv, 'r', newline='', encoding='utf-8') as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    assert rows[0]['marketCity'] == 'Köln'
+    assert rows[0]['unit'] == ''
+    assert rows[1]['pricePerUnit'] == '2.29'
+
+
+def test_dump_items_to_csv_consumes_receipts_lazily(tmp_path):
+    output_csv = tmp_path / "items.csv"
+    consumed = []
+
+    def receipts():
+        for index in range(3):
+            consumed.append(index)
+            # Rows of the previous receipt are written before the next one is requested.
+            if index:
+                assert output_csv.exists()
+            yield {'market': str(index), 'items': [{'name': f'ITEM {index}', 'subTotal': 1.0}]}
+
+    assert dump_items_to_csv(receipts(), output_csv) == 3
+    assert consumed == [0, 1, 2]
+
+
+def test_dump_items_to_csv_without_items(tmp_path):
+    output_csv = tmp_path / "items.csv"
+    assert dump_items_to_csv(iter([{'items': []}]), output_csv) == 0
+    assert not output_csv.exists()
@@ -0,0 +1,140 @@
+import os
+import shutil
+import sys
+import threading
+import pytest
+from pathlib import Path
+from rewe_ebon_parser import watch
+from rewe_ebon_parser.cli import main
+from rewe_ebon_parser.ndjson import iter_ndjson
+from rewe_ebon_parser.parse import parse_pdf_ebon
+from rewe_ebon_parser.serialize import load_json_file
+from rewe_ebon_parser.watch import watch_folder
+
+PDF_FILES = sorted(Path('./examples/eBons').glob('*.pdf'))
+
+
+def _watch(tmp_path, use_inotify, expected_count, arrive, **kwargs):
+    input_folder = tmp_path / "in"
+    input_folder.mkdir()
+    kwargs.setdefault('ndjson_path', tmp_path / "receipts.jsonl")
+    stop = threading.Event()
+    seen = []
+
+    def on_result(path, result, error):
+        seen.append((path.name, error))
+        if len(seen) == expected_count:
+            stop.set()
+
+    arrive(input_folder)
+    timer = threading.Timer(60, stop.set)
+    timer.start()
+    try:
+        summary = watch_folder(input_folder, max_workers=1, settle=0.2, poll_interval=0.1, use_inotify=use_inotify,
+                               stop=stop, on_result=on_result, **kwargs)
+    finally:
+        timer.cancel()
+    return summary, seen
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watch_parses_files_as_they_arrive(tmp_path, use_inotify):
+    def arrive(folder):
+        def write_slowly():
+            # A file written in two steps must only be parsed once complete
+            data = PDF_FILES[0].read_bytes()
+            with open(folder / PDF_FILES[0].name, 'wb') as f:
+                f.write(data[:100])
+                f.flush()
+                threading.Event().wait(0.1)
+                f.write(data[100:])
+            shutil.copy(PDF_FILES[1], folder / PDF_FILES[1].name)
+            (folder / "broken.pdf").write_bytes(b"not a pdf")
+        threading.Timer(0.5, write_slowly).start()
+
+    summary, seen = _watch(tmp_path, use_inotify, 3, arrive, csv_path=tmp_path / "items.csv")
+
+    assert summary == {'parsed': 2, 'failed': 1}
+    assert sorted(name for name, error in seen if error is None) == sorted(path.name for path in PDF_FILES[:2])
+    receipts = list(iter_ndjson(tmp_path / "receipts.jsonl"))
+    assert sorted(r['total'] for r in receipts) == sorted(parse_pdf_ebon(path)['total'] for path in PDF_FILES[:2])
+    items = (tmp_path / "items.csv").read_text(encoding='utf-8').splitlines()
+    assert len(items) == 1 + sum(len(r['items']) for r in receipts)
+
+
+def test_watch_processes_existing_files_into_json_folder(tmp_path):
+    output_folder = tmp_path / "out"
+    output_folder.mkdir()
+    (output_folder / (PDF_FILES[1].stem + '.json')).write_text('{}', encoding='utf-8')
+
+    def arrive(folder):
+        for path in PDF_FILES[:2]:
+            shutil.copy(path, folder / path.name)
+
+    summary, seen = _watch(tmp_path, False, 1, arrive, output_folder=output_folder, ndjson_path=None, process_existing=True)
+
+    assert summary == {'parsed': 1, 'failed': 0}
+    assert seen == [(PDF_FILES[0].name, None)]
+    assert load_json_file(output_folder / (PDF_FILES[0].stem + '.json'))['total'] == parse_pdf_ebon(PDF_FILES[0])['total']
+
+
+def test_watch_requires_a_sink(tmp_path):
+    with pytest.raises(ValueError):
+        watch_folder(tmp_path)
+
+
+def test_cli_parses_input_folder_named_watch(tmp_path, monkeypatch, capsys):
+    pdf_file = PDF_FILES[0].resolve()
+    (tmp_path / "watch").mkdir()
+    shutil.copy(pdf_file, tmp_path / "watch" / "1.pdf")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'argv', ['rewe-ebon-parser', '--', 'watch', 'items.csv', '--csv-table', '--nthreads', '1', '--no-cache'])
+    main()
+    assert (tmp_path / "items.csv").exists()
+
+    # Without the separator the subcommand runs, whatever is in the working directory
+    monkeypatch.setattr(sys, 'argv', ['rewe-ebon-parser', 'watch'])
+    with pytest.raises(SystemExit):
+        main()
+    capsys.readouterr()
+
+
+def test_inotify_queue_overflow_is_reported(tmp_path):
+    watcher = watch._InotifyWatcher(tmp_path)
+    os.close(watcher.fd)
+    watcher.fd, write_fd = os.pipe()
+    name = b"1.pdf\0\0\0"
+    os.write(write_fd, watch._INOTIFY_EVENT.pack(-1, watch._IN_Q_OVERFLOW, 0, 0)
+             + watch._INOTIFY_EVENT.pack(1, watch._IN_CLOSE_WRITE, 0, len(name)) + name)
+    os.close(write_fd)
+    try:
+        assert watcher.wait(1) == ["1.pdf"] and watcher.overflowed
+    finally:
+        watcher.close()
+
+
+def test_watch_rescans_after_inotify_overflow(tmp_path, monkeypatch):
+    class LossyWatcher:
+        """Drops every event, reporting an overflow once a PDF has arrived."""
+
+        def __init__(self, folder):
+            self.folder = folder
+            self.overflowed = False
+            self.reported = False
+
+        def wait(self, timeout):
+            threading.Event().wait(timeout)
+            if not self.reported and any(self.folder.glob('*.pdf')):
+                self.overflowed = self.reported = True
+            return []
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(watch, '_inotify_watcher', LossyWatcher)
+
+    def arrive(folder):
+        threading.Timer(0.3, shutil.copy, (PDF_FILES[0], folder / PDF_FILES[0].name)).start()
+
+    summary, seen = _watch(tmp_path, True, 1, arrive)
+    assert summary == {'parsed': 1, 'failed': 0} and seen == [(PDF_FILES[0].name, None)]